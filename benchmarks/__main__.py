@@ -0,0 +1,86 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import argparse
+import sys
+import tempfile
+
+from . import suite
+from .data import Dataset
+
+
+def main(args=None):
+  parser = argparse.ArgumentParser(
+    prog='python3 -m benchmarks',
+    description='Times the handycsv hot paths on synthetic data.')
+  parser.add_argument('-r', '--rows', type=int, default=100000,
+                      help='number of data rows (default: %(default)s)')
+  parser.add_argument('-c', '--columns', type=int, default=10,
+                      help='number of data columns (default: %(default)s)')
+  parser.add_argument('-n', '--repeat', type=int, default=3,
+                      help='timed runs per case, the best is kept '
+                      '(default: %(default)s)')
+  parser.add_argument('-k', '--only', default=None,
+                      help='regular expression selecting the cases to run')
+  parser.add_argument('-o', '--output', default=None,
+                      help='JSON file to save the results to')
+  parser.add_argument('-b', '--baseline', default=None,
+                      help='JSON file of a previous run to compare against')
+  parser.add_argument('-t', '--threshold', type=float, default=0.25,
+                      help='slowdown versus the baseline flagged as a '
+                      'regression (default: %(default)s)')
+  options = parser.parse_args(args)
+  if options.rows < 1 or options.columns < 3 or options.repeat < 1:
+    parser.error('requires rows >= 1, columns >= 3 and repeat >= 1')
+
+  with tempfile.TemporaryDirectory(prefix='handycsv-benchmarks') as directory:
+    data = Dataset(directory, options.rows, options.columns)
+    print('{} rows x {} columns, {:.1f} MB'.format(
+      data.num_rows, data.num_columns, data.bytes / 1e6))
+    document = suite.run(data, options.repeat, options.only,
+                         lambda name, result:
+                         print(suite.format_result(name, result), flush=True))
+
+  if options.output:
+    suite.save(document, options.output)
+  if options.baseline:
+    regressions = suite.compare(document, suite.load(options.baseline),
+                                options.threshold)
+    for name, before, after in regressions:
+      print('REGRESSION {}: {:.4f} s -> {:.4f} s ({:+.0%})'.format(
+        name, before, after, after / before - 1))
+    if regressions:
+      return 1
+    print('no regressions versus {}'.format(options.baseline))
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import random
+
+import handycsv
+
+
+def grid_text(num_rows, num_columns, seed=0):
+  """
+  Returns the text of a synthetic grid with a header row and a row name column.
+  Columns cycle through int, float and str values so the type conversions are
+  all exercised.
+
+  Args:
+    num_rows    (int) : number of data rows
+    num_columns (int) : number of data columns
+    seed        (int) : random seed
+  """
+  rng = random.Random(seed)
+  lines = [','.join(['-'] + ['c{}'.format(c) for c in range(num_columns)])]
+  for row in range(num_rows):
+    values = ['r{}'.format(row)]
+    for column in range(num_columns):
+      kind = column % 3
+      if kind == 0:
+        values.append(str(rng.randrange(1000000)))
+      elif kind == 1:
+        values.append(repr(rng.random() * 1000))
+      else:
+        values.append('s{}'.format(rng.randrange(1000)))
+    lines.append(','.join(values))
+  return '\n'.join(lines) + '\n'
+
+
+def column_text(num_rows, seed=0):
+  """
+  Returns the text of a synthetic two column (name, value) file.
+
+  Args:
+    num_rows (int) : number of data rows
+    seed     (int) : random seed
+  """
+  return grid_text(num_rows, 1, seed)
+
+
+class Dataset(object):
+  """
+  This holds the synthetic inputs of a benchmark run: the texts, files with
+  the same content (plain and gzip) and the parsed objects.
+  """
+
+  def __init__(self, directory, num_rows, num_columns):
+    """
+    Creates the inputs in a directory.
+
+    Args:
+      directory   (str) : directory for the files
+      num_rows    (int) : number of data rows
+      num_columns (int) : number of data columns
+    """
+    self.num_rows = num_rows
+    self.num_columns = num_columns
+    self.text = grid_text(num_rows, num_columns)
+    self.bytes = len(self.text.encode('utf-8'))
+    self.column_text = column_text(num_rows)
+    self.csv = handycsv.Csv.load(self.text)
+    self.grid = handycsv.GridStats.make_from_csv(self.csv.copy())
+    self.column = handycsv.ColumnStats.load(self.column_text)
+    self.files = {}
+    for ext in ('.csv', '.csv.gz'):
+      filename = '{}/grid{}'.format(directory, ext)
+      self.csv.write(filename)
+      self.files[ext] = filename
+    self.output = '{}/output.csv'.format(directory)
@@ -0,0 +1,287 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import gc
+import json
+import platform
+import re
+import time
+import tracemalloc
+
+import handycsv
+
+# number of single row operations timed by the add_row/remove_row cases
+SINGLE_OPS = 1000
+
+
+class Case(object):
+  """
+  This is one benchmarked operation. setup() builds the untimed state from the
+  dataset and run() is the timed part. The throughput is computed from the
+  number of rows (or operations) and bytes one run processes.
+  """
+
+  def __init__(self, name, run, setup=None, rows=None, data_bytes=None):
+    """
+    Args:
+      name       (str)      : the case name
+      run        (callable) : timed function of the setup() result
+      setup      (callable) : function of the dataset, defaults to identity
+      rows       (callable) : function of the dataset giving rows per run
+      data_bytes (callable) : function of the dataset giving bytes per run
+    """
+    self.name = name
+    self.run = run
+    self.setup = setup or (lambda data: data)
+    self.rows = rows or (lambda data: data.num_rows)
+    self.data_bytes = data_bytes or (lambda data: None)
+
+
+def _text_bytes(data):
+  return data.bytes
+
+
+def _cells(data):
+  return data.num_rows * data.num_columns
+
+
+def _single_ops(data):
+  return min(SINGLE_OPS, data.num_rows)
+
+
+def _get_all(grid):
+  for row in grid.row_names():
+    for column in grid.column_names():
+      grid.get(row, column)
+
+
+def _set_all(grid):
+  for row in grid.row_names():
+    for column in grid.column_names():
+      grid.set(row, column, 0)
+
+
+def _add_rows(state):
+  grid, count = state
+  values = dict.fromkeys(grid.column_names(), 0)
+  for row in range(count):
+    grid.add_row('new{}'.format(row), values)
+
+
+def _remove_rows(state):
+  grid, count = state
+  names = grid.row_names()
+  middle = len(names) // 2 - count // 2
+  for name in names[middle:middle + count]:
+    grid.remove_row(name)
+
+
+def _filter_rows(grid):
+  grid.filter_rows('c2', r's\d\d?$')
+
+
+CASES = [
+  Case('Csv.load', lambda data: handycsv.Csv.load(data.text),
+       data_bytes=_text_bytes),
+  Case('Csv.read', lambda data: handycsv.Csv.read(data.files['.csv']),
+       data_bytes=_text_bytes),
+  Case('Csv.read.gz', lambda data: handycsv.Csv.read(data.files['.csv.gz']),
+       data_bytes=_text_bytes),
+  Case('Csv.to_string', lambda data: data.csv.to_string(),
+       data_bytes=_text_bytes),
+  Case('Csv.write', lambda data: data.csv.write(data.output),
+       data_bytes=_text_bytes),
+  Case('Csv.pretty', lambda data: data.csv.pretty(precision=3)),
+  Case('Csv.sort', lambda data: data.csv.sort(1, ignore_header=True)),
+  Case('Csv.transpose', lambda data: data.csv.transpose().raw),
+  Case('Csv.copy', lambda data: data.csv.copy()),
+  Case('GridStats.load', lambda data: handycsv.GridStats.load(data.text),
+       data_bytes=_text_bytes),
+  Case('GridStats.get', _get_all, setup=lambda data: data.grid, rows=_cells),
+  Case('GridStats.set', _set_all, setup=lambda data: data.grid.copy(),
+       rows=_cells),
+  Case('GridStats.filter_rows', _filter_rows,
+       setup=lambda data: data.grid.copy()),
+  Case('GridStats.add_row', _add_rows,
+       setup=lambda data: (data.grid.copy(), _single_ops(data)),
+       rows=_single_ops),
+  Case('GridStats.remove_row', _remove_rows,
+       setup=lambda data: (data.grid.copy(), _single_ops(data)),
+       rows=_single_ops),
+  Case('ColumnStats.load',
+       lambda data: handycsv.ColumnStats.load(data.column_text)),
+  Case('ColumnStats.get',
+       lambda stats: [stats.get(row) for row in stats.row_names()],
+       setup=lambda data: data.column),
+]
+
+
+def measure(case, data, repeat):
+  """
+  Times a case and measures its peak memory. The time is the best of 'repeat'
+  runs. The peak memory is measured in a separate run since tracing slows
+  allocations down.
+
+  Args:
+    case   (Case)    : the case
+    data   (Dataset) : the inputs
+    repeat (int)     : number of timed runs
+
+  Returns:
+    (dict) : seconds, rows_per_s, mb_per_s (or None) and peak_bytes
+  """
+  best = None
+  for _ in range(repeat):
+    state = case.setup(data)
+    gc.collect()
+    start = time.perf_counter()
+    case.run(state)
+    elapsed = time.perf_counter() - start
+    best = elapsed if best is None else min(best, elapsed)
+
+  state = case.setup(data)
+  gc.collect()
+  tracemalloc.start()
+  try:
+    case.run(state)
+    _, peak = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+
+  best = max(best, 1e-9)
+  data_bytes = case.data_bytes(data)
+  return {
+    'seconds': best,
+    'rows_per_s': case.rows(data) / best,
+    'mb_per_s': None if data_bytes is None else data_bytes / best / 1e6,
+    'peak_bytes': peak,
+  }
+
+
+def run(data, repeat=3, only=None, report=None):
+  """
+  Runs the cases and returns the results document.
+
+  Args:
+    data   (Dataset)  : the inputs
+    repeat (int)      : number of timed runs per case
+    only   (str)      : regular expression selecting the cases to run
+    report (callable) : called with the name and result of each case
+
+  Returns:
+    (dict) : 'meta' describing the run and 'results' keyed by case name
+  """
+  pattern = re.compile(only) if only else None
+  results = {}
+  for case in CASES:
+    if pattern is not None and not pattern.search(case.name):
+      continue
+    results[case.name] = measure(case, data, repeat)
+    if report is not None:
+      report(case.name, results[case.name])
+  return {
+    'meta': {
+      'handycsv': handycsv.__version__,
+      'python': platform.python_version(),
+      'machine': platform.machine(),
+      'rows': data.num_rows,
+      'columns': data.num_columns,
+      'bytes': data.bytes,
+      'repeat': repeat,
+    },
+    'results': results,
+  }
+
+
+def save(document, filename):
+  """
+  Writes a results document as JSON.
+
+  Args:
+    document (dict) : the results document
+    filename (str)  : name of file to write
+  """
+  with open(filename, 'w') as fd:
+    json.dump(document, fd, indent=2, sort_keys=True)
+    fd.write('\n')
+
+
+def load(filename):
+  """
+  Reads a results document written by save().
+
+  Args:
+    filename (str) : name of file to read
+  """
+  with open(filename) as fd:
+    return json.load(fd)
+
+
+def compare(document, baseline, threshold):
+  """
+  Compares the times of a run against a baseline run. Cases missing from
+  either run are ignored. Differently sized runs aren't comparable.
+
+  Args:
+    document  (dict)  : the results document of this run
+    baseline  (dict)  : the results document of the baseline run
+    threshold (float) : allowed slowdown as a fraction (0.25 is 25% slower)
+
+  Returns:
+    ([(str, float, float)]) : (name, baseline seconds, seconds) of each case
+                              slower than allowed
+  """
+  for field in ('rows', 'columns'):
+    if document['meta'][field] != baseline['meta'][field]:
+      raise ValueError('baseline was run with {}={}, not {}'.format(
+        field, baseline['meta'][field], document['meta'][field]))
+  regressions = []
+  for name, result in document['results'].items():
+    base = baseline['results'].get(name)
+    if base is None:
+      continue
+    if result['seconds'] > base['seconds'] * (1 + threshold):
+      regressions.append((name, base['seconds'], result['seconds']))
+  return regressions
+
+
+def format_result(name, result):
+  """
+  Returns a table line for the result of a case.
+
+  Args:
+    name   (str)  : the case name
+    result (dict) : the result from measure()
+  """
+  mb_per_s = result['mb_per_s']
+  return '{:<22} {:>10.4f} s {:>12.0f} rows/s {:>9} MB/s {:>9.1f} MB peak'.format(
+    name, result['seconds'], result['rows_per_s'],
+    '-' if mb_per_s is None else '{:.1f}'.format(mb_per_s),
+    result['peak_bytes'] / 1e6)
@@ -30,7 +30,15 @@
 """
 
 from .column_stats import ColumnStats
-from .csv import Csv
+from .columnar_csv import ColumnarCsv
+from .csv import Csv, TransposedCsv
+from .csv_index import CsvIndex, IndexedCsv
+from .csv_writer import CsvWriter
 from .grid_stats import GridStats
+from .instrument import Record, Recorder
+from .lazy_csv import LazyCsv
+from .parallel import ReadManyError
+from .read_cache import ReadCache
+from .views import ColumnView, RowView
 
-__version__ = '4.4.0'
+from ._version import __version__
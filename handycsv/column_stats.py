@@ -32,6 +32,11 @@ import gzip
 import re
 
 from .csv import Csv
+from .csv_writer import CsvWriter
+from . import instrument
+from .name_index import insert_name, position, remove_name
+from .optional import import_numpy, numpy_dtype, to_list
+from .parallel import read_many
 
 
 class ColumnStats(object):
@@ -83,44 +88,103 @@ class ColumnStats(object):
     """
     stats = ColumnStats()
     stats.csv = csv
-    if not stats.csv.is_rectangular:
-      raise ValueError('ColumnStats must be rectangular')
-    if stats.csv.num_columns(0) != 2:
-      raise ValueError('ColumnStats have 2 columns per row')
-    stats.__init_row_info()
+    with instrument.operation('ColumnStats.make_from_csv') as record, \
+         record.phase('index'):
+      if not stats.csv.is_rectangular:
+        raise ValueError('ColumnStats must be rectangular')
+      if stats.csv.num_columns(0) != 2:
+        raise ValueError('ColumnStats have 2 columns per row')
+      stats.__init_row_info()
     return stats
 
   @staticmethod
-  def load(text, transpose=False, delimiter=','):
+  def load(text, transpose=False, delimiter=',', dtypes=None):
     """
     Constructs a ColumnStats from a string
     Values default to int, then float, then str
 
     Args:
-      text      (str)  : text of the grid
-      transpose (bool) : to transpose the input
-      delimiter (str)  : value separator
+      text      (str)      : text of the grid
+      transpose (bool)     : to transpose the input
+      delimiter (str)      : value separator
+      dtypes    (list/str) : per-column types, 'infer', or None (see Csv.load)
     """
-    csv = Csv.load(text, transpose=transpose, delimiter=delimiter)
-    return ColumnStats.make_from_csv(csv)
+    with instrument.operation('ColumnStats.load'):
+      csv = Csv.load(text, transpose=transpose, delimiter=delimiter,
+                     dtypes=dtypes)
+      return ColumnStats.make_from_csv(csv)
 
   @staticmethod
-  def read(filename, transpose=False):
+  def read(filename, transpose=False, dtypes=None, workers=None, cache=None):
     """
     Constructs a ColumnStats from a CSV file
     Values default to int, then float, then str
 
     Args:
-      filename  (str)  : name of file to open (auto .gz if given)
-      transpose (bool) : to transpose the input
+      filename  (str)      : name of file to open (auto .gz if given)
+      transpose (bool)     : to transpose the input
+      dtypes    (list/str) : per-column types, 'infer', or None (see Csv.load)
+      workers   (int)      : parse an uncompressed file in this many processes
+      cache     (bool/str) : cache the parsed values (see Csv.read)
     """
-    csv = Csv.read(filename, transpose=transpose)
+    with instrument.operation('ColumnStats.read', filename):
+      csv = Csv.read(filename, transpose=transpose, dtypes=dtypes,
+                     workers=workers, cache=cache)
+      return ColumnStats.make_from_csv(csv)
+
+  @staticmethod
+  def read_many(filenames, workers=None, transpose=False, dtypes=None,
+                cache=None):
+    """
+    Constructs a ColumnStats from each of many CSV files, parsing them in a pool of
+    processes. The results are in the order of the filenames.
+
+    Args:
+      filenames ([str])    : names of files to open (auto .gz if given)
+      workers   (int)      : number of processes (None for the CPU count)
+      transpose (bool)     : to transpose the input
+      dtypes    (list/str) : per-column types, 'infer', or None (see Csv.load)
+      cache     (bool/str) : cache the parsed values (see Csv.read)
+
+    Raises:
+      ReadManyError : listing every file that failed, after trying them all
+    """
+    return read_many(ColumnStats.read, filenames, workers,
+                     {'transpose': transpose, 'dtypes': dtypes,
+                      'cache': cache})
+
+  @staticmethod
+  def from_ndarray(rows, values):
+    """
+    Constructs a ColumnStats from a 1D NumPy array and its row names.
+
+    Args:
+      rows   (ndarray or list) : the row specifiers
+      values (ndarray)         : the 1D array of values
+    """
+    rows = to_list(rows)
+    values = to_list(values)
+    if len(values) != len(rows):
+      raise ValueError('values must have one value per row name')
+    csv = Csv()
+    csv.raw = [[name, value] for name, value in zip(rows, values)]
     return ColumnStats.make_from_csv(csv)
 
   @property
   def source(self):
     return self.csv.source
 
+  def copy(self):
+    """
+    Returns a copy of this ColumnStats. The copy shares its values with this
+    one until either is modified (see Csv.copy).
+    """
+    stats = ColumnStats()
+    stats.csv = self.csv.copy()
+    stats.rows = list(self.rows)
+    stats.row_index = dict(self.row_index)
+    return stats
+
   def row_names(self):
     """
     Returns list of row names
@@ -154,15 +218,38 @@ class ColumnStats(object):
     """
     return self.csv.pretty(precision=precision, right_align=right_align)
 
-  def write(self, filename, transpose=False, delimiter=','):
+  def write(self, filename, transpose=False, delimiter=',', compresslevel=None,
+            threads=None):
     """
     Write the ColumnStats to a CSV file
 
     Args:
-      filename (str)   : name of file to write (auto .gz if given)
-      transpose (bool) : transpose the ColumnStats before writing
+      filename (str)      : name of file to write (auto compressed if given)
+      transpose (bool)    : transpose the ColumnStats before writing
+      compresslevel (int) : compression level, None for the codec's default
+      threads (int)       : compression threads (see CsvWriter)
     """
-    self.csv.write(filename, transpose=transpose, delimiter=delimiter)
+    self.csv.write(filename, transpose=transpose, delimiter=delimiter,
+                   compresslevel=compresslevel, threads=threads)
+
+  def append(self, filename, rows=None, delimiter=','):
+    """
+    Appends rows to a CSV file, creating it if it doesn't exist. Only the new
+    rows are written so the cost doesn't depend on the size of the file.
+
+    Args:
+      filename  (str)   : name of file to append to (auto .gz if given)
+      rows      ([str]) : the identifiers of the rows to append (None for all)
+      delimiter (str)   : value separator
+    """
+    if rows is None:
+      rows = self.rows
+    try:
+      indices = [self.row_index[row] for row in rows]
+    except KeyError as error:
+      raise IndexError('row={0} doesn\'t exist'.format(error.args[0]))
+    with CsvWriter(filename, delimiter=delimiter, append=True) as writer:
+      writer.write_rows(self.csv._row_values(index) for index in indices)
 
   def get(self, row, default=None):
     """
@@ -197,6 +284,24 @@ class ColumnStats(object):
     except KeyError:
       raise IndexError('row={0} doesn\'t exist'.format(row))
 
+  def to_ndarray(self, dtype=None, empty=None):
+    """
+    Returns the values as a 1D NumPy array along with an array of the row names.
+    NumPy is imported on demand. Without a dtype, anything other than all
+    numbers gives an 'object' array.
+
+    Args:
+      dtype : the dtype of the values array (None to infer)
+      empty : replacement for '' and None cells (None to keep)
+
+    Returns:
+      (ndarray, ndarray) : the values and row names
+    """
+    numpy = import_numpy()
+    values = self.csv.column_to_numpy(1, dtype=dtype, empty=empty)
+    rows = numpy.array(self.rows, dtype=numpy_dtype(self.rows, None))
+    return values, rows
+
   def remove_row(self, row):
     """
     This removes the specified row.
@@ -209,6 +314,20 @@ class ColumnStats(object):
     except KeyError:
       raise IndexError('row={0} doesn\'t exist'.format(row))
     self.csv.remove_row(row_index)
+    remove_name(self.rows, self.row_index, row_index, 0)
+
+  def remove_rows(self, rows):
+    """
+    This removes the specified rows in one pass.
+
+    Args:
+      rows ([str]) : the row identifiers
+    """
+    try:
+      row_indices = [self.row_index[row] for row in rows]
+    except KeyError as error:
+      raise IndexError('row={0} doesn\'t exist'.format(error.args[0]))
+    self.csv.remove_rows(row_indices)
     self.__init_row_info()
 
   def add_row(self, name, value, index=None):
@@ -220,13 +339,47 @@ class ColumnStats(object):
       value (value) : the value of the row
       index (int)   : location of row (None for end)
     """
-    if name in self.row_names():
+    if name in self.row_index:
       raise ValueError(f'row {name} already exists')
     new_row = [name, value]
-    if index is None:
-      index = len(self.row_names())
-    self.csv.add_row(new_row, index)
-    self.__init_row_info()
+    at = position(self.rows, index)
+    self.csv.add_row(new_row, at)
+    insert_name(self.rows, self.row_index, name, at, 0)
+
+  def filter(self, predicate, invert=False):
+    """
+    Returns a new ColumnStats holding the rows whose value passes a test,
+    leaving this one unchanged. The predicate is either a callable given the
+    typed value, or a compiled regular expression that must match its text. The
+    rows are checked in a single pass.
+
+    Args:
+      predicate (callable/Pattern) : the test of each value
+      invert    (bool)             : to keep the rows that fail the test instead
+
+    Returns:
+      (ColumnStats) : the filtered rows
+
+    Raises:
+      IndexError : if no row is kept, since a ColumnStats can't be empty
+    """
+    if hasattr(predicate, 'match'):
+      match = predicate.match
+      test = lambda value: match(str(value)) is not None
+    else:
+      test = predicate
+    # the kept rows are shared copy-on-write rather than copied
+    rows = self.csv._share_rows()
+    if invert:
+      kept = [row for row in rows if not test(row[1])]
+    else:
+      kept = [row for row in rows if test(row[1])]
+    if not kept:
+      raise IndexError('Can\'t filter out every row')
+    csv = Csv()
+    csv.raw = kept
+    csv._owned = set()
+    return ColumnStats.make_from_csv(csv)
 
   def filter_rows(self, regex, invert=False):
     """
@@ -242,18 +395,17 @@ class ColumnStats(object):
       removed ([str]) : the removed row identifiers
     """
     # check all rows
+    pattern = re.compile(regex)
     removed = []
-    for row in self.row_names():
+    for row, value in zip(self.row_names(), self.csv.get_column(1)):
       # determine if matched
-      value_str = str(self.get(row))
-      matched = re.match(regex, value_str)
+      matched = pattern.match(str(value))
 
       # mark to remove based on matched and invert
       if (not invert and matched) or (invert and not matched):
         removed.append(row)
 
     # remove the rows
-    for row in removed:
-      self.remove_row(row)
+    self.remove_rows(removed)
 
     return removed
@@ -0,0 +1,585 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import array
+import bisect
+
+from .csv import Csv
+from .optional import import_numpy
+
+
+def _normalize(index, length):
+  """
+  Converts a possibly negative index into a position, raising IndexError if it
+  is out of range.
+  """
+  if index < 0:
+    index += length
+  if not 0 <= index < length:
+    raise IndexError('index out of range')
+  return index
+
+
+class _Column(object):
+  """
+  This holds one column of values. Ints and floats are stored in a contiguous
+  array('q') or array('d'). Values that don't fit the array's type (e.g., names
+  or empty cells) are kept in a sparse dict keyed by position. Columns with too
+  many of these are demoted to a plain list.
+  """
+
+  # the fewest exceptions that can cause demotion to a list
+  MIN_DEMOTE = 16
+
+  def __init__(self, values=()):
+    """
+    Constructs a column holding the given values.
+
+    Args:
+      values (iterable) : the values of the column
+    """
+    self.data = array.array('q')
+    self.extra = {}
+    for value in values:
+      self.append(value)
+
+  def __len__(self):
+    return len(self.data)
+
+  def __getitem__(self, index):
+    extra = self.extra
+    if extra:
+      if index < 0:
+        index += len(self.data)
+      if index in extra:
+        return extra[index]
+    return self.data[index]
+
+  def _fits(self, value):
+    """
+    Returns True iff the value can be stored directly in the array.
+    """
+    if self.data.typecode == 'q':
+      return type(value) is int and -2**63 <= value < 2**63
+    return type(value) is float
+
+  def _store(self, index, value):
+    """
+    Stores a value at an existing position of an array backed column.
+    """
+    if self._fits(value):
+      self.data[index] = value
+      self.extra.pop(index, None)
+      return
+    others = len(self.extra) - (index in self.extra)
+    if (type(value) in (int, float) and others == len(self.data) - 1 and
+        (type(value) is float or -2**63 <= value < 2**63)):
+      # every other position is an exception, so the array can change type
+      code = 'q' if type(value) is int else 'd'
+      self.data = array.array(code, [0] * len(self.data))
+      self.data[index] = value
+      self.extra.pop(index, None)
+      return
+    self.extra[index] = value
+    if (len(self.extra) >= _Column.MIN_DEMOTE and
+        2 * len(self.extra) > len(self.data)):
+      self.data = self.tolist()
+      self.extra = None
+
+  def __setitem__(self, index, value):
+    if self.extra is None:
+      self.data[index] = value
+      return
+    index = _normalize(index, len(self.data))
+    self._store(index, value)
+
+  def append(self, value):
+    """
+    Appends a value to the end of the column.
+    """
+    if self.extra is None:
+      self.data.append(value)
+    elif self._fits(value):
+      self.data.append(value)
+    else:
+      self.data.append(0)
+      self._store(len(self.data) - 1, value)
+
+  def insert(self, index, value):
+    """
+    Inserts a value before the index (with list.insert semantics).
+    """
+    if self.extra is None:
+      self.data.insert(index, value)
+      return
+    length = len(self.data)
+    if index < 0:
+      index = max(0, index + length)
+    index = min(index, length)
+    if index == length:
+      self.append(value)
+      return
+    self.extra = {k + (k >= index): v for k, v in self.extra.items()}
+    self.data.insert(index, 0)
+    self._store(index, value)
+
+  def pop(self, index):
+    """
+    Removes and returns the value at the index.
+    """
+    if self.extra is None:
+      return self.data.pop(index)
+    index = _normalize(index, len(self.data))
+    value = self[index]
+    self.data.pop(index)
+    self.extra.pop(index, None)
+    self.extra = {k - (k > index): v for k, v in self.extra.items()}
+    return value
+
+  def remove(self, positions):
+    """
+    Removes the values at a set of positions in one pass.
+    """
+    removed = sorted(positions)
+    data = self.data
+    kept = data[:0]
+    previous = 0
+    for position in removed:
+      kept.extend(data[previous:position])
+      previous = position + 1
+    kept.extend(data[previous:])
+    self.data = kept
+    if self.extra:
+      self.extra = {k - bisect.bisect_left(removed, k): v
+                    for k, v in self.extra.items() if k not in positions}
+
+  def tolist(self, start=0, stop=None):
+    """
+    Returns the values in [start, stop) as a new list.
+    """
+    if stop is None:
+      stop = len(self.data)
+    values = self.data[start:stop]
+    if self.extra is None:
+      return values
+    values = values.tolist()
+    for index, value in self.extra.items():
+      if start <= index < stop:
+        values[index - start] = value
+    return values
+
+  def copy(self):
+    """
+    Returns a copy of this column.
+    """
+    column = _Column()
+    column.data = self.data[:]
+    column.extra = None if self.extra is None else dict(self.extra)
+    return column
+
+
+class ColumnarCsv(Csv):
+  """
+  This represents a rectangular CSV stored by column. Numeric columns are kept
+  in contiguous arrays which uses far less memory than Csv's list of lists and
+  makes column access a slice. The API matches Csv.
+  """
+
+  # number of rows materialized at a time when iterating over rows
+  BLOCK_ROWS = 4096
+
+  def __init__(self, row_lengths=None, source=None):
+    """
+    Constructs an empty CSV with the specified row lengths.
+
+    Args:
+      row_lengths [int] : a list of ints for each row length, all equal
+    """
+    # pylint: disable=super-init-not-called
+    self._source = source
+    self.raw = Csv(row_lengths=row_lengths).raw
+
+  @property
+  def raw(self):
+    """
+    The rows as a list of lists. This is built from the columns so modifying it
+    does not modify this object.
+    """
+    return [list(row) for row in self._rows()]
+
+  @raw.setter
+  def raw(self, rows):
+    self._num_rows = len(rows)
+    if rows and len(set(len(row) for row in rows)) != 1:
+      raise ValueError('ColumnarCsv must be rectangular')
+    self._columns = [_Column(column) for column in zip(*rows)]
+    self._owned = None
+
+  @staticmethod
+  def _make_from_rows(rows, transpose, source):
+    """
+    Constructs a ColumnarCsv from an iterable of rows without holding them all.
+    """
+    csv = ColumnarCsv()
+    csv._num_rows = 0
+    csv._columns = []
+    csv._owned = None
+    for row in rows:
+      if csv._num_rows == 0:
+        csv._columns = [_Column() for _ in row]
+      elif len(row) != len(csv._columns):
+        raise ValueError('ColumnarCsv must be rectangular')
+      for column, value in zip(csv._columns, row):
+        column.append(value)
+      csv._num_rows += 1
+    if csv._num_rows == 0:
+      csv.raw = [['']]
+    if transpose:
+      csv = csv.transpose()
+    csv._source = source
+    return csv
+
+  @staticmethod
+  def make_from_csv(csv):
+    """
+    Creates a ColumnarCsv holding a copy of the given Csv object's values.
+
+    Args:
+      csv (Csv) : the Csv object, must be rectangular
+    """
+    return ColumnarCsv._make_from_rows(csv._rows(), False, csv.source)
+
+  @staticmethod
+  def load(text, transpose=False, delimiter=',', dtypes=None):
+    """
+    Constructs a ColumnarCsv from a string.
+    Values default to int, then float, then str, unless dtypes is given.
+
+    Args:
+      text (str)        : text of the Csv
+      transpose (bool)  : to transpose the Csv
+      delimiter (str)   : value separator
+      dtypes (list/str) : per-column types, 'infer', or None (see Csv.load)
+    """
+    rows = Csv._parse_lines(text.split('\n'), delimiter, dtypes)
+    return ColumnarCsv._make_from_rows(rows, transpose, None)
+
+  @staticmethod
+  def read(filename, transpose=False, dtypes=None):
+    """
+    Constructs a ColumnarCsv from a CSV file. Rows are added to the columns as
+    they are parsed so the file is never fully held as lists.
+    Values default to int, then float, then str, unless dtypes is given.
+
+    Args:
+      filename (str)    : name of file to open (auto .gz if given)
+      transpose (bool)  : to transpose the Csv
+      dtypes (list/str) : per-column types, 'infer', or None (see Csv.load)
+    """
+    rows = Csv.iter_rows(filename, dtypes=dtypes)
+    return ColumnarCsv._make_from_rows(rows, transpose, filename)
+
+  def _rows(self):
+    """
+    Generates the rows, materializing a block of rows at a time.
+    """
+    block = ColumnarCsv.BLOCK_ROWS
+    for start in range(0, self._num_rows, block):
+      stop = min(start + block, self._num_rows)
+      yield from zip(*[column.tolist(start, stop) for column in self._columns])
+
+  def copy(self):
+    """
+    Returns a copy of this CSV. The copy shares its columns with this CSV until
+    either one modifies a column, which copies that column first.
+    """
+    csv = ColumnarCsv()
+    csv._num_rows = self._num_rows
+    csv._columns = list(self._columns)
+    csv._owned = set()
+    self._owned = set()
+    csv._source = self._source
+    return csv
+
+  def _own(self, column):
+    """
+    Returns a column for modification, copying it first if it may be shared
+    with a copy.
+
+    Args:
+      column (int) : column index
+    """
+    values = self._columns[column]
+    owned = self._owned
+    if owned is not None and id(values) not in owned:
+      values = values.copy()
+      self._columns[column] = values
+      owned.add(id(values))
+    return values
+
+  def _share_rows(self):
+    # the rows are built from the columns
+    return self._rows()
+
+  def _own_all(self):
+    """
+    Returns all columns for modification, copying any that may be shared.
+    """
+    if self._owned is not None:
+      for column in range(len(self._columns)):
+        self._own(column)
+    return self._columns
+
+  def num_rows(self):
+    """
+    Returns the number of rows.
+    """
+    return self._num_rows
+
+  def num_columns(self, row):
+    """
+    Return the number of columns for a specific row.
+
+    Args:
+      row (int) : row index
+    """
+    _normalize(row, self._num_rows)
+    return len(self._columns)
+
+  def row_lengths(self):
+    """
+    Returns a list of ints for row lengths.
+    """
+    return [len(self._columns)] * self._num_rows
+
+  def get_row(self, row):
+    """
+    Returns a whole row.
+
+    Args:
+      row (int) : row index
+    """
+    row = _normalize(row, self._num_rows)
+    return [column[row] for column in self._columns]
+
+  def _row_values(self, row):
+    return self.get_row(row)
+
+  def _column_values(self, column, start=0):
+    return self._columns[column].tolist(start)
+
+  def get(self, row, column, default=None):
+    """
+    Gets a value by reference of row and column.
+
+    Args:
+      row    (int) : row index
+      column (int) : column index
+      default      : default value if location is '' or None
+    """
+    val = self._columns[column][row]
+    if val is None or val == '':
+      if default is None:
+        return val
+      else:
+        return default
+    else:
+      return val
+
+  def set(self, row, column, value):
+    """
+    Sets a value by reference of row and column.
+
+    Args:
+      row    (int) : row index
+      column (int) : column index
+      value        : value
+    """
+    self._own(column)[row] = value
+
+  def get_column(self, column):
+    """
+    Retrieves a list of values from a full column.
+
+    Args:
+      column (int) : column index
+
+    Returns:
+      (list) : the values in the column
+    """
+    return self._columns[column].tolist()
+
+  def column_to_numpy(self, column, first_row=0, dtype=None, empty=None):
+    """
+    Returns the values of a column as a 1D NumPy array. When the column is an
+    array holding only numbers from first_row on, the result is a read-only
+    view of the storage without any copy. While such a view exists the column
+    can't change size.
+
+    Args:
+      column    (int) : column index
+      first_row (int) : index of the first row to include
+      dtype           : the dtype of the array (None to infer)
+      empty           : replacement for '' and None cells (None to keep)
+
+    Returns:
+      (ndarray) : the values
+    """
+    numpy = import_numpy()
+    col = self._columns[column]
+    if first_row < 0:
+      first_row += self._num_rows
+    if col.extra is not None and all(k < first_row for k in col.extra):
+      code = numpy.int64 if col.data.typecode == 'q' else numpy.float64
+      view = numpy.frombuffer(col.data, dtype=code)[first_row:]
+      view.flags.writeable = False
+      return view if dtype is None else view.astype(dtype, copy=False)
+    return Csv.column_to_numpy(self, column, first_row, dtype, empty)
+
+  def to_numpy(self, dtype=None, empty=None, first_row=0, first_column=0):
+    """
+    Returns the values as a 2D NumPy array, assembled column by column.
+
+    Args:
+      dtype              : the dtype of the array (None to infer)
+      empty              : replacement for '' and None cells (None to keep)
+      first_row    (int) : index of the first row to include
+      first_column (int) : index of the first column to include
+
+    Returns:
+      (ndarray) : the values
+    """
+    numpy = import_numpy()
+    columns = [self.column_to_numpy(column, first_row, dtype, empty)
+               for column in range(len(self._columns))[first_column:]]
+    if not columns:
+      return numpy.empty((max(0, self._num_rows - first_row), 0), dtype=dtype)
+    return numpy.column_stack(columns)
+
+  def remove_row(self, row):
+    """
+    This removes the specified row.
+
+    Args:
+      row (int) : row index
+    """
+    if self._num_rows < 2:
+      raise IndexError('Can\'t remove the only row')
+    row = _normalize(row, self._num_rows)
+    for column in self._own_all():
+      column.pop(row)
+    self._num_rows -= 1
+
+  def remove_column(self, column):
+    """
+    This removes the specified column.
+
+    Args:
+      column (int) : column index
+    """
+    _normalize(column, len(self._columns))
+    if len(self._columns) == 1:
+      raise IndexError('rows only have one element, '
+                       'removing the column would make empty rows')
+    self._columns.pop(column)
+
+  def remove_rows(self, rows):
+    """
+    This removes the specified rows, compacting each column in one pass.
+
+    Args:
+      rows ([int]) : row indices
+    """
+    removed = Csv._positions(rows, self._num_rows)
+    if not removed:
+      return
+    if len(removed) == self._num_rows:
+      raise IndexError('Can\'t remove every row')
+    for column in self._own_all():
+      column.remove(removed)
+    self._num_rows -= len(removed)
+
+  def remove_columns(self, columns):
+    """
+    This removes the specified columns.
+
+    Args:
+      columns ([int]) : column indices
+    """
+    removed = Csv._positions(columns, len(self._columns))
+    if not removed:
+      return
+    if len(removed) == len(self._columns):
+      raise IndexError('removing every column would make empty rows')
+    self._columns = [column for index, column in enumerate(self._columns)
+                     if index not in removed]
+
+  def add_row(self, row, index):
+    """
+    This adds a row at the specified index.
+
+    Args:
+      row   ([values]) : the new row contents
+      index (int)      : the new row's index
+    """
+    row = list(row)
+    if len(row) != len(self._columns):
+      raise ValueError('The length of row must match the current number of '
+                       'columns')
+    for column, value in zip(self._own_all(), row):
+      column.insert(index, value)
+    self._num_rows += 1
+
+  def add_column(self, column, index):
+    """
+    This adds a column at the specified index.
+
+    Args:
+      column ([values]) : the new column contents
+      index  (int)      : the new column's index
+    """
+    if len(column) != self._num_rows:
+      raise ValueError('The length of column must match the current number of '
+                       'rows')
+    self._columns.insert(index, _Column(column))
+
+  def is_rectangular(self):
+    """
+    Return True iff the Csv is rectangular, which is always.
+    """
+    return True
+
+  def transpose(self):
+    """
+    Returns a tranpose of this object.
+    """
+    csv = ColumnarCsv()
+    csv.raw = [column.tolist() for column in self._columns]
+    return csv
@@ -0,0 +1,172 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import bz2
+import gzip
+import importlib
+import importlib.util
+import lzma
+
+# extension -> opener(filename, mode, compresslevel, threads)
+_CODECS = {}
+
+
+def register_codec(extension, opener):
+  """
+  Registers a compression format for files whose name ends with an extension,
+  replacing any codec registered for it.
+
+  Args:
+    extension (str)      : the extension including the dot (e.g., '.gz')
+    opener    (callable) : opener(filename, mode, compresslevel, threads)
+                           returning a binary file object for the modes 'rb',
+                           'wb' and 'ab'. compresslevel and threads are None
+                           for the codec's defaults and only apply to writing.
+  """
+  if not extension.startswith('.') or len(extension) < 2:
+    raise ValueError('invalid extension: {}'.format(extension))
+  _CODECS[extension] = opener
+
+
+def codec_extensions():
+  """
+  Returns the extensions of the registered codecs.
+  """
+  return sorted(_CODECS)
+
+
+def _codec(filename):
+  """
+  Returns the opener of the codec for a file, or None if it isn't compressed.
+  """
+  dot = filename.rfind('.')
+  if dot < 0:
+    return None
+  return _CODECS.get(filename[dot:])
+
+
+def is_compressed(filename):
+  """
+  Returns True iff the file is compressed, judging by its extension.
+
+  Args:
+    filename (str) : name of the file
+  """
+  return _codec(filename) is not None
+
+
+def open_file(filename, mode, compresslevel=None, threads=None):
+  """
+  Opens a file in binary mode, compressed if its extension is that of a
+  registered codec (by default '.gz', '.bz2', '.xz' and '.zst' if a zstd
+  module is available).
+
+  Args:
+    filename      (str) : name of the file to open
+    mode          (str) : binary file mode (e.g., 'rb', 'wb')
+    compresslevel (int) : compression level when writing, None for the codec's
+                          default (ignored for uncompressed files)
+    threads       (int) : compression threads when writing, for codecs that
+                          support them (ignored otherwise)
+
+  Returns:
+    (file) : the opened file object
+  """
+  opener = _codec(filename)
+  if opener is None:
+    return open(filename, mode)
+  return opener(filename, mode, compresslevel, threads)
+
+
+def _writing(mode):
+  return 'r' not in mode
+
+
+def _open_gzip(filename, mode, compresslevel, _threads):
+  if compresslevel is None or not _writing(mode):
+    return gzip.open(filename, mode)
+  return gzip.open(filename, mode, compresslevel=compresslevel)
+
+
+def _open_bz2(filename, mode, compresslevel, _threads):
+  if compresslevel is None or not _writing(mode):
+    return bz2.open(filename, mode)
+  return bz2.open(filename, mode, compresslevel=compresslevel)
+
+
+def _open_lzma(filename, mode, compresslevel, _threads):
+  if compresslevel is None or not _writing(mode):
+    return lzma.open(filename, mode)
+  return lzma.open(filename, mode, preset=compresslevel)
+
+
+# the zstd module of the standard library (Python 3.14+), then the package
+_ZSTD_MODULES = ('compression.zstd', 'zstandard')
+
+
+def _zstd_module():
+  """
+  Returns the name of the first zstd module available, or None. The module
+  isn't imported until a file is opened.
+  """
+  for name in _ZSTD_MODULES:
+    try:
+      if importlib.util.find_spec(name) is not None:
+        return name
+    except ImportError:
+      pass
+  return None
+
+
+def _open_zstd(filename, mode, compresslevel, threads):
+  zstd = importlib.import_module(_zstd_module())
+  writing = _writing(mode)
+  if zstd.__name__ == 'zstandard':
+    if not writing:
+      return zstd.open(filename, mode)
+    cctx = zstd.ZstdCompressor(
+      level=3 if compresslevel is None else compresslevel,
+      threads=threads or 0)
+    return zstd.open(filename, mode, cctx=cctx)
+  if not writing:
+    return zstd.open(filename, mode)
+  if not threads:
+    return zstd.open(filename, mode, level=compresslevel)
+  options = {zstd.CompressionParameter.nb_workers: threads}
+  if compresslevel is not None:
+    options[zstd.CompressionParameter.compression_level] = compresslevel
+  return zstd.open(filename, mode, options=options)
+
+
+register_codec('.gz', _open_gzip)
+register_codec('.bz2', _open_bz2)
+register_codec('.xz', _open_lzma)
+if _zstd_module() is not None:
+  register_codec('.zst', _open_zstd)
@@ -28,8 +28,20 @@
  * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
  * POSSIBILITY OF SUCH DAMAGE.
 """
-import copy
-import gzip
+import collections
+import contextlib
+import itertools
+import operator
+import os
+
+from .compression import is_compressed, open_file
+from .csv_writer import CsvWriter
+from .external_sort import external_sort, row_key
+from . import instrument
+from . import parse_cache
+from .optional import import_numpy, numpy_dtype
+from .parallel import map_processes, read_many, split_file
+from .views import ColumnView, RowView
 
 
 class Csv(object):
@@ -37,6 +49,15 @@ class Csv(object):
   This represents CSV file, a list if comma separated values.
   """
 
+  # number of rows (after the first) sampled when inferring dtypes
+  INFER_ROWS = 1000
+
+  # number of byte ranges per process when parsing a file in parallel
+  SPLITS_PER_WORKER = 4
+
+  # default maximum size of the text of each run when sorting a file
+  SORT_RUN_BYTES = 64 * 2**20
+
   def __init__(self, row_lengths=None, source=None):
     """
     Constructs an empty CSV with the specified row lengths.
@@ -46,6 +67,7 @@ class Csv(object):
     """
     self.raw = []
     self._source = source
+    self._owned = None  # ids of rows not shared with copies, None for all
 
     if row_lengths is None:
       row_lengths = [1]
@@ -71,69 +93,538 @@ class Csv(object):
         return str(value)
 
   @staticmethod
-  def load(text, transpose=False, delimiter=','):
+  def infer_dtypes(rows):
     """
-    Constructs a CSV from a string.
-    Values default to int, then float, then str.
+    Infers a per-column type from a sample of unconverted rows. A column is int,
+    float, or str when all of its non-empty cells are of that type, otherwise
+    it is None (autotyped per cell).
 
     Args:
-      text (str)       : text of the Csv
-      transpose (bool) : to transpose the Csv
-      delimiter (str)  : value separator
+      rows ([[str]]) : the sample rows as lists of strings
+
+    Returns:
+      ([type]) : the type of each column
     """
-    csv = Csv()
-    csv.raw = []
+    kinds = []
+    for row in rows:
+      for column, value in enumerate(row):
+        if column == len(kinds):
+          kinds.append(set())
+        if value:
+          kinds[column].add(type(Csv.autotype(value)))
+    return [kind.pop() if len(kind) == 1 else None for kind in kinds]
+
+  @staticmethod
+  def _counting_autotype(counters):
+    """
+    Returns an autotype() that counts the values that aren't int.
+
+    Args:
+      counters (Counter) : counts 'autotype_float' and 'autotype_str'
+    """
+    def autotype(value):
+      try:
+        return int(value)
+      except ValueError:
+        try:
+          value = float(value)
+          counters['autotype_float'] += 1
+          return value
+        except ValueError:
+          counters['autotype_str'] += 1
+          return str(value)
+    return autotype
 
-    # break text into lines
-    lines = text.strip().split('\n')
+  @staticmethod
+  def _converter(dtype, autotype=None, counters=None):
+    """
+    Returns a function converting a cell string to the given type. Cells
+    violating the type fall back to autotype() and empty cells stay empty.
+
+    Args:
+      dtype    (callable) : the column type (e.g., int, float, str) or None
+      autotype (callable) : the fallback, Csv.autotype if None
+      counters (Counter)  : counts the violating cells as 'dtype_fallback'
+    """
+    autotype = autotype or Csv.autotype
+    if dtype is None:
+      return autotype
+    if dtype is str:
+      return str
+
+    def convert(value):
+      if not value:
+        return value
+      try:
+        return dtype(value)
+      except ValueError:
+        if counters is not None:
+          counters['dtype_fallback'] += 1
+        return autotype(value)
+    return convert
+
+  @staticmethod
+  def _row_parser(delimiter, dtypes=None, counters=None):
+    """
+    Returns a function that splits a line into a row of typed values.
+
+    Args:
+      delimiter (str)     : value separator
+      dtypes    ([type])  : per-column types, None to autotype everything
+      counters  (Counter) : counts the type fallbacks (see instrument.Record)
+    """
+    if counters is None:
+      autotype = Csv.autotype
+    else:
+      autotype = Csv._counting_autotype(counters)
+    if not dtypes:
+      return lambda line: [autotype(x.strip()) for x in line.split(delimiter)]
+
+    converters = [Csv._converter(dtype, autotype, counters)
+                  for dtype in dtypes]
+    num_typed = len(converters)
+
+    def parse(line):
+      cells = [x.strip() for x in line.split(delimiter)]
+      row = [convert(x) for convert, x in zip(converters, cells)]
+      if len(cells) > num_typed:
+        row.extend(autotype(x) for x in cells[num_typed:])
+      return row
+    return parse
+
+  @staticmethod
+  def _iter_lines(lines):
+    """
+    Generates the lines that make up rows from an iterable of lines. This
+    mirrors stripping the whole text before splitting it: leading and trailing
+    blank lines are dropped, the first line is left stripped, and the last line
+    is right stripped. Only one line plus any interior blank lines are held at a
+    time.
 
-    # break lines into raw data (columnar pieces)
+    Args:
+      lines (iterable) : lines of text, optionally '\n' terminated
+    """
+    pending = None  # the last non-blank line seen
+    blanks = []     # blank lines seen after the pending line
     for line in lines:
-      columns = line.split(delimiter)
-      columns = [x.strip() for x in columns]
+      if line.endswith('\n'):
+        line = line[:-1]
+      if not line.strip():
+        if pending is not None:
+          blanks.append(line)
+        continue
+      if pending is None:
+        pending = line.lstrip()
+        continue
+      yield pending
+      yield from blanks
+      blanks = []
+      pending = line
+    if pending is not None:
+      yield pending.rstrip()
+
+  @staticmethod
+  def _resolve_dtypes(sample, delimiter, dtypes):
+    """
+    Returns concrete per-column types given the first lines of the data.
+
+    Args:
+      sample    ([str])         : the first lines (up to INFER_ROWS + 1)
+      delimiter (str)           : value separator
+      dtypes    ([type] or str) : per-column types, 'infer', or None
+    """
+    if not isinstance(dtypes, str):
+      return dtypes
+    if dtypes != 'infer':
+      raise ValueError('invalid dtypes: {}'.format(dtypes))
+    return Csv.infer_dtypes(
+      [[x.strip() for x in line.split(delimiter)] for line in sample[1:]])
+
+  @staticmethod
+  def _parse_lines(lines, delimiter, dtypes=None, record=None):
+    """
+    Generates rows from an iterable of lines.
+
+    Args:
+      lines     (iterable)      : lines of text, optionally '\n' terminated
+      delimiter (str)           : value separator
+      dtypes    ([type] or str) : per-column types, 'infer', or None
+      record    (Record)        : an instrument.Record to time the 'split' and
+                                  'parse' phases and count type fallbacks in
+    """
+    lines = Csv._iter_lines(lines)
+    if record is not None:
+      lines = instrument.timed(record, 'split', lines)
+    counters = None if record is None else record.counters
+    parse_first = None
+    if isinstance(dtypes, str):
+      sample = list(itertools.islice(lines, Csv.INFER_ROWS + 1))
+      dtypes = Csv._resolve_dtypes(sample, delimiter, dtypes)
+      lines = itertools.chain(sample, lines)
+      # the types are inferred from the rows after the first, so the first row
+      # (usually a header) is autotyped
+      parse_first = Csv._row_parser(delimiter, None, counters)
+    rows = map(Csv._row_parser(delimiter, dtypes, counters), lines)
+    if parse_first is not None:
+      rows = itertools.chain(map(parse_first, itertools.islice(lines, 1)), rows)
+    if record is None:
+      yield from rows
+    else:
+      yield from instrument.timed(record, 'parse', rows)
 
-      # transform values
-      for idx in range(0, len(columns)):
-        columns[idx] = Csv.autotype(columns[idx])
+  @staticmethod
+  def load(text, transpose=False, delimiter=',', dtypes=None):
+    """
+    Constructs a CSV from a string.
+    Values default to int, then float, then str, unless dtypes is given. Cells
+    that violate their column's type are autotyped.
 
-      # push new row into rows list
-      csv.raw.append(columns)
+    Args:
+      text (str)        : text of the Csv
+      transpose (bool)  : to transpose the Csv
+      delimiter (str)   : value separator
+      dtypes (list/str) : per-column types (e.g., int, float, str, or None to
+                          autotype), 'infer' to infer them from a sample of rows
+                          after the first (the first row is autotyped), or None
+                          to autotype all values
+    """
+    csv = Csv()
+    if instrument.active() is not None:
+      with instrument.operation('Csv.load') as record:
+        record.bytes += instrument.utf8_len(text)
+        with record.phase('split'):
+          lines = text.split('\n')
+        csv.raw = list(Csv._parse_lines(lines, delimiter, dtypes, record))
+        record.rows += len(csv.raw)
+    else:
+      csv.raw = list(Csv._parse_lines(text.split('\n'), delimiter, dtypes))
+    if not csv.raw:
+      csv.raw = [['']]
 
     # transpose if required
     if transpose:
-      csv = csv.transpose()
+      csv._check_rectangular()
+      csv = TransposedCsv(csv)
 
     return csv
 
   @staticmethod
-  def read(filename, transpose=False):
+  def iter_rows(filename, delimiter=',', dtypes=None):
     """
-    Constructs a CSV from a CSV file.
+    Generates the rows of a CSV file one at a time.
+    Values default to int, then float, then str, unless dtypes is given.
+    The file is decompressed and parsed incrementally so memory use does not
+    depend on the file size.
+
+    Args:
+      filename  (str)      : name of file to open (auto .gz if given)
+      delimiter (str)      : value separator
+      dtypes    (list/str) : per-column types, 'infer', or None (see load())
+
+    Yields:
+      (list) : the values of each row
+    """
+    with open_file(filename, 'rb') as fd:
+      lines = (line.decode('utf-8') for line in fd)
+      yield from Csv._parse_lines(lines, delimiter, dtypes)
+
+  @staticmethod
+  def iter_chunks(filename, max_rows=None, max_bytes=None, header=False,
+                  delimiter=',', dtypes=None):
+    """
+    Generates successive Csv objects holding consecutive rows of a CSV file.
     Values default to int, then float, then str.
+    At least one of max_rows and max_bytes must be given. The byte limit is
+    measured on the decompressed text and is approximate, but every chunk holds
+    at least one row.
 
     Args:
-      filename (str)   : name of file to open (auto .gz if given)
-      transpose (bool) : to transpose the Csv
+      filename  (str)      : name of file to open (auto .gz if given)
+      max_rows  (int)      : maximum number of rows per chunk
+      max_bytes (int)      : maximum size of the text of each chunk
+      header    (bool)     : prepend the file's first row to every chunk
+      delimiter (str)      : value separator
+      dtypes    (list/str) : per-column types, 'infer', or None (see load())
+
+    Yields:
+      (Csv) : the next chunk of rows
     """
-    # open file and get all lines
-    opener = gzip.open if filename.endswith('.gz') else open
-    with opener(filename, 'rb') as fd:
-      text = fd.read().decode('utf-8')
-    csv = Csv.load(text, transpose)
+    if max_rows is None and max_bytes is None:
+      raise ValueError('max_rows or max_bytes must be specified')
+    if max_rows is not None and max_rows < 1:
+      raise ValueError('max_rows must be >= 1')
+    if max_bytes is not None and max_bytes < 1:
+      raise ValueError('max_bytes must be >= 1')
+
+    def make_chunk(head, rows):
+      csv = Csv()
+      csv.raw = rows if head is None else [list(head)] + rows
+      csv._source = filename
+      return csv
+
+    # the size of each line that will become a row, in order; the rows are
+    # parsed after the lines are read (more so when inferring dtypes)
+    sizes = collections.deque()
+    def read_lines(fd):
+      started = False
+      for line in fd:
+        # leading blank lines don't become rows
+        started = started or bool(line.strip())
+        if started:
+          sizes.append(len(line))
+          yield line.decode('utf-8')
+
+    with open_file(filename, 'rb') as fd:
+      rows = Csv._parse_lines(read_lines(fd), delimiter, dtypes)
+      head = None
+      if header:
+        head = next(rows, None)
+        if head is not None:
+          sizes.popleft()
+      chunk = []
+      chunk_bytes = 0
+      for row in rows:
+        row_bytes = sizes.popleft()
+        if chunk and ((max_rows is not None and len(chunk) >= max_rows) or
+                      (max_bytes is not None and
+                       chunk_bytes + row_bytes > max_bytes)):
+          yield make_chunk(head, chunk)
+          chunk = []
+          chunk_bytes = 0
+        chunk.append(row)
+        chunk_bytes += row_bytes
+      if chunk:
+        yield make_chunk(head, chunk)
+
+  @staticmethod
+  def _read_parallel(filename, workers, delimiter, dtypes):
+    """
+    Parses an uncompressed file by splitting it into line aligned byte ranges
+    that are parsed in a pool of processes. The result is identical to parsing
+    it serially.
+
+    Returns:
+      ([list]) : the rows
+    """
+    inferred = isinstance(dtypes, str)
+    if inferred:
+      with open(filename, 'rb') as fd:
+        lines = Csv._iter_lines(line.decode('utf-8') for line in fd)
+        sample = list(itertools.islice(lines, Csv.INFER_ROWS + 1))
+      dtypes = Csv._resolve_dtypes(sample, delimiter, dtypes)
+
+    ranges = split_file(filename, workers * Csv.SPLITS_PER_WORKER)
+    parts = map_processes(
+      _parse_range, [(filename, start, end, delimiter, dtypes)
+                     for start, end in ranges], workers)
+
+    # stitches the parts, finding the first and last non-blank lines
+    rows = []
+    first = None
+    last = None
+    for part_rows, part_first, part_last in parts:
+      if part_first is not None:
+        if first is None:
+          first = (len(rows) + part_first[0], part_first[1])
+        last = (len(rows) + part_last[0], part_last[1])
+      rows.extend(part_rows)
+    if first is None:
+      return []
+
+    # drops the leading and trailing blank lines and strips the edge lines
+    del rows[last[0] + 1:]
+    del rows[:first[0]]
+    parse = Csv._row_parser(delimiter, dtypes)
+    # with inferred types the first row is autotyped (see _parse_lines())
+    parse_first = Csv._row_parser(delimiter, None if inferred else dtypes)
+    if len(rows) == 1:
+      rows[0] = parse_first(first[1].strip())
+    else:
+      rows[0] = parse_first(first[1].lstrip())
+      rows[-1] = parse(last[1].rstrip())
+    return rows
+
+  @staticmethod
+  def read(filename, transpose=False, dtypes=None, workers=None, cache=None):
+    """
+    Constructs a CSV from a CSV file.
+    Values default to int, then float, then str, unless dtypes is given.
+    With a cache, the parsed values are saved in binary form and later reads
+    of the unchanged file load them instead of parsing it again.
+
+    Args:
+      filename (str)    : name of file to open (auto .gz if given)
+      transpose (bool)  : to transpose the Csv
+      dtypes (list/str) : per-column types, 'infer', or None (see load())
+      workers (int)     : parse an uncompressed file in this many processes
+                          (None or 1 parses serially)
+      cache (bool/str)  : True to cache next to the file, or a directory
+                          holding cache files (None or False doesn't cache).
+                          Reads with unnamed dtypes (e.g., lambdas) aren't
+                          cached.
+    """
+    if workers is not None and workers < 1:
+      raise ValueError('workers must be >= 1')
+    if instrument.active() is not None:
+      return Csv._read_recorded(filename, transpose, dtypes, workers, cache)
+    csv = Csv()
+    rows = parse_cache.load(filename, cache, dtypes) if cache else None
+    if rows is not None:
+      csv.raw = rows
+    else:
+      stat = os.stat(filename)
+      if workers is not None and workers > 1 and not is_compressed(filename):
+        csv.raw = Csv._read_parallel(filename, workers, ',', dtypes)
+      else:
+        csv.raw = list(Csv.iter_rows(filename, dtypes=dtypes))
+      if not csv.raw:
+        csv.raw = [['']]
+      if cache:
+        parse_cache.save(filename, cache, dtypes, stat, csv.raw)
+    if transpose:
+      csv._check_rectangular()
+      csv = TransposedCsv(csv)
     csv._source = filename
     return csv
 
+  @staticmethod
+  def _read_recorded(filename, transpose, dtypes, workers, cache):
+    """
+    Csv.read() while an instrument.Recorder is enabled. The file streams
+    through the same stages as iter_rows(), each timed as a phase.
+    """
+    with instrument.operation('Csv.read', filename) as record:
+      csv = Csv()
+      rows = None
+      if cache:
+        with record.phase('cache'):
+          rows = parse_cache.load(filename, cache, dtypes)
+        record.counters['cache_hit' if rows is not None else 'cache_miss'] += 1
+        if rows is not None:
+          record.rows += len(rows)
+      if rows is None:
+        stat = os.stat(filename)
+        if workers is not None and workers > 1 and not is_compressed(filename):
+          with record.phase('parallel'):
+            rows = Csv._read_parallel(filename, workers, ',', dtypes)
+          record.rows += len(rows)
+        else:
+          # the stages of iter_rows(), each timed as it streams
+          with open_file(filename, 'rb') as fd:
+            data = instrument.timed(record, 'decompress', fd, len)
+            lines = instrument.timed(record, 'decode',
+                                     (line.decode('utf-8') for line in data))
+            rows = list(Csv._parse_lines(lines, ',', dtypes, record))
+          record.rows += len(rows)
+        if not rows:
+          rows = [['']]
+        if cache:
+          with record.phase('cache_save'):
+            parse_cache.save(filename, cache, dtypes, stat, rows)
+      csv.raw = rows
+      if transpose:
+        csv._check_rectangular()
+        csv = TransposedCsv(csv)
+      csv._source = filename
+      return csv
+
+  @staticmethod
+  def read_many(filenames, workers=None, transpose=False, dtypes=None,
+                cache=None):
+    """
+    Constructs a Csv from each of many CSV files, parsing them in a pool of
+    processes. The results are in the order of the filenames.
+
+    Args:
+      filenames ([str])    : names of files to open (auto .gz if given)
+      workers   (int)      : number of processes (None for the CPU count)
+      transpose (bool)     : to transpose the input
+      dtypes    (list/str) : per-column types, 'infer', or None (see Csv.load)
+      cache     (bool/str) : cache the parsed values (see Csv.read)
+
+    Raises:
+      ReadManyError : listing every file that failed, after trying them all
+    """
+    return read_many(Csv.read, filenames, workers,
+                     {'transpose': transpose, 'dtypes': dtypes,
+                      'cache': cache})
+
+  @staticmethod
+  def from_numpy(values):
+    """
+    Constructs a CSV from a 2D NumPy array (or nested sequence).
+
+    Args:
+      values (ndarray) : the 2D array of values
+    """
+    raw = values.tolist() if hasattr(values, 'tolist') else values
+    if not raw or not all(isinstance(row, (list, tuple)) and row
+                          for row in raw):
+      raise ValueError('values must be a non-empty 2D array')
+    csv = Csv()
+    csv.raw = [list(row) for row in raw]
+    return csv
+
   @property
   def source(self):
     return self._source
 
+  def _rows(self):
+    """
+    Returns an iterable over the rows for read-only internal use. The rows are
+    not copied so they must not be modified.
+    """
+    return self.raw
+
   def copy(self):
-    """Returns a copy of this CSV."""
+    """
+    Returns a copy of this CSV. The copy shares its rows with this CSV until
+    either one modifies a row through set() or a column change, which copies
+    that row first. Copying is therefore cheap until the copies are modified.
+    """
     csv = Csv()
-    csv.raw = copy.deepcopy(self.raw)
+    csv.raw = list(self.raw)
+    csv._owned = set()
+    self._owned = set()
     csv._source = self._source
     return csv
 
+  def _share_rows(self):
+    """
+    Returns an iterable over the rows for another Csv to hold without copying
+    them, like copy() does. The other Csv must treat them as shared too.
+    """
+    self._owned = set()
+    return self.raw
+
+  def _own(self, row):
+    """
+    Returns a row's values for modification, copying the row first if it may
+    be shared with a copy.
+
+    Args:
+      row (int) : row index
+    """
+    values = self.raw[row]
+    owned = self._owned
+    if owned is not None and id(values) not in owned:
+      values = list(values)
+      self.raw[row] = values
+      owned.add(id(values))
+    return values
+
+  def _own_all(self):
+    """
+    Returns all rows for modification, copying any that may be shared with a
+    copy.
+    """
+    owned = self._owned
+    if owned is not None:
+      self.raw = [values if id(values) in owned else list(values)
+                  for values in self.raw]
+      self._owned = None
+    return self.raw
+
   def num_rows(self):
     """
     Returns the number of rows.
@@ -174,10 +665,8 @@ class Csv(object):
     Args:
       delimiter (str) : delimiter for value separation
     """
-    xsv = ''
-    for row in self.raw:
-      xsv += delimiter.join([str(x) for x in row]) + '\n'
-    return xsv
+    return ''.join(delimiter.join([str(x) for x in row]) + '\n'
+                   for row in self._rows())
 
   def pretty(self, precision=None, right_align=False):
     """
@@ -194,11 +683,7 @@ class Csv(object):
         return str(x)
 
     # Creates a properly stringified copy
-    raw = []
-    for r in range(len(self.raw)):
-      raw.append([])
-      for c in range(len(self.raw[r])):
-        raw[r].append(stringify(self.get(r, c)))
+    raw = [[stringify(x) for x in row] for row in self._rows()]
 
     # Computes the max text width of each column
     max_columns = max(len(r) for r in raw)
@@ -221,37 +706,84 @@ class Csv(object):
           raw[r][c] = raw[r][c] + whitespace
 
     # Creates the final string
-    pcsv = ''
-    for row in raw:
-      pcsv += (' '.join(row)).rstrip() + '\n'
-    return pcsv
+    return ''.join((' '.join(row)).rstrip() + '\n' for row in raw)
 
-  def write(self, filename, transpose=False, delimiter=','):
+  def write(self, filename, transpose=False, delimiter=',', compresslevel=None,
+            threads=None):
     """
-    Write the CSV to a file.
+    Write the CSV to a file. Rows are streamed to the file as they are
+    formatted.
 
     Args:
-      filename (str)   : name of file to write (auto .gz if given)
-      transpose (bool) : transpose before writing
+      filename (str)      : name of file to write (auto compressed if given)
+      transpose (bool)    : write the columns as rows
+      compresslevel (int) : compression level, None for the codec's default
+      threads (int)       : compression threads (see CsvWriter)
     """
-    csv = self.transpose() if transpose else self
-
-    if not csv.raw:
+    if self.num_rows() == 0:
       raise ValueError('unintialized CSV can not be written to a file')
 
-    # open file to write
-    opener = gzip.open if filename.endswith('.gz') else open
-    with opener(filename, 'wb') as fd:
-      fd.write(bytes(csv.to_string(delimiter=delimiter), 'utf-8'))
+    if transpose:
+      self._check_rectangular()
+      rows = (self._column_values(column)
+              for column in range(self.num_columns(0)))
+    else:
+      rows = self._rows()
+    with instrument.operation('Csv.write', filename), \
+         CsvWriter(filename, delimiter=delimiter, compresslevel=compresslevel,
+                   threads=threads) as writer:
+      writer.write_rows(rows)
+
+  def _row_values(self, row):
+    """
+    Returns a row's values for read-only internal use. The values are not
+    copied so they must not be modified.
+    """
+    return self.raw[row]
+
+  def _column_values(self, column, start=0):
+    """
+    Returns an iterable over a column's values from row 'start' on, for
+    read-only internal use.
+    """
+    rows = itertools.islice(self._rows(), start, None)
+    return (values[column] for values in rows)
 
   def get_row(self, row):
     """
-    Returns a whole row.
+    Returns a whole row as a new list. The values themselves aren't copied.
+    Use row_view() to read a row without copying it.
+
+    Args:
+      row (int) : row index
+    """
+    return list(self._row_values(row))
+
+  def row_view(self, row):
+    """
+    Returns a read-only view of a row which doesn't copy it.
 
     Args:
       row (int) : row index
+
+    Returns:
+      (RowView) : the view, indexable by column position
+    """
+    self._row_values(row)  # checks the row exists
+    return RowView(self, row)
+
+  def column_view(self, column):
+    """
+    Returns a read-only view of a column which doesn't copy it.
+    Requires all rows to have this column.
+
+    Args:
+      column (int) : column index
+
+    Returns:
+      (ColumnView) : the view, indexable by row position
     """
-    return copy.deepcopy(self.raw[row])
+    return ColumnView(self, column)
 
   def get(self, row, column, default=None):
     """
@@ -280,7 +812,7 @@ class Csv(object):
       column (int) : column index
       value        : value
     """
-    self.raw[row][column] = value
+    self._own(row)[column] = value
 
   def get_column(self, column):
     """
@@ -293,10 +825,53 @@ class Csv(object):
     Returns:
       (list) : the values in the column
     """
-    column_values = []
-    for row in range(self.num_rows()):
-      column_values.append(self.raw[row][column])
-    return column_values
+    return [values[column] for values in self._rows()]
+
+  def to_numpy(self, dtype=None, empty=None, first_row=0, first_column=0):
+    """
+    Returns the values as a 2D NumPy array. NumPy is imported on demand.
+    Without a dtype, anything other than all numbers gives an 'object' array.
+
+    Args:
+      dtype              : the dtype of the array (None to infer)
+      empty              : replacement for '' and None cells (None to keep)
+      first_row    (int) : index of the first row to include
+      first_column (int) : index of the first column to include
+
+    Returns:
+      (ndarray) : the values
+    """
+    numpy = import_numpy()
+    if not self.is_rectangular():
+      raise ValueError('Csv must be rectangular')
+    rows = [row[first_column:] for row in
+            itertools.islice(self._rows(), first_row, None)]
+    if empty is not None:
+      rows = [[empty if x is None or x == '' else x for x in row]
+              for row in rows]
+    dtype = numpy_dtype(itertools.chain.from_iterable(rows), dtype)
+    return numpy.array(rows, dtype=dtype)
+
+  def column_to_numpy(self, column, first_row=0, dtype=None, empty=None):
+    """
+    Returns the values of a column as a 1D NumPy array. NumPy is imported on
+    demand. Without a dtype, anything other than all numbers gives an 'object'
+    array.
+
+    Args:
+      column    (int) : column index
+      first_row (int) : index of the first row to include
+      dtype           : the dtype of the array (None to infer)
+      empty           : replacement for '' and None cells (None to keep)
+
+    Returns:
+      (ndarray) : the values
+    """
+    numpy = import_numpy()
+    values = self.get_column(column)[first_row:]
+    if empty is not None:
+      values = [empty if x is None or x == '' else x for x in values]
+    return numpy.array(values, dtype=numpy_dtype(values, dtype))
 
   def remove_row(self, row):
     """
@@ -325,7 +900,69 @@ class Csv(object):
                          'removing the column would make an empty row'
                          .format(row))
     for row in range(self.num_rows()):
-      self.raw[row].pop(column)
+      self._own(row).pop(column)
+
+  @staticmethod
+  def _positions(indices, length):
+    """
+    Converts possibly negative indices into a set of positions, raising
+    IndexError if any is out of range.
+
+    Args:
+      indices ([int]) : the indices
+      length  (int)   : the length being indexed
+    """
+    positions = set()
+    for index in indices:
+      position = index + length if index < 0 else index
+      if not 0 <= position < length:
+        raise IndexError('index {} out of range'.format(index))
+      positions.add(position)
+    return positions
+
+  def remove_rows(self, rows):
+    """
+    This removes the specified rows, compacting the rows in one pass.
+
+    Args:
+      rows ([int]) : row indices
+    """
+    removed = Csv._positions(rows, self.num_rows())
+    if not removed:
+      return
+    if len(removed) == self.num_rows():
+      raise IndexError('Can\'t remove every row')
+    self.raw[:] = [values for row, values in enumerate(self.raw)
+                   if row not in removed]
+
+  def remove_columns(self, columns):
+    """
+    This removes the specified columns from every row, compacting each row in
+    one pass. Requires all rows to have these columns.
+
+    Args:
+      columns ([int]) : column indices
+    """
+    columns = list(columns)
+    if not columns:
+      return
+    by_length = {}  # the positions removed from rows of each length
+    for row, values in enumerate(self.raw):
+      length = len(values)
+      if length not in by_length:
+        try:
+          by_length[length] = Csv._positions(columns, length)
+        except IndexError:
+          raise IndexError('row {} doesn\'t have columns {}'
+                           .format(row, columns))
+      if len(by_length[length]) == length:
+        raise IndexError('row {} only has {} elements, removing the columns '
+                         'would make an empty row'.format(row, length))
+    # every row is replaced, so none are shared with copies afterwards
+    self.raw[:] = [[value for column, value in enumerate(values)
+                    if column not in by_length[len(values)]]
+                   for values in self.raw]
+    self._owned = None
 
   def add_row(self, row, index):
     """
@@ -355,7 +992,7 @@ class Csv(object):
     for cell in column:
       new_col.append(cell)
     for row_index in range(self.num_rows()):
-      self.raw[row_index].insert(index, new_col[row_index])
+      self._own(row_index).insert(index, new_col[row_index])
 
   def is_rectangular(self):
     """
@@ -372,59 +1009,294 @@ class Csv(object):
 
   def transpose(self):
     """
-    Returns a tranpose of this object.
+    Returns a tranpose of this object. The transpose is a view that swaps the
+    coordinates on access and only builds transposed rows when its structure
+    is modified. It shares the values with this object copy-on-write.
     All rows must have equal lengths.
     """
-    # Checks row length equivalence
-    if not self.is_rectangular:
-      raise IndexError('row length mismatch between {} and {}'.format(0, row))
+    self._check_rectangular()
+    return TransposedCsv(self.copy())
 
-    # Gets a tranpose of the structure
-    raw = [[None for _ in range(len(self.raw))]
-           for _ in range(len(self.raw[0]))]
-
-    # Copies the elements
-    for row in range(len(self.raw)):
-      for column in range(len(self.raw[0])):
-        raw[column][row] = self.raw[row][column]
+  def _check_rectangular(self):
+    """
+    Raises IndexError unless all rows have the same length.
+    """
+    lengths = self.row_lengths()
+    for row, length in enumerate(lengths):
+      if length != lengths[0]:
+        raise IndexError('row length mismatch between {} and {}'
+                         .format(0, row))
+
+  def sort(self, column_index, ignore_header=False, reverse=False, key=None,
+           in_place=False):
+    """
+    Returns a sorted version of this CSV object. The sort is stable, so rows
+    with equal keys keep their order, and rows are reordered without being
+    copied. Several columns can be given, the first being the primary key.
 
-    # Create the new object
-    csv = Csv()
-    csv.raw = raw
+    Args:
+      column_index (int/[int])   : the column(s) upon which to base the sorting
+      ignore_header (bool)       : keep the first row in place
+      reverse (bool/[bool])      : reverse the sort, or per column
+      key (callable)             : applied to each value to get its sort key
+      in_place (bool)            : sort this object and return it
+    """
+    if isinstance(column_index, int):
+      column_index = [column_index]
+    if isinstance(reverse, bool):
+      reverse = [reverse] * len(column_index)
+    if len(reverse) != len(column_index):
+      raise ValueError('reverse must be given for each column')
+
+    csv = self if in_place else self.copy()
+    rows = list(csv._rows())
+    start = 1 if ignore_header else 0
+    body = rows[start:]
+
+    # sorts by the least significant column first, relying on stability
+    for column, descending in reversed(list(zip(column_index, reverse))):
+      if key is None:
+        sort_key = operator.itemgetter(column)
+      else:
+        sort_key = lambda row, column=column: key(row[column])
+      body.sort(key=sort_key, reverse=descending)
+    rows[start:] = body
+    csv.raw = rows
 
     return csv
 
-  def sort(self, column_index, ignore_header=False, reverse=False):
+  @staticmethod
+  def sort_file(infile, outfile, column_index, ignore_header=False,
+                reverse=False, key=None, max_rows=None, max_bytes=None,
+                delimiter=',', dtypes=None, tmpdir=None):
     """
-    Returns a sorted version of this CSV object
+    Sorts a CSV file into another file like sort() does, without holding the
+    whole file in memory. Chunks of the file are sorted into runs which are
+    spilled to temporary files and then merged into the output.
+    Values default to int, then float, then str, unless dtypes is given.
 
     Args:
-      column_index (int)   : the column upon which to base the sorting
-      ignore_header (bool) : keep the first row in place
-      reverse (bool)       : reverse the sort operation
+      infile (str)               : name of file to sort (auto .gz if given)
+      outfile (str)              : name of file to write (auto .gz if given)
+      column_index (int/[int])   : the column(s) upon which to base the sorting
+      ignore_header (bool)       : keep the first row in place
+      reverse (bool/[bool])      : reverse the sort, or per column
+      key (callable)             : applied to each value to get its sort key
+      max_rows (int)             : maximum number of rows per run
+      max_bytes (int)            : maximum size of the text of each run
+                                   (default SORT_RUN_BYTES)
+      delimiter (str)            : value separator
+      dtypes (list/str)          : per-column types, 'infer', or None
+      tmpdir (str)               : directory for the runs (None for default)
     """
-    # Makes a list of tuples containing the field and the full row
-    scored_rows = []
-    for row_idx in range(self.num_rows()):
-      row = self.get_row(row_idx)  # copies the row
-      scored_rows.append((row[column_index], row))
+    if os.path.exists(outfile) and os.path.samefile(infile, outfile):
+      raise ValueError('can\'t sort a file into itself')
+    if isinstance(column_index, int):
+      column_index = [column_index]
+    if isinstance(reverse, bool):
+      reverse = [reverse] * len(column_index)
+    if len(reverse) != len(column_index):
+      raise ValueError('reverse must be given for each column')
+    if max_rows is None and max_bytes is None:
+      max_bytes = Csv.SORT_RUN_BYTES
+    sort_key, descending = row_key(column_index, reverse, key)
+
+    header = None
+    if ignore_header:
+      with contextlib.closing(Csv.iter_rows(infile, delimiter, dtypes)) as rows:
+        header = next(rows, None)
 
-    # This new raw values
-    raw = []
+    def runs():
+      for chunk in Csv.iter_chunks(infile, max_rows, max_bytes,
+                                   header=ignore_header, delimiter=delimiter,
+                                   dtypes=dtypes):
+        rows = chunk.raw
+        if ignore_header:
+          del rows[0]
+        yield rows
 
-    # Handles ignore header
-    if ignore_header:
-      _, row = scored_rows.pop(0)
-      raw.append(row)
+    with CsvWriter(outfile, delimiter=delimiter) as writer:
+      if header is not None:
+        writer.write_row(header)
+      writer.write_rows(external_sort(runs(), sort_key, descending, tmpdir))
 
-    # Sort the scored rows
-    scored_rows.sort(reverse=reverse)
-    while scored_rows:
-      _, row = scored_rows.pop(0)
-      raw.append(row)
 
-    # Create the new object
-    csv = Csv()
-    csv.raw = raw
+def _parse_range(filename, start, end, delimiter, dtypes):
+  """
+  Parses the lines in a byte range of a file. This is run in worker processes
+  by Csv.read().
 
-    return csv
+  Returns:
+    ([list], (int, str), (int, str)) : the row of every line, and the index and
+                                       text of the first and last non-blank
+                                       lines (None if all are blank)
+  """
+  with open(filename, 'rb') as fd:
+    fd.seek(start)
+    lines = fd.read(end - start).decode('utf-8').split('\n')
+  if lines[-1] == '':
+    lines.pop()
+  parse = Csv._row_parser(delimiter, dtypes)
+  rows = [parse(line) for line in lines]
+  first = next((i for i, line in enumerate(lines) if line.strip()), None)
+  if first is None:
+    return rows, None, None
+  last = next(i for i in reversed(range(len(lines))) if lines[i].strip())
+  return rows, (first, lines[first]), (last, lines[last])
+
+
+class TransposedCsv(Csv):
+  """
+  This is the transpose of a Csv that reads the Csv with swapped coordinates
+  rather than copying it. Getting and setting values, rows and columns works
+  on the underlying Csv. Accessing 'raw' or modifying the structure (adding,
+  removing, etc.) builds the transposed rows, after which it behaves like a
+  Csv. Use Csv.transpose() to create one.
+  """
+
+  def __init__(self, base):
+    """
+    Constructs the transpose of a rectangular Csv, which it takes ownership of.
+
+    Args:
+      base (Csv) : the Csv to transpose
+    """
+    self._base = None
+    super().__init__()
+    self._base = base
+    self._raw = None
+    self._source = base.source
+
+  @property
+  def raw(self):
+    """
+    The rows as a list of lists. Accessing this builds the transposed rows.
+    """
+    if self._base is not None:
+      base = self._base
+      self._raw = [list(base._column_values(column))
+                   for column in range(base.num_columns(0))]
+      self._owned = None
+      self._base = None
+    return self._raw
+
+  @raw.setter
+  def raw(self, rows):
+    self._raw = rows
+    self._base = None
+
+  def _rows(self):
+    if self._base is None:
+      return self._raw
+    base = self._base
+    return (list(base._column_values(column))
+            for column in range(base.num_columns(0)))
+
+  def _row_values(self, row):
+    if self._base is None:
+      return self._raw[row]
+    return list(self._base._column_values(row))
+
+  def _column_values(self, column, start=0):
+    if self._base is None:
+      return Csv._column_values(self, column, start)
+    return itertools.islice(self._base._row_values(column), start, None)
+
+  def copy(self):
+    """
+    Returns a copy of this CSV, sharing the values copy-on-write.
+    """
+    if self._base is None:
+      return Csv.copy(self)
+    return TransposedCsv(self._base.copy())
+
+  def _share_rows(self):
+    if self._base is None:
+      return Csv._share_rows(self)
+    # the transposed rows are built on demand
+    return self._rows()
+
+  def _own_all(self):
+    if self._base is None:
+      return Csv._own_all(self)
+    self._base._own_all()
+    return None
+
+  def num_rows(self):
+    """
+    Returns the number of rows.
+    """
+    if self._base is None:
+      return len(self._raw)
+    return self._base.num_columns(0)
+
+  def num_columns(self, row):
+    """
+    Return the number of columns for a specific row.
+
+    Args:
+      row (int) : row index
+    """
+    if self._base is None:
+      return len(self._raw[row])
+    num_rows = self.num_rows()
+    if not -num_rows <= row < num_rows:
+      raise IndexError('row index out of range')
+    return self._base.num_rows()
+
+  def row_lengths(self):
+    """
+    Returns a list of ints for row lengths.
+    """
+    if self._base is None:
+      return Csv.row_lengths(self)
+    return [self._base.num_rows()] * self.num_rows()
+
+  def get(self, row, column, default=None):
+    """
+    Gets a value by reference of row and column.
+
+    Args:
+      row    (int) : row index
+      column (int) : column index
+      default      : default value if location is '' or None
+    """
+    if self._base is None:
+      return Csv.get(self, row, column, default)
+    return self._base.get(column, row, default)
+
+  def set(self, row, column, value):
+    """
+    Sets a value by reference of row and column.
+
+    Args:
+      row    (int) : row index
+      column (int) : column index
+      value        : value
+    """
+    if self._base is None:
+      Csv.set(self, row, column, value)
+    else:
+      self._base.set(column, row, value)
+
+  def get_column(self, column):
+    """
+    Retrieves a list of values from a full column.
+
+    Args:
+      column (int) : column index
+
+    Returns:
+      (list) : the values in the column
+    """
+    if self._base is None:
+      return Csv.get_column(self, column)
+    return list(self._base._row_values(column))
+
+  def transpose(self):
+    """
+    Returns a tranpose of this object, which is a copy of the transposed Csv.
+    """
+    if self._base is None:
+      return Csv.transpose(self)
+    return self._base.copy()
@@ -0,0 +1,335 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import array
+import json
+import os
+import sys
+import tempfile
+
+from .compression import is_compressed, open_file
+from .lazy_csv import LazyCsv
+
+
+class CsvIndex(object):
+  """
+  This records where the rows of a CSV file start, so a row can be read with
+  one seek instead of scanning the file. It is kept in a sidecar file next to
+  the CSV file (filename + '.idx') and rebuilt automatically when the CSV file's
+  size or modification time changes. The sidecar file holds JSON and a raw
+  array of offsets, so loading one never runs code from it. Offsets of
+  compressed files are positions in the decompressed text.
+  """
+
+  VERSION = 2
+  STRIDE = 1024
+  SUFFIX = '.idx'
+
+  def __init__(self):
+    """
+    Constructs an empty CsvIndex. Use CsvIndex.open() or CsvIndex.build().
+    """
+    self.filename = None
+    self.size = None
+    self.mtime_ns = None
+    self.stride = CsvIndex.STRIDE
+    self.delimiter = ','
+    self.offsets = array.array('q')
+    self.names = None
+    self.num_rows = 0
+    self._name_index = None
+
+  @staticmethod
+  def build(filename, stride=STRIDE, names=False, delimiter=','):
+    """
+    Builds the index of a CSV file by reading it once.
+    Leading and trailing blank lines are dropped like Csv.load() does.
+
+    Args:
+      filename  (str)  : name of the CSV file (auto .gz if given)
+      stride    (int)  : record the offset of every stride-th row
+      names     (bool) : also record the first value of every row, which
+                         records the offset of every row
+      delimiter (str)  : value separator, used to find the first values
+    """
+    if stride < 1:
+      raise ValueError('stride must be positive')
+    if names:
+      stride = 1
+    index = CsvIndex()
+    index.filename = filename
+    stat = os.stat(filename)
+    index.size = stat.st_size
+    index.mtime_ns = stat.st_mtime_ns
+    index.stride = stride
+    index.delimiter = delimiter
+    index.names = [] if names else None
+
+    separator = delimiter.encode('utf-8')
+    position = 0
+    row = -1
+    with open_file(filename, 'rb') as fd:
+      for line in fd:
+        start = position
+        position += len(line)
+        blank = not line.strip()
+        if row < 0 and blank:
+          continue
+        row += 1
+        if row % stride == 0:
+          index.offsets.append(start)
+        if names:
+          index.names.append(line.split(separator, 1)[0].decode('utf-8').strip())
+        if not blank:
+          index.num_rows = row + 1
+
+    # trailing blank lines aren't rows
+    del index.offsets[(index.num_rows + stride - 1) // stride:]
+    if names:
+      del index.names[index.num_rows:]
+    return index
+
+  @staticmethod
+  def open(filename, stride=STRIDE, names=False, delimiter=','):
+    """
+    Returns the index of a CSV file, loading its sidecar file if it is up to
+    date and otherwise building the index and saving it to the sidecar file.
+
+    Args:
+      filename  (str)  : name of the CSV file (auto .gz if given)
+      stride    (int)  : record the offset of every stride-th row
+      names     (bool) : also record the first value of every row
+      delimiter (str)  : value separator, used to find the first values
+    """
+    index = CsvIndex._load(filename)
+    if index is not None and index.is_current() and \
+       index._matches(stride, names, delimiter):
+      return index
+    index = CsvIndex.build(filename, stride, names, delimiter)
+    index.save()
+    return index
+
+  @staticmethod
+  def _load(filename):
+    """
+    Returns the index stored in a CSV file's sidecar file, or None if there is
+    no usable one.
+    """
+    try:
+      with open(filename + CsvIndex.SUFFIX, 'rb') as fd:
+        header = json.loads(fd.readline().decode('utf-8'))
+        if header['version'] != CsvIndex.VERSION:
+          return None
+        index = CsvIndex()
+        index.filename = filename
+        index.size = header['size']
+        index.mtime_ns = header['mtime_ns']
+        index.stride = header['stride']
+        index.delimiter = header['delimiter']
+        index.num_rows = header['num_rows']
+        if not all(isinstance(value, int) for value in (
+            index.size, index.mtime_ns, index.stride, index.num_rows)) or \
+           not isinstance(index.delimiter, str) or index.stride < 1:
+          return None
+        data = fd.read(8 * header['offsets'])
+        index.offsets.frombytes(data)
+        if header['byteorder'] != sys.byteorder:
+          index.offsets.byteswap()
+        if len(index.offsets) != \
+           (index.num_rows + index.stride - 1) // index.stride:
+          return None
+        if header['names']:
+          index.names = json.loads(fd.read().decode('utf-8'))
+          if not isinstance(index.names, list) or \
+             len(index.names) != index.num_rows or \
+             not all(isinstance(name, str) for name in index.names):
+            return None
+        return index
+    except Exception:  # pylint: disable=broad-except
+      # missing, outdated or corrupt sidecar files are rebuilt
+      return None
+
+  def _matches(self, stride, names, delimiter):
+    """
+    Returns True iff this index was built with compatible settings.
+    """
+    if names:
+      return self.names is not None and self.delimiter == delimiter
+    return self.stride <= stride
+
+  def is_current(self):
+    """
+    Returns True iff the CSV file's size and modification time are unchanged
+    since the index was built.
+    """
+    try:
+      stat = os.stat(self.filename)
+    except OSError:
+      return False
+    return stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns
+
+  def save(self):
+    """
+    Writes the index to the sidecar file. This is best effort: the index isn't
+    saved if the directory can't be written.
+    """
+    header = {
+      'version': CsvIndex.VERSION,
+      'size': self.size,
+      'mtime_ns': self.mtime_ns,
+      'stride': self.stride,
+      'delimiter': self.delimiter,
+      'num_rows': self.num_rows,
+      'byteorder': sys.byteorder,
+      'offsets': len(self.offsets),
+      'names': self.names is not None,
+    }
+    sidecar = self.filename + CsvIndex.SUFFIX
+    try:
+      fd, temp = tempfile.mkstemp(prefix=os.path.basename(sidecar) + '.',
+                                  dir=os.path.dirname(sidecar) or '.')
+    except OSError:
+      return
+    try:
+      with os.fdopen(fd, 'wb') as out:
+        out.write(json.dumps(header).encode('utf-8') + b'\n')
+        out.write(self.offsets.tobytes())
+        if self.names is not None:
+          out.write(json.dumps(self.names).encode('utf-8'))
+      os.replace(temp, sidecar)
+    except OSError:
+      os.remove(temp)
+
+  def find(self, name):
+    """
+    Returns the row number of the first row whose first value is name.
+    Requires the index to be built with names.
+
+    Args:
+      name (str) : the first value of the row, as text
+    """
+    if self.names is None:
+      raise ValueError('index was built without names')
+    if self._name_index is None:
+      self._name_index = {}
+      for row, value in enumerate(self.names):
+        self._name_index.setdefault(value, row)
+    try:
+      return self._name_index[name]
+    except KeyError:
+      raise IndexError('name={0} doesn\'t exist'.format(name))
+
+  def read_line(self, fd, row):
+    """
+    Returns the text of a row's line without its terminator.
+
+    Args:
+      fd  (file) : the CSV file opened in binary mode
+      row (int)  : row index
+    """
+    if not 0 <= row < self.num_rows:
+      raise IndexError('row index out of range')
+    fd.seek(self.offsets[row // self.stride])
+    for _ in range(row % self.stride):
+      fd.readline()
+    line = fd.readline()
+    if line.endswith(b'\n'):
+      line = line[:-1]
+    return line.decode('utf-8')
+
+
+class IndexedCsv(LazyCsv):
+  """
+  This represents a CSV file opened through its CsvIndex. Like a LazyCsv, a row
+  is only read and parsed the first time it is accessed, but finding the row
+  costs one seek rather than a scan of the file, and later opens reuse the
+  index from the sidecar file. Compressed files aren't supported, since seeking
+  backwards in them decompresses again from the start.
+  """
+
+  def __init__(self):
+    """
+    Constructs an empty IndexedCsv. Use IndexedCsv.open() to open a file.
+    """
+    super().__init__()
+    self.index = None
+    self._names = None
+
+  @staticmethod
+  def open(filename, delimiter=',', dtypes=None, stride=CsvIndex.STRIDE,
+           names=False):
+    """
+    Opens an uncompressed CSV file without parsing it, building its index if
+    needed. Values default to int, then float, then str, unless dtypes is given.
+
+    Args:
+      filename  (str)      : name of file to open
+      delimiter (str)      : value separator
+      dtypes    (list/str) : per-column types, 'infer', or None (see Csv.load)
+      stride    (int)      : record the offset of every stride-th row
+      names     (bool)     : also index the first value of every row, so the
+                             first column is available without parsing
+    """
+    if is_compressed(filename):
+      raise ValueError('IndexedCsv requires an uncompressed file')
+    csv = IndexedCsv()
+    csv._source = filename
+    csv.index = CsvIndex.open(filename, stride, names, delimiter)
+    csv._count = csv.index.num_rows
+    csv._file = open_file(filename, 'rb')
+    csv._prepare(delimiter, dtypes)
+    if csv._lazy() and csv.index.names is not None:
+      csv._names = [csv._parse(name)[0] for name in csv.index.names]
+      csv._names[0] = csv._parse_first(csv.index.names[0])[0]
+    return csv
+
+  def _raw_line(self, row):
+    """
+    Returns the text of a row's line without the terminator or edge stripping.
+    """
+    return self.index.read_line(self._file, row)
+
+  def get_column(self, column):
+    """
+    Retrieves a list of values from a full column.
+    Requires all rows to have this column.
+
+    Args:
+      column (int) : column index
+
+    Returns:
+      (list) : the values in the column
+    """
+    if not self._lazy():
+      return LazyCsv.get_column(self, column)
+    if column == 0 and self._names is not None:
+      return [self._cache[row][0] if row in self._cache else name
+              for row, name in enumerate(self._names)]
+    return [self._fetch(row)[column] for row in range(self._count)]
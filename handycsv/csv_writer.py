@@ -0,0 +1,143 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import io
+import itertools
+
+from .compression import open_file
+from . import instrument
+
+
+class CsvWriter(object):
+  """
+  This writes rows to a CSV file as they are given, so a full Csv never needs to
+  be built in memory. Output is buffered and compressed if the filename ends
+  with the extension of a registered codec (e.g., '.gz', '.bz2', '.xz'). Use it
+  as a context manager or call close() when done.
+  """
+
+  # number of rows formatted per timed batch while instrumented
+  RECORD_BATCH_ROWS = 1024
+
+  def __init__(self, filename, delimiter=',', append=False, compresslevel=None,
+               threads=None):
+    """
+    Opens the file for writing, truncating it if it exists unless appending.
+    Appending to a compressed file adds a new compressed stream, which readers
+    handle transparently.
+
+    Args:
+      filename      (str)  : name of file to write (auto compressed if given)
+      delimiter     (str)  : value separator
+      append        (bool) : add to the end of the file instead of truncating it
+      compresslevel (int)  : compression level, None for the codec's default
+                             (e.g., 1 is fastest and 9 smallest for gzip)
+      threads       (int)  : compression threads, for codecs supporting them
+    """
+    self._filename = filename
+    self._delimiter = delimiter
+    self._num_rows = 0
+    self._fd = io.TextIOWrapper(
+      open_file(filename, 'ab' if append else 'wb', compresslevel, threads),
+      encoding='utf-8', newline='')
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+  @property
+  def filename(self):
+    return self._filename
+
+  def num_rows(self):
+    """
+    Returns the number of rows written so far.
+    """
+    return self._num_rows
+
+  def write_row(self, row):
+    """
+    Writes one row.
+
+    Args:
+      row ([values]) : the row's values
+    """
+    self._fd.write(self._delimiter.join([str(x) for x in row]) + '\n')
+    self._num_rows += 1
+
+  def write_rows(self, rows):
+    """
+    Writes rows from an iterable, consuming it lazily.
+
+    Args:
+      rows (iterable) : rows of values
+    """
+    if instrument.active() is not None:
+      self._write_rows_recorded(rows)
+      return
+    delimiter = self._delimiter
+    write = self._fd.write
+    count = 0
+    for row in rows:
+      write(delimiter.join([str(x) for x in row]) + '\n')
+      count += 1
+    self._num_rows += count
+
+  def _write_rows_recorded(self, rows):
+    """
+    write_rows() while an instrument.Recorder is enabled. Rows are formatted
+    and written in batches, timing the two phases separately.
+    """
+    delimiter = self._delimiter
+    rows = iter(rows)
+    with instrument.operation('CsvWriter.write_rows', self._filename) as record:
+      while True:
+        with record.phase('format'):
+          lines = [delimiter.join([str(x) for x in row]) + '\n'
+                   for row in itertools.islice(rows, self.RECORD_BATCH_ROWS)]
+          text = ''.join(lines)
+        if not lines:
+          break
+        with record.phase('write'):
+          self._fd.write(text)
+        record.rows += len(lines)
+        record.bytes += instrument.utf8_len(text)
+        self._num_rows += len(lines)
+
+  def close(self):
+    """
+    Flushes and closes the file. Closing more than once has no effect.
+    """
+    if not self._fd.closed:
+      with instrument.operation('CsvWriter.close', self._filename) as record, \
+           record.phase('flush'):
+        self._fd.close()
@@ -0,0 +1,158 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import heapq
+import itertools
+import operator
+import os
+import pickle
+import tempfile
+
+# number of rows pickled together when spilling a run
+SPILL_BATCH_ROWS = 1024
+
+# most runs merged at once, bounding the number of open files
+MAX_FAN_IN = 128
+
+
+class _Reversed(object):
+  """
+  This wraps a sort key so it sorts in descending order within a tuple key.
+  """
+
+  __slots__ = ('value',)
+
+  def __init__(self, value):
+    self.value = value
+
+  def __lt__(self, other):
+    return other.value < self.value
+
+  def __eq__(self, other):
+    return self.value == other.value
+
+
+def row_key(columns, reverse, key=None):
+  """
+  Returns a function giving the sort key of a row and whether that key sorts
+  in reverse, so that one sort (or merge) orders rows by several columns.
+
+  Args:
+    columns ([int])  : the columns, most significant first
+    reverse ([bool]) : whether each column sorts in descending order
+    key (callable)   : applied to each value to get its sort key
+
+  Returns:
+    (callable, bool) : the row key function and the reverse flag
+  """
+  if len(set(reverse)) == 1:
+    descending = [False] * len(columns)
+    flag = reverse[0]
+  else:
+    descending = reverse
+    flag = False
+
+  if key is None and not any(descending):
+    return operator.itemgetter(*columns) if len(columns) > 1 else \
+      operator.itemgetter(columns[0]), flag
+
+  def get(row):
+    values = []
+    for column, down in zip(columns, descending):
+      value = row[column] if key is None else key(row[column])
+      values.append(_Reversed(value) if down else value)
+    return tuple(values)
+  return get, flag
+
+
+def _spill(rows, directory):
+  """
+  Writes a sorted run from an iterable of rows to a temporary file and returns
+  the file's name.
+  """
+  fd, filename = tempfile.mkstemp(suffix='.run', dir=directory)
+  rows = iter(rows)
+  with os.fdopen(fd, 'wb') as out:
+    while True:
+      batch = list(itertools.islice(rows, SPILL_BATCH_ROWS))
+      if not batch:
+        break
+      pickle.dump(batch, out, pickle.HIGHEST_PROTOCOL)
+  return filename
+
+
+def _read_run(filename):
+  """
+  Generates the rows of a spilled run, deleting the file once it is read.
+  """
+  with open(filename, 'rb') as fd:
+    while True:
+      try:
+        batch = pickle.load(fd)
+      except EOFError:
+        break
+      yield from batch
+  os.remove(filename)
+
+
+def external_sort(chunks, key, reverse=False, directory=None):
+  """
+  Generates the rows of all chunks in sorted order while holding about one
+  chunk in memory. Each chunk is sorted into a run and spilled to a temporary
+  file, then the runs are merged. The sort is stable.
+
+  Args:
+    chunks    (iterable) : lists of rows, in their original order
+    key       (callable) : gives the sort key of a row
+    reverse   (bool)     : sort in descending order
+    directory (str)      : where to put temporary files (None for the default)
+  """
+  with tempfile.TemporaryDirectory(prefix='handycsv-sort-',
+                                   dir=directory) as spill_dir:
+    runs = []
+    pending = None  # the last run is merged without spilling it
+    for rows in chunks:
+      rows.sort(key=key, reverse=reverse)
+      if pending is not None:
+        runs.append(_spill(pending, spill_dir))
+      pending = rows
+    if pending is None:
+      return
+
+    # merges consecutive groups until few enough files remain
+    while len(runs) >= MAX_FAN_IN:
+      groups = [runs[start:start + MAX_FAN_IN]
+                for start in range(0, len(runs), MAX_FAN_IN)]
+      runs = [_spill(heapq.merge(*[_read_run(run) for run in group], key=key,
+                                 reverse=reverse), spill_dir)
+              if len(group) > 1 else group[0] for group in groups]
+
+    sources = [_read_run(run) for run in runs] + [iter(pending)]
+    yield from heapq.merge(*sources, key=key, reverse=reverse)
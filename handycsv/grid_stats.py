@@ -29,9 +29,22 @@
  * POSSIBILITY OF SUCH DAMAGE.
 """
 import gzip
+import math
+import os
 import re
+import warnings
 
+from .column_stats import ColumnStats
+from .columnar_csv import ColumnarCsv
+from .compression import open_file
 from .csv import Csv
+from .csv_index import IndexedCsv
+from .csv_writer import CsvWriter
+from . import instrument
+from .name_index import insert_name, position, remove_name
+from .optional import import_numpy, numpy_dtype, to_list
+from .parallel import read_many
+from .views import ColumnView, RowView
 
 
 class GridStats(object):
@@ -99,43 +112,130 @@ class GridStats(object):
     """
     stats = GridStats()
     stats.csv = csv
-    if not stats.csv.is_rectangular:
-      raise ValueError('GridStats must be rectangular')
-    stats.__init_row_info()
-    stats.__init_column_info()
+    with instrument.operation('GridStats.make_from_csv') as record, \
+         record.phase('index'):
+      if not stats.csv.is_rectangular:
+        raise ValueError('GridStats must be rectangular')
+      stats.__init_row_info()
+      stats.__init_column_info()
     return stats
 
   @staticmethod
-  def load(text, transpose=False, delimiter=','):
+  def load(text, transpose=False, delimiter=',', dtypes=None):
     """
     Constructs a GridStats from a string
     Values default to int, then float, then str
 
     Args:
-      text      (str)  : text of the grid
-      transpose (bool) : to transpose the input
-      delimiter (str)  : value separator
+      text      (str)      : text of the grid
+      transpose (bool)     : to transpose the input
+      delimiter (str)      : value separator
+      dtypes    (list/str) : per-column types, 'infer', or None (see Csv.load)
     """
-    csv = Csv.load(text, transpose=transpose, delimiter=delimiter)
-    return GridStats.make_from_csv(csv)
+    with instrument.operation('GridStats.load'):
+      csv = Csv.load(text, transpose=transpose, delimiter=delimiter,
+                     dtypes=dtypes)
+      return GridStats.make_from_csv(csv)
 
   @staticmethod
-  def read(filename, transpose=False):
+  def read(filename, transpose=False, dtypes=None, workers=None, cache=None):
     """
     Constructs a GridStats from a CSV file
     Values default to int, then float, then str
 
     Args:
-      filename  (str)  : name of file to open (auto .gz if given)
-      transpose (bool) : to transpose the input
+      filename  (str)      : name of file to open (auto .gz if given)
+      transpose (bool)     : to transpose the input
+      dtypes    (list/str) : per-column types, 'infer', or None (see Csv.load)
+      workers   (int)      : parse an uncompressed file in this many processes
+      cache     (bool/str) : cache the parsed values (see Csv.read)
+    """
+    with instrument.operation('GridStats.read', filename):
+      csv = Csv.read(filename, transpose=transpose, dtypes=dtypes,
+                     workers=workers, cache=cache)
+      return GridStats.make_from_csv(csv)
+
+  @staticmethod
+  def open(filename, delimiter=',', dtypes=None):
+    """
+    Constructs a GridStats over an IndexedCsv, so values are read from the file
+    as they are accessed. The row names and the offset of every row are kept in
+    an index file next to the CSV file, which later opens reuse. Getting a value
+    then costs one seek and one line parse. The file must be uncompressed.
+
+    Args:
+      filename  (str)      : name of file to open
+      delimiter (str)      : value separator
+      dtypes    (list/str) : per-column types, 'infer', or None (see Csv.load)
     """
-    csv = Csv.read(filename, transpose=transpose)
+    csv = IndexedCsv.open(filename, delimiter=delimiter, dtypes=dtypes,
+                          names=True)
+    return GridStats.make_from_csv(csv)
+
+  @staticmethod
+  def read_many(filenames, workers=None, transpose=False, dtypes=None,
+                cache=None):
+    """
+    Constructs a GridStats from each of many CSV files, parsing them in a pool of
+    processes. The results are in the order of the filenames.
+
+    Args:
+      filenames ([str])    : names of files to open (auto .gz if given)
+      workers   (int)      : number of processes (None for the CPU count)
+      transpose (bool)     : to transpose the input
+      dtypes    (list/str) : per-column types, 'infer', or None (see Csv.load)
+      cache     (bool/str) : cache the parsed values (see Csv.read)
+
+    Raises:
+      ReadManyError : listing every file that failed, after trying them all
+    """
+    return read_many(GridStats.read, filenames, workers,
+                     {'transpose': transpose, 'dtypes': dtypes,
+                      'cache': cache})
+
+  @staticmethod
+  def from_ndarray(head, rows, columns, values):
+    """
+    Constructs a GridStats from a 2D NumPy array and its labels.
+
+    Args:
+      head    (int, float, str) : the head value
+      rows    (ndarray or list) : the row specifiers
+      columns (ndarray or list) : the column specifiers
+      values  (ndarray)         : the 2D array of values, rows by columns
+    """
+    rows = to_list(rows)
+    columns = to_list(columns)
+    values = to_list(values)
+    if len(values) != len(rows):
+      raise ValueError('values must have one row per row name')
+    raw = [[head] + columns]
+    for name, row in zip(rows, values):
+      row = to_list(row)
+      if len(row) != len(columns):
+        raise ValueError('values must have one column per column name')
+      raw.append([name] + row)
+    csv = Csv()
+    csv.raw = raw
     return GridStats.make_from_csv(csv)
 
   @property
   def source(self):
     return self.csv.source
 
+  def copy(self):
+    """
+    Returns a copy of this GridStats. The copy shares its values with this one
+    until either is modified (see Csv.copy).
+    """
+    stats = GridStats()
+    stats.csv = self.csv.copy()
+    stats.rows = list(self.rows)
+    stats.row_index = dict(self.row_index)
+    stats.columns = list(self.columns)
+    stats.column_index = dict(self.column_index)
+    return stats
+
   def head(self):
     """
     Returns the head value
@@ -181,15 +281,53 @@ class GridStats(object):
     """
     return self.csv.pretty(precision=precision, right_align=right_align)
 
-  def write(self, filename, transpose=False, delimiter=','):
+  def write(self, filename, transpose=False, delimiter=',', compresslevel=None,
+            threads=None):
     """
     Write the GridStats to a CSV file
 
     Args:
-      filename (str)   : name of file to write (auto .gz if given)
-      transpose (bool) : transpose the ColumnStats before writing
+      filename (str)      : name of file to write (auto compressed if given)
+      transpose (bool)    : transpose the ColumnStats before writing
+      compresslevel (int) : compression level, None for the codec's default
+      threads (int)       : compression threads (see CsvWriter)
+    """
+    self.csv.write(filename, transpose=transpose, delimiter=delimiter,
+                   compresslevel=compresslevel, threads=threads)
+
+  def append(self, filename, rows=None, delimiter=','):
     """
-    self.csv.write(filename, transpose=transpose, delimiter=delimiter)
+    Appends rows to a CSV file. If the file doesn't exist or is empty it is
+    started with the header row. Otherwise its header row must match this
+    GridStats' header row. Only the header and the new rows are touched so the
+    cost doesn't depend on the size of the file.
+
+    Args:
+      filename  (str)   : name of file to append to (auto .gz if given)
+      rows      ([str]) : the identifiers of the rows to append (None for all)
+      delimiter (str)   : value separator
+    """
+    if rows is None:
+      rows = self.rows
+    try:
+      indices = [self.row_index[row] for row in rows]
+    except KeyError as error:
+      raise IndexError('row={0} doesn\'t exist'.format(error.args[0]))
+    header = self.csv.get_row(0)
+    exists = os.path.isfile(filename) and os.path.getsize(filename) > 0
+    if exists:
+      # the text is compared since parsing it may not give back the values
+      # (e.g., the str '1' is read as the int 1)
+      with open_file(filename, 'rb') as fd:
+        lines = Csv._iter_lines(line.decode('utf-8') for line in fd)
+        first = next(lines, None)
+      if first is None or [x.strip() for x in first.split(delimiter)] != \
+         [str(x).strip() for x in header]:
+        raise ValueError('header row of {0} doesn\'t match'.format(filename))
+    with CsvWriter(filename, delimiter=delimiter, append=True) as writer:
+      if not exists:
+        writer.write_row(header)
+      writer.write_rows(self.csv._row_values(index) for index in indices)
 
   def get(self, row, column, default=None):
     """
@@ -236,10 +374,7 @@ class GridStats(object):
     Returns:
       (list)  : the values in the row
     """
-    try:
-      return self.csv.get_row(self.row_index[row])[1:]
-    except KeyError:
-      raise IndexError('row={0} doesn\'t exist'.format(row))
+    return self.row_view(row).tolist()
 
   def get_column(self, column):
     """
@@ -251,10 +386,61 @@ class GridStats(object):
     Returns:
       (list)  : the values in the column
     """
-    try:
-      return self.csv.get_column(self.column_index[column])[1:]
-    except KeyError:
+    return self.column_view(column).tolist()
+
+  def row_view(self, row):
+    """
+    Returns a read-only view of a full row which doesn't copy it. The view is
+    indexed by column name; use its at() method for positions. It keeps
+    viewing the row with this name when rows or columns are added, removed or
+    sorted.
+
+    Args:
+      row : row specifier
+
+    Returns:
+      (RowView) : the view of the values in the row
+    """
+    if row not in self.row_index:
+      raise IndexError('row={0} doesn\'t exist'.format(row))
+    return RowView(None, row, 1, self)
+
+  def column_view(self, column):
+    """
+    Returns a read-only view of a full column which doesn't copy it. The view is
+    indexed by row name; use its at() method for positions. It keeps viewing
+    the column with this name when rows or columns are added, removed or
+    sorted.
+
+    Args:
+      column : column specifier
+
+    Returns:
+      (ColumnView) : the view of the values in the column
+    """
+    if column not in self.column_index:
       raise IndexError('column={0} doesn\'t exist'.format(column))
+    return ColumnView(None, column, 1, self)
+
+  def to_ndarray(self, dtype=None, empty=None):
+    """
+    Returns the values as a 2D NumPy array (rows by columns) along with arrays
+    of the row and column names. NumPy is imported on demand.
+    Without a dtype, anything other than all numbers gives an 'object' array.
+
+    Args:
+      dtype : the dtype of the values array (None to infer)
+      empty : replacement for '' and None cells (None to keep)
+
+    Returns:
+      (ndarray, ndarray, ndarray) : the values, row names, and column names
+    """
+    numpy = import_numpy()
+    values = self.csv.to_numpy(dtype=dtype, empty=empty, first_row=1,
+                               first_column=1)
+    rows = numpy.array(self.rows, dtype=numpy_dtype(self.rows, None))
+    columns = numpy.array(self.columns, dtype=numpy_dtype(self.columns, None))
+    return values, rows, columns
 
   def remove_row(self, row):
     """
@@ -268,7 +454,7 @@ class GridStats(object):
     except KeyError:
       raise IndexError(f'row={row} doesn\'t exist')
     self.csv.remove_row(row_index)
-    self.__init_row_info()
+    remove_name(self.rows, self.row_index, row_index - 1, 1)
 
   def remove_column(self, column):
     """
@@ -282,6 +468,34 @@ class GridStats(object):
     except KeyError:
       raise IndexError(f'column={column} doesn\'t exist')
     self.csv.remove_column(column_index)
+    remove_name(self.columns, self.column_index, column_index - 1, 1)
+
+  def remove_rows(self, rows):
+    """
+    This removes the specified rows in one pass.
+
+    Args:
+      rows ([str]) : the row identifiers
+    """
+    try:
+      row_indices = [self.row_index[row] for row in rows]
+    except KeyError as error:
+      raise IndexError(f'row={error.args[0]} doesn\'t exist')
+    self.csv.remove_rows(row_indices)
+    self.__init_row_info()
+
+  def remove_columns(self, columns):
+    """
+    This removes the specified columns in one pass.
+
+    Args:
+      columns ([str]) : the column identifiers
+    """
+    try:
+      column_indices = [self.column_index[column] for column in columns]
+    except KeyError as error:
+      raise IndexError(f'column={error.args[0]} doesn\'t exist')
+    self.csv.remove_columns(column_indices)
     self.__init_column_info()
 
   def add_row(self, name, columns, index=None):
@@ -293,16 +507,14 @@ class GridStats(object):
       columns ([values]) : dict of column values
       index   (int)      : placement of row (None for end)
     """
-    if name in self.row_names():
+    if name in self.row_index:
       raise ValueError(f'row {name} already exists')
     new_row = [name]
     for column in self.column_names():
       new_row.append(columns[column])
-    if index is None:
-      index = len(self.row_names())
-    self.csv.add_row(new_row, index + 1)
-    self.__init_row_info()
-    self.__init_column_info()
+    at = position(self.rows, index)
+    self.csv.add_row(new_row, at + 1)
+    insert_name(self.rows, self.row_index, name, at, 1)
 
   def add_column(self, name, rows, index=None):
     """
@@ -313,16 +525,70 @@ class GridStats(object):
       rows  ([values]) : dict of row values
       index (int)      : placement of column (None for end)
     """
-    if name in self.column_names():
+    if name in self.column_index:
       raise ValueError(f'column {name} already exists')
     new_column = [name]
     for row in self.row_names():
       new_column.append(rows[row])
-    if index is None:
-      index = len(self.column_names())
-    self.csv.add_column(new_column, index + 1)
-    self.__init_row_info()
-    self.__init_column_info()
+    at = position(self.columns, index)
+    self.csv.add_column(new_column, at + 1)
+    insert_name(self.columns, self.column_index, name, at, 1)
+
+  @staticmethod
+  def _row_test(predicate, positions):
+    """
+    Returns a function testing a row's values at the positions with a callable
+    or a compiled regular expression.
+    """
+    if hasattr(predicate, 'match'):
+      match = predicate.match
+      if len(positions) == 1:
+        column = positions[0]
+        return lambda row: match(str(row[column])) is not None
+      return lambda row: all(match(str(row[p])) for p in positions)
+    if len(positions) == 1:
+      column = positions[0]
+      return lambda row: predicate(row[column])
+    return lambda row: predicate(*[row[p] for p in positions])
+
+  def filter(self, columns, predicate, invert=False):
+    """
+    Returns a new GridStats holding the rows that pass a test, leaving this one
+    unchanged. The predicate is either a callable given the typed values of the
+    columns (one argument per column), or a compiled regular expression that
+    must match the text of each of them. The rows are checked in a single pass.
+
+    Args:
+      columns   (str/[str])        : the column specifier(s)
+      predicate (callable/Pattern) : the test of each row
+      invert    (bool)             : to keep the rows that fail the test instead
+
+    Returns:
+      (GridStats) : the filtered grid
+    """
+    if not isinstance(columns, (list, tuple)):
+      columns = [columns]
+    try:
+      positions = [self.column_index[column] for column in columns]
+    except KeyError as error:
+      raise IndexError(f'column={error.args[0]} doesn\'t exist')
+    test = GridStats._row_test(predicate, positions)
+
+    # the kept rows are shared copy-on-write rather than copied
+    rows = iter(self.csv._share_rows())
+    kept = [next(rows)]
+    if invert:
+      kept.extend(row for row in rows if not test(row))
+    else:
+      kept.extend(row for row in rows if test(row))
+    if isinstance(self.csv, ColumnarCsv):
+      csv = ColumnarCsv()
+      csv.raw = kept
+    else:
+      csv = Csv()
+      csv.raw = kept
+      csv._owned = set()
+    return GridStats.make_from_csv(csv)
 
   def filter_rows(self, column, regex, invert=False):
     """
@@ -342,24 +608,216 @@ class GridStats(object):
       raise IndexError('column "{}" is not an existing column'.format(column))
 
     # check all rows
+    pattern = re.compile(regex)
     removed = []
-    for row in self.row_names():
+    for row, value in zip(self.row_names(), self.get_column(column)):
       # determine if matched
-      value_str = str(self.get(row, column))
-      matched = re.match(regex, value_str)
+      matched = pattern.match(str(value))
 
       # mark to remove based on matched and invert
       if (not invert and matched) or (invert and not matched):
         removed.append(row)
 
     # remove the rows
-    for row in removed:
-      self.remove_row(row)
+    self.remove_rows(removed)
 
     return removed
 
+  def sort(self, columns=None, reverse=False, key=None, in_place=False):
+    """
+    Returns a GridStats with the rows sorted by the values of one or more
+    columns, or by row name. The sort is stable and the row index is rebuilt
+    once for the new order.
+
+    Args:
+      columns  (str/[str])   : the column specifier(s), None for the row names
+      reverse  (bool/[bool]) : reverse the sort, or per column
+      key      (callable)    : applied to each value to get its sort key
+      in_place (bool)        : sort this object and return it
+
+    Returns:
+      (GridStats) : the sorted grid
+    """
+    if columns is None:
+      positions = [0]
+    else:
+      if not isinstance(columns, (list, tuple)):
+        columns = [columns]
+      try:
+        positions = [self.column_index[column] for column in columns]
+      except KeyError as error:
+        raise IndexError(f'column={error.args[0]} doesn\'t exist')
+
+    csv = self.csv.sort(positions, ignore_header=True, reverse=reverse, key=key,
+                        in_place=in_place)
+    if in_place:
+      stats = self
+    else:
+      stats = GridStats()
+      stats.columns = list(self.columns)
+      stats.column_index = dict(self.column_index)
+    stats.csv = csv
+    stats.__init_row_info()
+    return stats
+
   def transpose(self):
     """
-    Returns a tranpose of this GridStats object.
+    Returns a tranpose of this GridStats object. The values are viewed through
+    a transposed Csv rather than copied (see Csv.transpose), and the row and
+    column indices are swapped rather than rebuilt.
     """
-    return GridStats.make_from_csv(self.csv.transpose())
+    stats = GridStats()
+    stats.csv = self.csv.transpose()
+    stats.rows = list(self.columns)
+    stats.row_index = dict(self.column_index)
+    stats.columns = list(self.rows)
+    stats.column_index = dict(self.row_index)
+    return stats
+
+  def _vectors(self, axis):
+    """
+    Returns the names along an axis and, for each, its non-empty values.
+
+    Args:
+      axis (int) : 0 for one vector per column, 1 for one vector per row
+    """
+    if axis == 0:
+      names = self.columns
+      lists = (self.column_view(name) for name in names)
+    elif axis == 1:
+      names = self.rows
+      lists = (self.row_view(name) for name in names)
+    else:
+      raise ValueError('axis must be 0 or 1')
+    vectors = [[x for x in values if x is not None and x != '']
+               for values in lists]
+    return names, vectors
+
+  def _reduce(self, stat, axis, func, vectorized=None):
+    """
+    Applies a reduction along an axis and returns the results as a ColumnStats.
+    The first row holds the head and the name of the statistic. Empty cells are
+    ignored. If NumPy is available and a vectorized form is given, all values
+    are reduced at once.
+
+    Args:
+      stat       (str)      : name of the statistic
+      axis       (int)      : 0 to reduce each column, 1 to reduce each row
+      func       (callable) : reduces a list of values
+      vectorized (callable) : reduces a NaN filled 2D array along the axis
+    """
+    if axis not in (0, 1):
+      raise ValueError('axis must be 0 or 1')
+    results = None
+    numpy = None if vectorized is None else import_numpy(required=False)
+    if numpy is not None and self.rows and self.columns:
+      try:
+        values, _, _ = self.to_ndarray(dtype=float, empty=float('nan'))
+      except (TypeError, ValueError):
+        values = None
+      if values is not None:
+        names = self.columns if axis == 0 else self.rows
+        with warnings.catch_warnings():
+          warnings.simplefilter('ignore', RuntimeWarning)
+          results = vectorized(numpy, values, axis).tolist()
+        results = ['' if math.isnan(x) else x for x in results]
+    if results is None:
+      names, vectors = self._vectors(axis)
+      results = [func(vector) for vector in vectors]
+
+    csv = Csv()
+    csv.raw = [[self.head(), stat]]
+    csv.raw.extend([name, result] for name, result in zip(names, results))
+    return ColumnStats.make_from_csv(csv)
+
+  def count(self, axis=0):
+    """
+    Counts the non-empty cells of each column (axis=0) or row (axis=1).
+
+    Returns:
+      (ColumnStats) : the count keyed by column or row name
+    """
+    return self._reduce('count', axis, len)
+
+  def sum(self, axis=0):
+    """
+    Sums the non-empty cells of each column (axis=0) or row (axis=1).
+
+    Returns:
+      (ColumnStats) : the sum keyed by column or row name
+    """
+    return self._reduce('sum', axis, sum)
+
+  def min(self, axis=0):
+    """
+    Finds the minimum non-empty cell of each column (axis=0) or row (axis=1).
+
+    Returns:
+      (ColumnStats) : the minimum keyed by column or row name, '' if empty
+    """
+    return self._reduce('min', axis, lambda v: min(v) if v else '')
+
+  def max(self, axis=0):
+    """
+    Finds the maximum non-empty cell of each column (axis=0) or row (axis=1).
+
+    Returns:
+      (ColumnStats) : the maximum keyed by column or row name, '' if empty
+    """
+    return self._reduce('max', axis, lambda v: max(v) if v else '')
+
+  def mean(self, axis=0):
+    """
+    Averages the non-empty cells of each column (axis=0) or row (axis=1).
+
+    Returns:
+      (ColumnStats) : the mean keyed by column or row name, '' if empty
+    """
+    return self._reduce(
+      'mean', axis, lambda v: math.fsum(v) / len(v) if v else '',
+      lambda numpy, values, axis: numpy.nanmean(values, axis=axis))
+
+  def std(self, axis=0):
+    """
+    Computes the population standard deviation of the non-empty cells of each
+    column (axis=0) or row (axis=1).
+
+    Returns:
+      (ColumnStats) : the deviation keyed by column or row name, '' if empty
+    """
+    def std(values):
+      if not values:
+        return ''
+      mean = math.fsum(values) / len(values)
+      return math.sqrt(math.fsum((x - mean) ** 2 for x in values) /
+                       len(values))
+    return self._reduce(
+      'std', axis, std,
+      lambda numpy, values, axis: numpy.nanstd(values, axis=axis))
+
+  def percentile(self, percent, axis=0):
+    """
+    Computes a percentile of the non-empty cells of each column (axis=0) or row
+    (axis=1) using linear interpolation between the closest ranks.
+
+    Args:
+      percent (float) : the percentile in [0, 100]
+
+    Returns:
+      (ColumnStats) : the percentile keyed by column or row name, '' if empty
+    """
+    if not 0 <= percent <= 100:
+      raise ValueError('percent must be in [0, 100]')
+
+    def percentile(values):
+      if not values:
+        return ''
+      values = sorted(values)
+      rank = (len(values) - 1) * percent / 100.0
+      low = math.floor(rank)
+      high = math.ceil(rank)
+      return values[low] + (values[high] - values[low]) * (rank - low)
+    return self._reduce(
+      'p{}'.format(percent), axis, percentile,
+      lambda numpy, values, axis: numpy.nanpercentile(values, percent,
+                                                      axis=axis))
@@ -0,0 +1,321 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import collections
+import itertools
+import threading
+import time
+
+# number of items pulled per timed batch by timed()
+BATCH = 1024
+
+def active():
+  """
+  Returns the enabled Recorder, or None.
+  """
+  return Recorder._enabled
+
+
+def utf8_len(text):
+  """
+  Returns the number of bytes of a text encoded as UTF-8, without encoding it
+  if it is ASCII.
+  """
+  return len(text) if text.isascii() else len(text.encode('utf-8'))
+
+
+def timed(record, name, iterable, size_of=None):
+  """
+  Generates the items of an iterable, pulling them in batches timed as a
+  phase. Chaining these times each stage of a pipeline separately while it
+  streams.
+
+  Args:
+    record   (Record)   : the Record to measure into
+    name     (str)      : the phase name
+    iterable (iterable) : the items
+    size_of  (callable) : adds the size of each item to record.bytes
+  """
+  iterator = iter(iterable)
+  while True:
+    with record.phase(name):
+      batch = list(itertools.islice(iterator, BATCH))
+    if not batch:
+      return
+    if size_of is not None:
+      record.bytes += sum(map(size_of, batch))
+    yield from batch
+
+
+class _Phase(object):
+  """
+  This is a context manager adding its elapsed time to a phase of a Record.
+  Phases nest exclusively: while an inner phase runs, the outer one is paused.
+  """
+
+  def __init__(self, record, name):
+    self._record = record
+    self._name = name
+    self._start = None
+
+  def _charge(self, now):
+    phases = self._record.phases
+    phases[self._name] = phases.get(self._name, 0.0) + now - self._start
+
+  def __enter__(self):
+    now = time.perf_counter()
+    stack = self._record._phases
+    if stack:
+      stack[-1]._charge(now)
+    stack.append(self)
+    self._start = now
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    now = time.perf_counter()
+    self._charge(now)
+    stack = self._record._phases
+    stack.pop()
+    if stack:
+      stack[-1]._start = now
+
+
+class Record(object):
+  """
+  This holds what was measured during one read, load or write.
+
+  Attributes:
+    operation (str)     : the outermost operation (e.g., 'GridStats.read')
+    source    (str)     : the file, or None for text
+    phases    (dict)    : seconds spent in each phase, in the order first
+                          seen, excluding the phases nested in it
+    seconds   (float)   : seconds spent in the whole operation
+    rows      (int)     : rows parsed or written
+    bytes     (int)     : bytes of (uncompressed) text read or written
+    counters  (Counter) : event counts, e.g., cells that autotype() parsed as
+                          float ('autotype_float') or kept as str
+                          ('autotype_str'), and cells violating their dtype
+                          ('dtype_fallback')
+  """
+
+  def __init__(self, name, source=None):
+    self.operation = name
+    self.source = source
+    self.phases = collections.OrderedDict()
+    self.seconds = 0.0
+    self.rows = 0
+    self.bytes = 0
+    self.counters = collections.Counter()
+    self._phases = []  # the phases in progress, innermost last
+
+  def __repr__(self):
+    return ('Record({!r}, source={!r}, seconds={:.6f}, rows={}, bytes={}, '
+            'phases={}, counters={})'.format(
+              self.operation, self.source, self.seconds, self.rows, self.bytes,
+              dict(self.phases), dict(self.counters)))
+
+  def phase(self, name):
+    """
+    Returns a context manager adding the time spent in it to a phase.
+
+    Args:
+      name (str) : the phase name
+    """
+    return _Phase(self, name)
+
+
+class _NullRecord(object):
+  """
+  This stands in for a Record while no Recorder is enabled. Whatever is
+  recorded into it is discarded.
+  """
+
+  rows = 0
+  bytes = 0
+
+  @property
+  def phases(self):
+    return {}
+
+  @property
+  def counters(self):
+    return collections.Counter()
+
+  def __setattr__(self, name, value):
+    pass
+
+  def __bool__(self):
+    return False
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    return False
+
+  def phase(self, _name):
+    return self
+
+
+_NULL = _NullRecord()
+
+
+class _Operation(object):
+  """
+  This is a context manager giving the Record of an operation. An operation
+  started while another one is in progress on the same thread records into the
+  outer operation's Record, so e.g. GridStats.read() produces one Record with
+  the phases of Csv.read() and the index building.
+  """
+
+  def __init__(self, recorder, name, source):
+    self._recorder = recorder
+    self._operation = name
+    self._source = source
+    self._record = None
+    self._start = None
+
+  def __enter__(self):
+    local = self._recorder._local
+    outer = getattr(local, 'record', None)
+    if outer is not None:
+      return outer
+    self._record = Record(self._operation, self._source)
+    local.record = self._record
+    self._start = time.perf_counter()
+    return self._record
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    if self._record is not None:
+      self._record.seconds = time.perf_counter() - self._start
+      self._recorder._local.record = None
+      if exc_type is None:
+        self._recorder._finish(self._record)
+    return False
+
+
+def operation(name, source=None):
+  """
+  Returns a context manager giving the Record to measure an operation into. It
+  gives a falsy stand-in that ignores everything while no Recorder is enabled.
+
+  Args:
+    name   (str) : the operation name
+    source (str) : the file, if any
+  """
+  recorder = Recorder._enabled
+  if recorder is None:
+    return _NULL
+  return _Operation(recorder, name, source)
+
+
+class Recorder(object):
+  """
+  This collects a Record for each read, load and write made while it is
+  enabled (Csv, GridStats and ColumnStats read() and load(), Csv.write() and
+  CsvWriter.write_rows()). Reads and writes stream as usual; each stage
+  (e.g., decompressing, decoding, splitting and parsing lines) is timed per
+  batch of lines. When no Recorder is enabled the only cost is a check per
+  operation.
+
+  Use it as a context manager or call enable() and disable(). One Recorder is
+  enabled at a time; enabling one replaces the previous one until disabled.
+  Reads made in worker processes are not recorded.
+  """
+
+  # the enabled Recorder, or None
+  _enabled = None
+
+  def __init__(self, callback=None, keep=True):
+    """
+    Args:
+      callback (callable) : called with each finished Record
+      keep     (bool)     : keep the Records in 'records'
+    """
+    self.callback = callback
+    self.keep = keep
+    self.records = []
+    self._local = threading.local()
+    self._lock = threading.Lock()
+    self._previous = None
+
+  def enable(self):
+    """
+    Starts recording.
+    """
+    if Recorder._enabled is not self:
+      self._previous = Recorder._enabled
+      Recorder._enabled = self
+
+  def disable(self):
+    """
+    Stops recording, re-enabling the Recorder this one replaced.
+    """
+    if Recorder._enabled is self:
+      Recorder._enabled = self._previous
+      self._previous = None
+
+  def __enter__(self):
+    self.enable()
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.disable()
+
+  def _finish(self, record):
+    """
+    Keeps a finished Record and passes it to the callback.
+    """
+    if self.keep:
+      with self._lock:
+        self.records.append(record)
+    if self.callback is not None:
+      self.callback(record)
+
+  def totals(self):
+    """
+    Returns the sums over the kept Records as a Record named 'total'.
+    """
+    total = Record('total')
+    with self._lock:
+      for record in self.records:
+        for name, seconds in record.phases.items():
+          total.phases[name] = total.phases.get(name, 0.0) + seconds
+        total.seconds += record.seconds
+        total.rows += record.rows
+        total.bytes += record.bytes
+        total.counters.update(record.counters)
+    return total
+
+  def clear(self):
+    """
+    Removes the kept Records.
+    """
+    with self._lock:
+      self.records = []
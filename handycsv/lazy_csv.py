@@ -0,0 +1,293 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import array
+import mmap
+
+from .compression import is_compressed
+from .csv import Csv
+
+
+class LazyCsv(Csv):
+  """
+  This represents a CSV file opened over a memory map. Opening only finds where
+  each row starts. A row is parsed the first time it is accessed and then kept.
+  Reading a few rows of a large file therefore costs little time or memory.
+  Accessing 'raw' or modifying the structure (adding, removing, transposing,
+  etc.) parses all rows, after which it behaves like a Csv.
+  """
+
+  def __init__(self):
+    """
+    Constructs an empty LazyCsv. Use LazyCsv.open() to open a file.
+    """
+    super().__init__()
+    self._file = None
+    self._mmap = None
+    self._starts = None
+    self._end = None
+    self._count = 0
+    self._cache = None
+    self._parse = None
+    self._parse_first = None
+
+  @staticmethod
+  def open(filename, delimiter=',', dtypes=None):
+    """
+    Opens an uncompressed CSV file without parsing it.
+    Values default to int, then float, then str, unless dtypes is given.
+
+    Args:
+      filename  (str)      : name of file to open
+      delimiter (str)      : value separator
+      dtypes    (list/str) : per-column types, 'infer', or None (see Csv.load)
+    """
+    if is_compressed(filename):
+      raise ValueError('LazyCsv requires an uncompressed file')
+    csv = LazyCsv()
+    csv._source = filename
+    csv._file = open(filename, 'rb')
+    try:
+      csv._mmap = mmap.mmap(csv._file.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+      # empty files can't be mapped
+      csv._file.close()
+      csv._file = None
+      return csv
+    csv._index()
+    csv._prepare(delimiter, dtypes)
+    return csv
+
+  def _prepare(self, delimiter, dtypes):
+    """
+    Sets up on demand parsing once the rows have been located.
+
+    Args:
+      delimiter (str)      : value separator
+      dtypes    (list/str) : per-column types, 'infer', or None (see Csv.load)
+    """
+    self._cache = {}
+    self._raw = None
+    if not self._count:
+      self.raw = [['']]
+      return
+
+    inferred = isinstance(dtypes, str)
+    if inferred:
+      sample = [self._line(row) for row in
+                range(min(self._count, Csv.INFER_ROWS + 1))]
+      dtypes = Csv._resolve_dtypes(sample, delimiter, dtypes)
+    self._parse = Csv._row_parser(delimiter, dtypes)
+    # with inferred types the first row is autotyped (see Csv._parse_lines)
+    self._parse_first = Csv._row_parser(delimiter) if inferred else self._parse
+
+  def _index(self):
+    """
+    Finds the start of every row line. Leading and trailing blank lines are
+    dropped like Csv.load() does.
+    """
+    mm = self._mmap
+    size = len(mm)
+    starts = array.array('q')
+    position = 0
+    while position < size:
+      starts.append(position)
+      position = mm.find(b'\n', position) + 1
+      if position == 0:
+        position = size
+    self._starts = starts
+    self._end = size if size == 0 or mm[size - 1] != ord('\n') else size - 1
+
+    def blank(row):
+      return not self._raw_line(row).strip()
+    while self._starts and blank(len(self._starts) - 1):
+      self._end = self._starts.pop() - 1
+    first = next((row for row in range(len(self._starts)) if not blank(row)),
+                 len(self._starts))
+    del self._starts[:first]
+    self._count = len(self._starts)
+
+  def _raw_line(self, row):
+    """
+    Returns the text of a row's line without the terminator or edge stripping.
+    """
+    start = self._starts[row]
+    if row + 1 < len(self._starts):
+      end = self._starts[row + 1] - 1
+    else:
+      end = self._end
+    return self._mmap[start:end].decode('utf-8')
+
+  def _line(self, row):
+    """
+    Returns the text of a row's line with the edges of the text stripped.
+    """
+    line = self._raw_line(row)
+    if row == 0:
+      line = line.lstrip()
+    if row == self._count - 1:
+      line = line.rstrip()
+    return line
+
+  def _fetch(self, row):
+    """
+    Returns the (cached) parsed row, parsing it if needed.
+    """
+    num_rows = self._count
+    if row < 0:
+      row += num_rows
+    if not 0 <= row < num_rows:
+      raise IndexError('row index out of range')
+    values = self._cache.get(row)
+    if values is None:
+      if self._file is None:
+        raise ValueError('I/O operation on closed LazyCsv')
+      parse = self._parse_first if row == 0 else self._parse
+      values = parse(self._line(row))
+      self._cache[row] = values
+    return values
+
+  def _lazy(self):
+    """
+    Returns True iff rows are still parsed on demand.
+    """
+    return self._raw is None
+
+  @property
+  def raw(self):
+    """
+    The rows as a list of lists. Accessing this parses every row and closes the
+    file.
+    """
+    if self._raw is None:
+      self._raw = [self._fetch(row) for row in range(self._count)]
+      self._starts = None
+      self._cache = None
+      self.close()
+    return self._raw
+
+  @raw.setter
+  def raw(self, rows):
+    self._raw = rows
+    self._starts = None
+    self._cache = None
+    self.close()
+
+  def close(self):
+    """
+    Closes the memory map and file. If rows are still parsed on demand, rows
+    not parsed yet can't be accessed afterwards. Access 'raw' first to keep all
+    of them.
+    """
+    if getattr(self, '_mmap', None) is not None:
+      self._mmap.close()
+      self._mmap = None
+    if getattr(self, '_file', None) is not None:
+      self._file.close()
+      self._file = None
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+  def num_parsed(self):
+    """
+    Returns the number of rows parsed so far.
+    """
+    if self._lazy():
+      return len(self._cache)
+    return self.num_rows()
+
+  def _rows(self):
+    if self._lazy():
+      return (self._fetch(row) for row in range(self._count))
+    return self._raw
+
+  def _share_rows(self):
+    if self._lazy():
+      # rows parsed on demand are modified in place, so they are copied
+      return (list(values) for values in self._rows())
+    return Csv._share_rows(self)
+
+  def num_rows(self):
+    """
+    Returns the number of rows.
+    """
+    if self._lazy():
+      return self._count
+    return len(self._raw)
+
+  def num_columns(self, row):
+    """
+    Return the number of columns for a specific row.
+
+    Args:
+      row (int) : row index
+    """
+    if self._lazy():
+      return len(self._fetch(row))
+    return len(self._raw[row])
+
+  def _row_values(self, row):
+    if self._lazy():
+      return self._fetch(row)
+    return self._raw[row]
+
+  def get(self, row, column, default=None):
+    """
+    Gets a value by reference of row and column.
+
+    Args:
+      row    (int) : row index
+      column (int) : column index
+      default      : default value if location is '' or None
+    """
+    if self._lazy():
+      val = self._fetch(row)[column]
+      if (val is None or val == '') and default is not None:
+        return default
+      return val
+    return Csv.get(self, row, column, default)
+
+  def set(self, row, column, value):
+    """
+    Sets a value by reference of row and column.
+
+    Args:
+      row    (int) : row index
+      column (int) : column index
+      value        : value
+    """
+    if self._lazy():
+      self._fetch(row)[column] = value
+    else:
+      Csv.set(self, row, column, value)
@@ -0,0 +1,79 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+def position(names, index):
+  """
+  Returns where list.insert() would place a name inserted before index.
+
+  Args:
+    names ([str]) : the names
+    index (int)   : the insertion index (None for the end)
+  """
+  length = len(names)
+  if index is None:
+    return length
+  if index < 0:
+    return max(0, index + length)
+  return min(index, length)
+
+
+def insert_name(names, name_index, name, at, offset):
+  """
+  Inserts a name into a list of names and updates the map from name to
+  position, shifting only the names after it. Appending is O(1).
+
+  Args:
+    names      ([str]) : the names
+    name_index (dict)  : map from name to position plus offset
+    name       (str)   : the new name
+    at         (int)   : position of the new name in names
+    offset     (int)   : difference between positions in the map and in names
+  """
+  names.insert(at, name)
+  for pos in range(at, len(names)):
+    name_index[names[pos]] = pos + offset
+
+
+def remove_name(names, name_index, at, offset):
+  """
+  Removes a name from a list of names and updates the map from name to
+  position, shifting only the names after it.
+
+  Args:
+    names      ([str]) : the names
+    name_index (dict)  : map from name to position plus offset
+    at         (int)   : position of the name in names
+    offset     (int)   : difference between positions in the map and in names
+  """
+  del name_index[names.pop(at)]
+  for pos in range(at, len(names)):
+    name_index[names[pos]] = pos + offset
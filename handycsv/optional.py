@@ -0,0 +1,76 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+def import_numpy(required=True):
+  """
+  Imports NumPy on demand. NumPy is an optional dependency only needed by the
+  array conversion methods and used to speed up some others.
+
+  Args:
+    required (bool) : raise ImportError if missing, otherwise return None
+
+  Returns:
+    (module) : the numpy module
+  """
+  try:
+    import numpy  # pylint: disable=import-outside-toplevel
+  except ImportError:
+    if not required:
+      return None
+    raise ImportError('NumPy is required for this operation, install it via '
+                      'pip: pip3 install numpy')
+  return numpy
+
+
+def numpy_dtype(values, dtype):
+  """
+  Returns the dtype to use when converting the values to an array. Without an
+  explicit dtype anything that is not all numbers becomes 'object' so strings
+  are not coerced into fixed width text.
+
+  Args:
+    values (iterable) : the values to convert
+    dtype             : the requested dtype or None
+  """
+  if dtype is not None:
+    return dtype
+  for value in values:
+    if type(value) not in (int, float):
+      return object
+  return None
+
+
+def to_list(values):
+  """
+  Returns the values as a list of Python objects, converting arrays via tolist().
+  """
+  return values.tolist() if hasattr(values, 'tolist') else list(values)
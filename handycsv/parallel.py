@@ -0,0 +1,158 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import concurrent.futures
+import os
+
+
+class ReadManyError(Exception):
+  """
+  This is raised when reading many files and any of them fail. The failures are
+  listed in the order the files were given.
+
+  Attributes:
+    failures [(str, str)] : the filename and error description of each failure
+    results  [object]     : the objects read in input order, None for failures
+  """
+
+  def __init__(self, failures, results):
+    lines = ['{0}: {1}'.format(filename, error) for filename, error in failures]
+    super().__init__('failed to read {0} of {1} files:\n  {2}'.format(
+      len(failures), len(results), '\n  '.join(lines)))
+    self.failures = failures
+    self.results = results
+
+
+def _describe(error):
+  """
+  Returns a description of an exception that survives any pickling issue.
+  """
+  return '{0}: {1}'.format(type(error).__name__, error)
+
+
+def _read_one(reader, filename, kwargs):
+  """
+  Reads one file, returning (True, object) or (False, error description).
+  """
+  try:
+    return True, reader(filename, **kwargs)
+  except Exception as error:  # pylint: disable=broad-except
+    return False, _describe(error)
+
+
+def read_many(reader, filenames, workers=None, kwargs=None):
+  """
+  Reads files in a pool of processes and returns the objects in input order.
+
+  Args:
+    reader    (callable) : module level function reading one file
+    filenames ([str])    : the files to read
+    workers   (int)      : number of processes (None for the CPU count, 1 reads
+                           sequentially in this process)
+    kwargs    (dict)     : keyword arguments passed to the reader
+
+  Returns:
+    ([object]) : the objects returned by the reader
+
+  Raises:
+    ReadManyError : if any file fails, after all files have been attempted
+  """
+  filenames = list(filenames)
+  kwargs = kwargs or {}
+  if workers is not None and workers < 1:
+    raise ValueError('workers must be >= 1')
+
+  if workers == 1 or len(filenames) < 2:
+    outcomes = [_read_one(reader, filename, kwargs) for filename in filenames]
+  else:
+    outcomes = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+      futures = [pool.submit(_read_one, reader, filename, kwargs)
+                 for filename in filenames]
+      for future in futures:
+        try:
+          outcomes.append(future.result())
+        except Exception as error:  # pylint: disable=broad-except
+          outcomes.append((False, _describe(error)))
+
+  results = [value if ok else None for ok, value in outcomes]
+  failures = [(filename, value) for filename, (ok, value)
+              in zip(filenames, outcomes) if not ok]
+  if failures:
+    raise ReadManyError(failures, results)
+  return results
+
+
+def split_file(filename, pieces):
+  """
+  Splits a file into at most the given number of byte ranges of roughly equal
+  size, each starting at the beginning of a line.
+
+  Args:
+    filename (str) : name of an uncompressed file
+    pieces   (int) : the desired number of ranges
+
+  Returns:
+    ([(int, int)]) : the [start, end) offsets of the ranges
+  """
+  size = os.path.getsize(filename)
+  bounds = [0]
+  with open(filename, 'rb') as fd:
+    for piece in range(1, pieces):
+      target = size * piece // pieces
+      if target <= bounds[-1]:
+        continue
+      fd.seek(target - 1)
+      fd.readline()
+      position = fd.tell()
+      if position >= size:
+        break
+      if position > bounds[-1]:
+        bounds.append(position)
+  bounds.append(size)
+  return [(start, end) for start, end in zip(bounds[:-1], bounds[1:])
+          if end > start]
+
+
+def map_processes(func, arguments, workers):
+  """
+  Calls a function for each tuple of arguments in a pool of processes.
+
+  Args:
+    func      (callable) : module level function to call
+    arguments ([tuple])  : the positional arguments of each call
+    workers   (int)      : number of processes
+
+  Returns:
+    ([object]) : the return values in the order of the arguments
+  """
+  with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+    futures = [pool.submit(func, *args) for args in arguments]
+    return [future.result() for future in futures]
@@ -0,0 +1,236 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import array
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+from ._version import __version__
+
+# suffix of the cache file kept next to the CSV file
+SUFFIX = '.cache'
+
+# version of the cache file layout and of the parsing rules
+FORMAT = 3
+
+
+def cache_file(filename, cache):
+  """
+  Returns the name of the cache file of a CSV file.
+
+  Args:
+    filename (str)      : name of the CSV file
+    cache    (bool/str) : True for a file next to the CSV file, or the name of
+                          a directory holding cache files
+  """
+  if cache is True:
+    return filename + SUFFIX
+  digest = hashlib.sha1(os.path.realpath(filename).encode('utf-8')).hexdigest()
+  return os.path.join(cache, digest + SUFFIX)
+
+
+def _is_named(func):
+  """
+  Returns True iff a callable is reachable by its module and qualified name,
+  so its name identifies it (unlike, e.g., lambdas and nested functions).
+  """
+  module = sys.modules.get(getattr(func, '__module__', None))
+  qualname = getattr(func, '__qualname__', None)
+  if module is None or not qualname:
+    return False
+  found = module
+  for part in qualname.split('.'):
+    found = getattr(found, part, None)
+  return found is func
+
+
+def describe_options(options):
+  """
+  Returns a picklable description of parsing options. Callables (e.g., dtypes)
+  are described by name.
+
+  Raises:
+    ValueError : if a callable can't be identified by its name, in which case
+                 results parsed with the options must not be cached
+  """
+  if isinstance(options, (list, tuple)):
+    return tuple(describe_options(option) for option in options)
+  if callable(options):
+    if not _is_named(options):
+      raise ValueError('{!r} is not identified by its name'.format(options))
+    return '{0}.{1}'.format(options.__module__, options.__qualname__)
+  return options
+
+
+def _key(filename, stat, options):
+  """
+  Returns what a cache file must match to be used for a CSV file, in the form
+  it has after a round trip through JSON.
+  """
+  return json.loads(json.dumps(
+    [FORMAT, __version__, os.path.realpath(filename), stat.st_size,
+     stat.st_mtime_ns, describe_options(options)]))
+
+
+def _encode(values):
+  """
+  Returns the type code and bytes of a column of values: 'q' or 'd' for an
+  array of ints or floats, or 'json' for anything else.
+
+  Raises:
+    TypeError : if a value isn't an int, float or str
+  """
+  kinds = set(map(type, values))
+  if kinds == {int}:
+    try:
+      return 'q', array.array('q', values).tobytes()
+    except OverflowError:
+      pass
+  elif kinds == {float}:
+    return 'd', array.array('d', values).tobytes()
+  if not kinds <= {int, float, str}:
+    raise TypeError('values of type {} can\'t be cached'.format(kinds))
+  return 'json', json.dumps(values, separators=(',', ':')).encode('utf-8')
+
+
+def _decode(code, data, swap):
+  """
+  Returns the column of values encoded by _encode().
+  """
+  if code == 'json':
+    values = json.loads(data.decode('utf-8'))
+    if not isinstance(values, list):
+      raise ValueError('bad column')
+    return values
+  values = array.array(code)
+  values.frombytes(data)
+  if swap:
+    values.byteswap()
+  return values.tolist()
+
+
+def load(filename, cache, options):
+  """
+  Returns the rows cached for a CSV file, or None if there is no usable cache
+  file. A cache file is only used if it matches the CSV file's path, size,
+  modification time, the handycsv version and the parsing options. Options
+  that can't be described (see describe_options()) are never cached. Cache
+  files hold JSON and raw arrays, so loading one never runs code from it.
+
+  Args:
+    filename (str)      : name of the CSV file
+    cache    (bool/str) : see cache_file()
+    options             : the parsing options
+  """
+  try:
+    stat = os.stat(filename)
+    expected = _key(filename, stat, options)
+    with open(cache_file(filename, cache), 'rb') as fd:
+      header = json.loads(fd.readline().decode('utf-8'))
+      if header['key'] != expected:
+        return None
+      swap = header['byteorder'] != sys.byteorder
+      columns = []
+      for code, size in header['columns']:
+        data = fd.read(size)
+        if len(data) != size:
+          return None
+        columns.append(_decode(code, data, swap))
+      num_rows = header['rows']
+      lengths = header['lengths']
+      if lengths is None:
+        if any(len(column) != num_rows for column in columns):
+          return None
+        return [list(row) for row in zip(*columns)]
+      if len(lengths) != num_rows or any(
+          len(column) != sum(1 for length in lengths if length > index)
+          for index, column in enumerate(columns)):
+        return None
+      iters = [iter(column) for column in columns]
+      return [[next(values) for values in iters[:length]]
+              for length in lengths]
+  except Exception:  # pylint: disable=broad-except
+    # missing, stale or corrupt cache files are ignored
+    return None
+
+
+def save(filename, cache, options, stat, rows):
+  """
+  Writes the rows parsed from a CSV file to its cache file. The file is
+  replaced atomically. This is best effort: nothing is saved if the cache file
+  can't be written or a value isn't an int, float or str.
+
+  Args:
+    filename (str)      : name of the CSV file
+    cache    (bool/str) : see cache_file()
+    options             : the parsing options
+    stat                : os.stat() of the CSV file taken before parsing it
+    rows     ([[]])     : the parsed rows
+  """
+  try:
+    key = _key(filename, stat, options)
+    lengths = [len(row) for row in rows]
+    if len(set(lengths)) == 1:
+      lengths = None
+      columns = zip(*rows)
+    else:
+      columns = ([row[index] for row in rows if len(row) > index]
+                 for index in range(max(lengths)))
+    encoded = [_encode(list(column)) for column in columns]
+  except (TypeError, ValueError):
+    return
+  header = {
+    'key': key,
+    'byteorder': sys.byteorder,
+    'rows': len(rows),
+    'lengths': lengths,
+    'columns': [[code, len(data)] for code, data in encoded],
+  }
+
+  path = cache_file(filename, cache)
+  try:
+    if cache is not True:
+      os.makedirs(cache, exist_ok=True)
+    fd, temp = tempfile.mkstemp(prefix=os.path.basename(path) + '.',
+                                dir=os.path.dirname(path) or '.')
+  except OSError:
+    return
+  try:
+    with os.fdopen(fd, 'wb') as out:
+      out.write(json.dumps(header).encode('utf-8') + b'\n')
+      for _, data in encoded:
+        out.write(data)
+    os.replace(temp, path)
+  except Exception:  # pylint: disable=broad-except
+    if os.path.exists(temp):
+      os.remove(temp)
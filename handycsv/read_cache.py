@@ -0,0 +1,210 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import collections
+import os
+import sys
+import threading
+
+from .csv import Csv
+from .parse_cache import describe_options
+
+# number of rows sampled when estimating the memory used by a Csv
+_SAMPLE_ROWS = 64
+
+
+def estimate_bytes(obj):
+  """
+  Returns an estimate of the memory used by a Csv, GridStats or ColumnStats,
+  extrapolated from a sample of its rows.
+
+  Args:
+    obj : the object
+  """
+  csv = obj if isinstance(obj, Csv) else obj.csv
+  num_rows = csv.num_rows()
+  step = max(1, num_rows // _SAMPLE_ROWS)
+  sample = range(0, num_rows, step)
+  total = 0
+  for row in sample:
+    values = csv._row_values(row)
+    total += sys.getsizeof(values) + sum(sys.getsizeof(x) for x in values)
+  estimate = sys.getsizeof([]) + 8 * num_rows + total * num_rows // len(sample)
+  for name in ('rows', 'row_index', 'columns', 'column_index'):
+    index = getattr(obj, name, None)
+    if index is not None:
+      estimate += sys.getsizeof(index)
+  return estimate
+
+
+def _private_copy(obj):
+  """
+  Returns a copy of a Csv, GridStats or ColumnStats that shares no rows with
+  it, so even modifying the copy's rows directly leaves the original intact.
+  """
+  copy = obj.copy()
+  (copy if isinstance(copy, Csv) else copy.csv)._own_all()
+  return copy
+
+
+class ReadCache(object):
+  """
+  This keeps recently read files in memory so reading an unchanged file again
+  doesn't parse it. Entries are keyed by the file's real path, size and
+  modification time plus the read options, and the least recently used ones
+  are evicted when their estimated memory exceeds max_bytes. Each read returns
+  a copy of the cached object whose rows are its own, so modifying it, even
+  through 'raw', doesn't modify the cache. The values themselves are shared.
+  It is safe to use from several threads.
+
+  Attributes:
+    hits      (int) : reads answered from the cache
+    misses    (int) : reads that parsed the file
+    evictions (int) : entries removed to make room or because the file changed
+  """
+
+  # default memory bound of the shared cache
+  MAX_BYTES = 1 << 30
+
+  _shared = None
+  _shared_lock = threading.Lock()
+
+  def __init__(self, max_bytes=MAX_BYTES):
+    """
+    Constructs an empty cache.
+
+    Args:
+      max_bytes (int) : bound on the estimated memory of the cached objects
+    """
+    if max_bytes < 1:
+      raise ValueError('max_bytes must be >= 1')
+    self.max_bytes = max_bytes
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self._entries = collections.OrderedDict()  # key -> (object, bytes)
+    self._versions = {}  # path -> (size, mtime) of the latest read
+    self._bytes = 0
+    self._lock = threading.Lock()
+
+  @staticmethod
+  def shared():
+    """
+    Returns the process wide cache, creating it on first use.
+    """
+    with ReadCache._shared_lock:
+      if ReadCache._shared is None:
+        ReadCache._shared = ReadCache()
+      return ReadCache._shared
+
+  def read(self, filename, kind=Csv, transpose=False, dtypes=None):
+    """
+    Reads a file with kind.read(), or returns a copy of the cached result.
+
+    Args:
+      filename  (str)      : name of file to open (auto .gz if given)
+      kind      (type)     : Csv, GridStats or ColumnStats (or a class with
+                             compatible read() and copy() methods)
+      transpose (bool)     : to transpose the input
+      dtypes    (list/str) : per-column types, 'infer', or None (see Csv.load).
+                             Results are only cached if the types are named
+                             (e.g., not lambdas).
+    """
+    path = os.path.realpath(filename)
+    stat = os.stat(path)
+    try:
+      options = describe_options(dtypes)
+    except ValueError:
+      # dtypes that can't be told apart by name are read without caching
+      with self._lock:
+        self.misses += 1
+      return kind.read(filename, transpose=transpose, dtypes=dtypes)
+    key = (path, stat.st_size, stat.st_mtime_ns, kind.__module__,
+           kind.__qualname__, transpose, options)
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is not None:
+        self._entries.move_to_end(key)
+        self.hits += 1
+      else:
+        self.misses += 1
+    if entry is not None:
+      return _private_copy(entry[0])
+
+    obj = kind.read(filename, transpose=transpose, dtypes=dtypes)
+    size = estimate_bytes(obj)
+    with self._lock:
+      # entries of an older version of the file are no longer useful
+      version = key[1:3]
+      if self._versions.get(path, version) != version:
+        for old in [k for k in self._entries if k[0] == path]:
+          self._remove(old)
+      self._versions[path] = version
+      if size <= self.max_bytes and key not in self._entries:
+        self._entries[key] = (obj, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+          self._remove(next(iter(self._entries)))
+    return _private_copy(obj)
+
+  def _remove(self, key):
+    """
+    Evicts an entry. The lock must be held.
+    """
+    _, size = self._entries.pop(key)
+    self._bytes -= size
+    self.evictions += 1
+
+  def __len__(self):
+    return len(self._entries)
+
+  def size_bytes(self):
+    """
+    Returns the estimated memory of the cached objects.
+    """
+    return self._bytes
+
+  def stats(self):
+    """
+    Returns the counters as a dict.
+    """
+    with self._lock:
+      return {'hits': self.hits, 'misses': self.misses,
+              'evictions': self.evictions, 'entries': len(self._entries),
+              'bytes': self._bytes}
+
+  def clear(self):
+    """
+    Removes all entries without counting them as evictions.
+    """
+    with self._lock:
+      self._entries.clear()
+      self._versions.clear()
+      self._bytes = 0
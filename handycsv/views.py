@@ -0,0 +1,180 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+import itertools
+
+
+class _View(object):
+  """
+  This is the base of read-only views of one row or column of a Csv or
+  GridStats. A view doesn't copy the values; it reads them when accessed, so it
+  sees later changes to the values. A view of a GridStats keeps the name of its
+  row or column and looks it up on every access, so it also follows rows and
+  columns being added, removed or sorted. A view with names is indexed by name,
+  and one without by position. at() always takes a position. Positions are
+  counted from 'start'. Slices are always positional.
+  """
+
+  def __init__(self, csv, index, start=0, grid=None):
+    """
+    Constructs a view.
+
+    Args:
+      csv   (Csv)       : the viewed Csv (None if grid is given)
+      index             : index of the viewed row or column, or its name if
+                          grid is given
+      start (int)       : Csv index of the view's position 0
+      grid  (GridStats) : the viewed GridStats, whose names index the view
+    """
+    self._csv = csv
+    self._index = index
+    self._start = start
+    self._grid = grid
+
+  def _locate(self):
+    """
+    Returns the viewed Csv, the Csv index of the viewed row or column, and the
+    map from name to Csv index of its values (None without names).
+    """
+    raise NotImplementedError
+
+  def _get(self, index):
+    """
+    Returns the value at a Csv index of the viewed row or column.
+
+    Args:
+      index (int) : the Csv index
+    """
+    raise NotImplementedError
+
+  def _position(self, position):
+    """
+    Returns the Csv index of a position.
+    """
+    if not isinstance(position, int):
+      raise IndexError('{} is not a position'.format(position))
+    length = len(self)
+    if position < 0:
+      position += length
+    if not 0 <= position < length:
+      raise IndexError('position out of range')
+    return position + self._start
+
+  def __getitem__(self, key):
+    if isinstance(key, slice):
+      return self.tolist()[key]
+    names = self._locate()[2]
+    if names is None:
+      return self._get(self._position(key))
+    try:
+      index = names[key]
+    except (KeyError, TypeError):
+      raise IndexError('{} is not a name'.format(key))
+    return self._get(index)
+
+  def at(self, position):
+    """
+    Returns the value at a position, whether or not the view has names.
+
+    Args:
+      position (int) : the position, negative counts from the end
+    """
+    return self._get(self._position(position))
+
+  def __contains__(self, value):
+    return any(x == value for x in self)
+
+  def __eq__(self, other):
+    if isinstance(other, _View):
+      other = other.tolist()
+    return self.tolist() == other
+
+  def __repr__(self):
+    return '{}({})'.format(type(self).__name__, self.tolist())
+
+  def tolist(self):
+    """
+    Returns the values as a new list.
+    """
+    return list(self)
+
+
+class RowView(_View):
+  """
+  This is a read-only view of one row of a Csv or GridStats.
+  """
+
+  def _locate(self):
+    grid = self._grid
+    if grid is None:
+      return self._csv, self._index, None
+    try:
+      return grid.csv, grid.row_index[self._index], grid.column_index
+    except KeyError:
+      raise IndexError('row={0} doesn\'t exist'.format(self._index))
+
+  def __len__(self):
+    csv, row, _ = self._locate()
+    return csv.num_columns(row) - self._start
+
+  def _get(self, index):
+    csv, row, _ = self._locate()
+    return csv.get(row, index)
+
+  def __iter__(self):
+    csv, row, _ = self._locate()
+    return itertools.islice(csv._row_values(row), self._start, None)
+
+
+class ColumnView(_View):
+  """
+  This is a read-only view of one column of a Csv or GridStats.
+  Requires all rows to have this column.
+  """
+
+  def _locate(self):
+    grid = self._grid
+    if grid is None:
+      return self._csv, self._index, None
+    try:
+      return grid.csv, grid.column_index[self._index], grid.row_index
+    except KeyError:
+      raise IndexError('column={0} doesn\'t exist'.format(self._index))
+
+  def __len__(self):
+    return self._locate()[0].num_rows() - self._start
+
+  def _get(self, index):
+    csv, column, _ = self._locate()
+    return csv.get(index, column)
+
+  def __iter__(self):
+    csv, column, _ = self._locate()
+    return iter(csv._column_values(column, self._start))
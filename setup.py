@@ -52,7 +52,7 @@ def find_version(*file_paths):
 
 setup(
     name='handycsv',
-    version=find_version('handycsv', '__init__.py'),
+    version=find_version('handycsv', '_version.py'),
     description='CSV files as objects',
     author='Nic McDonald',
     author_email='nicci02@hotmail.com',
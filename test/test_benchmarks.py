@@ -0,0 +1,85 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# Python 3 compatibility
+from __future__ import (absolute_import, division,
+                        print_function, unicode_literals)
+
+import io
+import os
+import json
+import contextlib
+import handycsv
+import unittest
+import tempfile
+
+import benchmarks.__main__
+from benchmarks import suite
+from benchmarks.data import Dataset
+
+
+class TestBenchmarks(unittest.TestCase):
+
+  def test_suite(self):
+    with tempfile.TemporaryDirectory() as directory:
+      data = Dataset(directory, 30, 4)
+      self.assertEqual(handycsv.Csv.read(data.files['.csv.gz']), data.csv)
+      document = suite.run(data, repeat=1, only='^Csv')
+    self.assertEqual(set(document['results']),
+                     {case.name for case in suite.CASES
+                      if case.name.startswith('Csv')})
+    result = document['results']['Csv.load']
+    self.assertGreater(result['rows_per_s'], 0)
+    self.assertGreater(result['mb_per_s'], 0)
+    self.assertGreater(result['peak_bytes'], 0)
+
+    baseline = json.loads(json.dumps(document))
+    self.assertEqual(suite.compare(document, baseline, 0.25), [])
+    baseline['results']['Csv.sort']['seconds'] /= 2
+    del baseline['results']['Csv.copy']
+    regressions = suite.compare(document, baseline, 0.25)
+    self.assertEqual([name for name, _, _ in regressions], ['Csv.sort'])
+    baseline['meta']['rows'] += 1
+    with self.assertRaises(ValueError):
+      suite.compare(document, baseline, 0.25)
+
+  def test_main(self):
+    _, output = tempfile.mkstemp(prefix='TestBenchmarks', suffix='.json')
+    args = ['-r', '20', '-c', '3', '-n', '1', '-k', 'GridStats']
+    printed = io.StringIO()
+    with contextlib.redirect_stdout(printed):
+      self.assertEqual(benchmarks.__main__.main(args + ['-o', output]), 0)
+      self.assertIn('GridStats.remove_row', suite.load(output)['results'])
+      self.assertEqual(benchmarks.__main__.main(
+        args + ['-b', output, '-t', '1000']), 0)
+    self.assertIn('20 rows x 3 columns', printed.getvalue())
+    self.assertIn('GridStats.remove_row', printed.getvalue())
+    os.remove(output)
@@ -0,0 +1,183 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# Python 3 compatibility
+from __future__ import (absolute_import, division,
+                        print_function, unicode_literals)
+
+import os
+import handycsv
+import unittest
+import tempfile
+
+try:
+  import numpy
+except ImportError:
+  numpy = None
+
+
+class TestColumnarCsv(unittest.TestCase):
+
+  @staticmethod
+  def make_str(raw_vals, delimiter=','):
+    return ''.join(delimiter.join([str(v) for v in row]) + '\n'
+                   for row in raw_vals)
+
+  k4x4 = [
+    ['-', 'a', 'b', 'c'],
+    ['d', 0, 1.5, ''],
+    ['e', 3, 4.5, 5],
+    ['f', 6, 7.5, 'x']
+  ]
+
+  def check(self, csv, raw):
+    self.assertEqual(csv.num_rows(), len(raw))
+    self.assertEqual(csv.row_lengths(), [len(row) for row in raw])
+    self.assertEqual(str(csv), TestColumnarCsv.make_str(raw))
+    for row in range(len(raw)):
+      self.assertEqual(csv.get_row(row), raw[row])
+      for col in range(len(raw[row])):
+        self.assertEqual(csv.get(row, col), raw[row][col])
+        self.assertIs(type(csv.get(row, col)), type(raw[row][col]))
+    for col in range(len(raw[0])):
+      self.assertEqual(csv.get_column(col), [row[col] for row in raw])
+    with self.assertRaises(IndexError):
+      csv.get(len(raw), 0)
+    with self.assertRaises(IndexError):
+      csv.get_row(len(raw))
+    self.assertEqual(csv, handycsv.Csv.load(TestColumnarCsv.make_str(raw)))
+
+  def test_columnar(self):
+    text = TestColumnarCsv.make_str(TestColumnarCsv.k4x4)
+    csv = handycsv.ColumnarCsv.load(text)
+    self.assertIsInstance(csv, handycsv.Csv)
+    self.check(csv, TestColumnarCsv.k4x4)
+    self.check(handycsv.ColumnarCsv.make_from_csv(handycsv.Csv.load(text)),
+               TestColumnarCsv.k4x4)
+    self.check(csv.copy(), TestColumnarCsv.k4x4)
+    self.assertTrue(csv.is_rectangular())
+    self.assertTrue(csv.is_square())
+
+    with self.assertRaises(ValueError):
+      handycsv.ColumnarCsv.load('a,b\nc\n')
+    with self.assertRaises(ValueError):
+      handycsv.ColumnarCsv([1, 2])
+
+    # transpose
+    csvt = csv.transpose()
+    self.check(csvt, [list(row) for row in zip(*TestColumnarCsv.k4x4)])
+    self.check(handycsv.ColumnarCsv.load(text, transpose=True),
+               [list(row) for row in zip(*TestColumnarCsv.k4x4)])
+
+    # set, including values that don't match the column's storage
+    raw = [list(row) for row in TestColumnarCsv.k4x4]
+    for row, col, value in [(1, 1, 10), (2, 1, 'y'), (1, 2, 2), (3, 3, 9.5),
+                            (0, 0, 12), (-1, -1, 'z')]:
+      csv.set(row, col, value)
+      raw[row][col] = value
+    self.check(csv, raw)
+
+    # add and remove
+    csv.add_row(['g', 1, 2, 3], 1)
+    raw.insert(1, ['g', 1, 2, 3])
+    csv.add_row(['h', '', 2.5, 4], 10)
+    raw.append(['h', '', 2.5, 4])
+    self.check(csv, raw)
+    with self.assertRaises(ValueError):
+      csv.add_row(['i'], 1)
+    csv.add_column(['w', 1, 2, 3, 4, 5], 2)
+    for row, value in zip(raw, ['w', 1, 2, 3, 4, 5]):
+      row.insert(2, value)
+    self.check(csv, raw)
+    csv.remove_row(2)
+    raw.pop(2)
+    csv.remove_column(-1)
+    for row in raw:
+      row.pop(-1)
+    self.check(csv, raw)
+    with self.assertRaises(IndexError):
+      csv.remove_row(5)
+    with self.assertRaises(IndexError):
+      csv.remove_column(4)
+
+    # batch removal, including columns with exceptions and lists
+    csv = handycsv.ColumnarCsv.load(text)
+    csv.add_column(['l'] + ['v{}'.format(r) for r in range(3)], 4)
+    raw = [list(row) for row in TestColumnarCsv.k4x4]
+    for row, value in zip(raw, csv.get_column(4)):
+      row.append(value)
+    csv.remove_rows([1, -1])
+    csv.remove_columns([0, 2])
+    self.check(csv, [[row[1], row[3], row[4]] for row in (raw[0], raw[2])])
+    with self.assertRaises(IndexError):
+      csv.remove_rows([0, 1])
+    with self.assertRaises(IndexError):
+      csv.remove_columns([3])
+    with self.assertRaises(IndexError):
+      csv.remove_columns([0, 1, 2])
+
+    # columns with many non-numeric values become lists
+    csv = handycsv.ColumnarCsv([2] * 40)
+    for row in range(40):
+      csv.set(row, 0, row)
+      csv.set(row, 1, 'v{}'.format(row))
+    self.assertEqual(csv.get_column(0), list(range(40)))
+    self.assertEqual(csv.get_column(1), ['v{}'.format(r) for r in range(40)])
+
+    # grid stats on top of the columnar storage
+    stats = handycsv.GridStats.make_from_csv(
+      handycsv.ColumnarCsv.load(text))
+    self.assertEqual(stats.get('e', 'b'), 4.5)
+    self.assertEqual(stats.get_column('a'), [0, 3, 6])
+
+    # files
+    for ext in ['.csv', '.csv.gz']:
+      _, csvfile = tempfile.mkstemp(prefix='TestColumnarCsv', suffix=ext)
+      handycsv.Csv.load(text).write(csvfile)
+      csv = handycsv.ColumnarCsv.read(csvfile)
+      self.assertEqual(csv.source, csvfile)
+      self.check(csv, TestColumnarCsv.k4x4)
+      csv.write(csvfile, transpose=True)
+      self.check(handycsv.ColumnarCsv.read(csvfile, transpose=True),
+                 TestColumnarCsv.k4x4)
+      os.remove(csvfile)
+
+  @unittest.skipIf(numpy is None, 'requires NumPy')
+  def test_numpy(self):
+    csv = handycsv.ColumnarCsv.load('-,a,b\nd,1,2.5\ne,3,4.5\n')
+    view = csv.column_to_numpy(1, first_row=1)
+    self.assertEqual(view.dtype, numpy.int64)
+    self.assertEqual(view.tolist(), [1, 3])
+    self.assertFalse(view.flags.writeable)
+    self.assertFalse(view.flags.owndata)
+    self.assertEqual(csv.column_to_numpy(0).tolist(), ['-', 'd', 'e'])
+    values = csv.to_numpy(first_row=1, first_column=1)
+    self.assertEqual(values.tolist(), [[1.0, 2.5], [3.0, 4.5]])
@@ -34,10 +34,16 @@ from __future__ import (absolute_import, division,
                         print_function, unicode_literals)
 
 import os
+import re
 import handycsv
 import unittest
 import tempfile
 
+try:
+  import numpy
+except ImportError:
+  numpy = None
+
 
 class TestColumnStats(unittest.TestCase):
 
@@ -85,6 +91,15 @@ class TestColumnStats(unittest.TestCase):
     with self.assertRaises(IndexError):
       stats.get('e')
 
+    stats = handycsv.ColumnStats.load(text)
+    stats.remove_rows(['d', 'f'])
+    self.assertEqual(stats.row_names(), ['-', 'e'])
+    self.assertEqual(stats.get('e'), 3)
+    with self.assertRaises(IndexError):
+      stats.remove_rows(['z'])
+    with self.assertRaises(IndexError):
+      stats.remove_rows(['-', 'e'])
+
     stats = handycsv.ColumnStats.load(text)
 
     self.assertEqual(stats.filter_rows('3'), ['e'])
@@ -140,3 +155,73 @@ class TestColumnStats(unittest.TestCase):
     text = TestColumnStats.make_str(TestColumnStats.k4x2, delimiter=';')
     stats = handycsv.ColumnStats.load(text, delimiter=';')
     self.assertEqual(text, stats.to_string(delimiter=';'))
+
+  @unittest.skipIf(numpy is None, 'requires NumPy')
+  def test_numpy(self):
+    stats = handycsv.ColumnStats.load('d,0\ne,3\nf,6\n')
+    values, rows = stats.to_ndarray()
+    self.assertEqual(values.tolist(), [0, 3, 6])
+    self.assertEqual(rows.tolist(), ['d', 'e', 'f'])
+    self.assertEqual(handycsv.ColumnStats.from_ndarray(rows, values), stats)
+
+  def test_append(self):
+    stats = handycsv.ColumnStats.load(
+      TestColumnStats.make_str(TestColumnStats.k4x2))
+    for ext in ['.csv', '.csv.gz']:
+      _, csvfile = tempfile.mkstemp(prefix='TestColumnStats', suffix=ext)
+      os.remove(csvfile)
+      stats.append(csvfile, ['-', 'd'])
+      stats.append(csvfile, ['e', 'f'])
+      self.assertEqual(handycsv.ColumnStats.read(csvfile), stats)
+      with self.assertRaises(IndexError):
+        stats.append(csvfile, ['z'])
+      os.remove(csvfile)
+
+  def test_incremental_index(self):
+    stats = handycsv.ColumnStats.create(['-'])
+    for row in range(4):
+      stats.add_row('r{}'.format(row), row)
+    stats.add_row('x', 10, 1)
+    stats.remove_row('r2')
+    with self.assertRaises(ValueError):
+      stats.add_row('x', 0)
+    fresh = handycsv.ColumnStats.make_from_csv(stats.csv)
+    self.assertEqual(stats.row_names(), ['-', 'x', 'r0', 'r1', 'r3'])
+    self.assertEqual(stats.row_index, fresh.row_index)
+    self.assertEqual(stats.get('r3'), 3)
+
+  def test_filter(self):
+    stats = handycsv.ColumnStats.load(
+      TestColumnStats.make_str(TestColumnStats.k4x2))
+    kept = stats.filter(lambda value: isinstance(value, int) and value > 0)
+    self.assertEqual(kept.row_names(), ['e', 'f'])
+    self.assertEqual(kept.get('f'), 6)
+    self.assertEqual(stats.row_names(), ['-', 'd', 'e', 'f'])
+    kept = stats.filter(re.compile(r'\d'), invert=True)
+    self.assertEqual(kept.row_names(), ['-'])
+    with self.assertRaises(IndexError):
+      stats.filter(re.compile('x'))
+
+    # the kept rows are shared until either side modifies them
+    kept = stats.filter(lambda value: value in (3, 6))
+    kept.set('e', 30)
+    kept.remove_row('f')
+    self.assertEqual(kept.row_names(), ['e'])
+    self.assertEqual(stats.get('e'), 3)
+    stats.set('f', 60)
+    self.assertEqual(stats.filter(lambda value: value == 60).get('f'), 60)
+    _, csvfile = tempfile.mkstemp(prefix='TestColumnStats', suffix='.csv')
+    kept.write(csvfile)
+    self.assertEqual(handycsv.ColumnStats.read(csvfile), kept)
+    os.remove(csvfile)
+
+  def test_copy(self):
+    stats = handycsv.ColumnStats.load(
+      TestColumnStats.make_str(TestColumnStats.k4x2))
+    copy = stats.copy()
+    copy.set('e', 30)
+    copy.remove_row('d')
+    self.assertEqual(stats.get('e'), 3)
+    self.assertEqual(stats.row_names(), ['-', 'd', 'e', 'f'])
+    self.assertEqual(copy.get('e'), 30)
+    self.assertEqual(copy.row_names(), ['-', 'e', 'f'])
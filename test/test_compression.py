@@ -0,0 +1,104 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# Python 3 compatibility
+from __future__ import (absolute_import, division,
+                        print_function, unicode_literals)
+
+import os
+import handycsv
+import unittest
+import tempfile
+
+import gzip
+
+
+class TestCompression(unittest.TestCase):
+
+  text = ''.join('r{0},{0},{1}\n'.format(row, row % 7) for row in range(2000))
+
+  def test_codecs(self):
+    extensions = handycsv.compression.codec_extensions()
+    for ext in ['.gz', '.bz2', '.xz']:
+      self.assertIn(ext, extensions)
+    self.assertFalse(handycsv.compression.is_compressed('a.csv'))
+    self.assertFalse(handycsv.compression.is_compressed('a.gz/b.csv'))
+
+    csv = handycsv.Csv.load(TestCompression.text)
+    with tempfile.TemporaryDirectory() as directory:
+      for ext in extensions:
+        self.assertTrue(handycsv.compression.is_compressed('a.csv' + ext))
+        for level in [1, None, 9]:
+          csvfile = os.path.join(directory, 'data.csv' + ext)
+          csv.write(csvfile, compresslevel=level, threads=2)
+          self.assertEqual(handycsv.Csv.read(csvfile), csv)
+          with open(csvfile, 'rb') as fd:
+            self.assertNotEqual(fd.read().decode('latin-1'),
+                                TestCompression.text)
+          if ext == '.gz':
+            # the gzip header flags the fastest and the strongest levels
+            with open(csvfile, 'rb') as fd:
+              self.assertEqual(fd.read(9)[8], 4 if level == 1 else 2)
+
+        # appending adds a stream
+        with handycsv.CsvWriter(csvfile, append=True, compresslevel=1) as writer:
+          writer.write_row(['x', 1, 2])
+        self.assertEqual(handycsv.Csv.read(csvfile).get(-1, 0), 'x')
+
+  def test_stats_write(self):
+    stats = handycsv.GridStats.load('-,a,b\n' + TestCompression.text)
+    column = handycsv.ColumnStats.load('x,1\ny,2\n')
+    with tempfile.TemporaryDirectory() as directory:
+      gridfile = os.path.join(directory, 'grid.csv.xz')
+      stats.write(gridfile, compresslevel=0)
+      self.assertEqual(handycsv.GridStats.read(gridfile), stats)
+      columnfile = os.path.join(directory, 'column.csv.bz2')
+      column.write(columnfile, compresslevel=1)
+      self.assertEqual(handycsv.ColumnStats.read(columnfile), column)
+
+  def test_register(self):
+    def opener(filename, mode, compresslevel, threads):
+      opened.append((mode, compresslevel, threads))
+      return gzip.open(filename, mode, compresslevel=compresslevel or 9)
+    opened = []
+    handycsv.compression.register_codec('.gzz', opener)
+    self.addCleanup(handycsv.compression._CODECS.pop, '.gzz')
+    with self.assertRaises(ValueError):
+      handycsv.compression.register_codec('gzz', opener)
+
+    csv = handycsv.Csv.load('1,2\n3,4\n')
+    _, csvfile = tempfile.mkstemp(prefix='TestCompression', suffix='.csv.gzz')
+    csv.write(csvfile, compresslevel=3)
+    self.assertEqual(handycsv.Csv.read(csvfile), csv)
+    with gzip.open(csvfile, 'rt') as fd:
+      self.assertEqual(fd.read(), '1,2\n3,4\n')
+    self.assertEqual(opened, [('wb', 3, None), ('rb', None, None)])
+    os.remove(csvfile)
@@ -34,10 +34,16 @@ from __future__ import (absolute_import, division,
                         print_function, unicode_literals)
 
 import os
+import pickle
 import handycsv
 import unittest
 import tempfile
 
+try:
+  import numpy
+except ImportError:
+  numpy = None
+
 
 class TestCsv(unittest.TestCase):
 
@@ -356,6 +362,171 @@ class TestCsv(unittest.TestCase):
     with self.assertRaises(IndexError):
       csv.sort(4)
 
+  def test_sort_keys(self):
+    text = '-,a,b\nd,1,x\ne,0,y\nf,1,w\ng,0,y\nh,1,x\n'
+    csv = handycsv.Csv.load(text)
+
+    # stable, and ties don't compare the rest of the rows
+    csvs = csv.sort(1, ignore_header=True)
+    self.assertEqual(csvs.get_column(0), ['-', 'e', 'g', 'd', 'f', 'h'])
+    csvs = csv.sort([1, 2], ignore_header=True, reverse=[True, False])
+    self.assertEqual(csvs.get_column(0), ['-', 'f', 'd', 'h', 'e', 'g'])
+    csvs = csv.sort([2, 0], ignore_header=True, reverse=True)
+    self.assertEqual(csvs.get_column(0), ['-', 'g', 'e', 'h', 'd', 'f'])
+    csvs = csv.sort(0, ignore_header=True, key=lambda name: -ord(name))
+    self.assertEqual(csvs.get_column(0), ['-', 'h', 'g', 'f', 'e', 'd'])
+    with self.assertRaises(ValueError):
+      csv.sort([1, 2], reverse=[True])
+
+    # the original is unchanged unless sorting in place
+    self.assertEqual(str(csv), text)
+    csvs.set(1, 1, 7)
+    self.assertEqual(str(csv), text)
+    self.assertIs(csv.sort(2, ignore_header=True, in_place=True), csv)
+    self.assertEqual(csv.get_column(0), ['-', 'f', 'd', 'h', 'e', 'g'])
+
+    csv = handycsv.ColumnarCsv.load(text)
+    csvs = csv.sort([1, 2], ignore_header=True)
+    self.assertIsInstance(csvs, handycsv.ColumnarCsv)
+    self.assertEqual(csvs.get_column(0), ['-', 'e', 'g', 'f', 'd', 'h'])
+    self.assertEqual(str(csv), text)
+
+  def test_sort_file(self):
+    rows = [['-', 'a', 'b']] + [['r{}'.format(r), (r * 7) % 5, (r * 3) % 11]
+                                for r in range(200)]
+    text = TestCsv.make_str(rows)
+    csv = handycsv.Csv.load(text)
+    fan_in = handycsv.external_sort.MAX_FAN_IN
+    for inext, outext in [('.csv', '.csv'), ('.csv.gz', '.csv.gz')]:
+      _, infile = tempfile.mkstemp(prefix='TestCsv', suffix=inext)
+      _, outfile = tempfile.mkstemp(prefix='TestCsv', suffix=outext)
+      csv.write(infile)
+      for kwargs in [{'column_index': 1, 'ignore_header': True},
+                     {'column_index': [1, 2], 'ignore_header': True,
+                      'reverse': [False, True]},
+                     {'column_index': [2, 1], 'ignore_header': True,
+                      'reverse': True, 'key': lambda v: -v},
+                     {'column_index': 0}]:
+        for max_rows in [3, 1000]:
+          handycsv.Csv.sort_file(infile, outfile, max_rows=max_rows, **kwargs)
+          self.assertEqual(handycsv.Csv.read(outfile), csv.sort(**kwargs))
+      try:
+        handycsv.external_sort.MAX_FAN_IN = 4
+        handycsv.Csv.sort_file(infile, outfile, 2, ignore_header=True,
+                               max_bytes=50)
+      finally:
+        handycsv.external_sort.MAX_FAN_IN = fan_in
+      self.assertEqual(handycsv.Csv.read(outfile),
+                       csv.sort(2, ignore_header=True))
+      with self.assertRaises(ValueError):
+        handycsv.Csv.sort_file(infile, infile, 0)
+      os.remove(infile)
+      os.remove(outfile)
+
+    # a file holding only the header
+    _, infile = tempfile.mkstemp(prefix='TestCsv', suffix='.csv')
+    _, outfile = tempfile.mkstemp(prefix='TestCsv', suffix='.csv')
+    with open(infile, 'w') as fd:
+      fd.write('-,a,b\n')
+    handycsv.Csv.sort_file(infile, outfile, 1, ignore_header=True)
+    with open(outfile) as fd:
+      self.assertEqual(fd.read(), '-,a,b\n')
+    os.remove(infile)
+    os.remove(outfile)
+
+  def test_read_cache(self):
+    text = '-,a,b\nd,0,1.5\ne,3,x\n'
+    for ext in ['.csv', '.csv.gz']:
+      _, csvfile = tempfile.mkstemp(prefix='TestCsv', suffix=ext)
+      cachedir = tempfile.mkdtemp(prefix='TestCsv')
+      handycsv.Csv.load(text).write(csvfile)
+      stat = os.stat(csvfile)
+      for cache in [True, cachedir]:
+        csv = handycsv.Csv.read(csvfile, cache=cache)
+        self.assertEqual(csv, handycsv.Csv.load(text))
+        self.assertEqual(csv.source, csvfile)
+        cachefile = handycsv.parse_cache.cache_file(csvfile, cache)
+        self.assertTrue(os.path.isfile(cachefile))
+
+        # an unchanged size and mtime loads the cached values
+        handycsv.Csv.load(text.replace('3', '4')).write(csvfile)
+        os.utime(csvfile, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(handycsv.Csv.read(csvfile, cache=cache).get(2, 1), 3)
+        self.assertEqual(handycsv.Csv.read(csvfile).get(2, 1), 4)
+        self.assertEqual(
+          handycsv.Csv.read(csvfile, dtypes=[str], cache=cache).get(2, 1), 4)
+
+        # a changed mtime or a corrupt cache file parses the file again
+        handycsv.Csv.load(text).write(csvfile)
+        os.utime(csvfile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(
+          handycsv.Csv.read(csvfile, cache=cache, transpose=True).get(1, 2), 3)
+        with open(cachefile, 'wb') as fd:
+          fd.write(b'junk')
+        stats = handycsv.GridStats.read(csvfile, cache=cache)
+        self.assertEqual(stats.get('e', 'a'), 3)
+        os.remove(cachefile)
+        os.utime(csvfile, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+      os.remove(csvfile)
+      os.rmdir(cachedir)
+
+  def test_read_cache_format(self):
+    text = 'a,1,2.5,{0}\nb,-3,nan\n\nc,4,-0.0,x,y\n'.format(2**70)
+    _, csvfile = tempfile.mkstemp(prefix='TestCsv', suffix='.csv')
+    with open(csvfile, 'w') as fd:
+      fd.write(text)
+    expected = handycsv.Csv.load(text)
+    cachefile = handycsv.parse_cache.cache_file(csvfile, True)
+    handycsv.Csv.read(csvfile, cache=True)
+    cached = handycsv.Csv.read(csvfile, cache=True).raw
+    self.assertEqual(repr(cached), repr(expected.raw))
+    self.assertEqual([[type(x) for x in row] for row in cached],
+                     [[type(x) for x in row] for row in expected.raw])
+
+    # cache files never run code, and bad ones are parsed again
+    marker = csvfile + '.ran'
+    class Payload(object):
+      def __reduce__(self):
+        return (open, (marker, 'w'))
+    for junk in [b'{"key": 1}\n', b'{}', b'\xff\n', b'[1, 2]\n',
+                 pickle.dumps(Payload())]:
+      with open(cachefile, 'wb') as fd:
+        fd.write(junk)
+      self.assertEqual(repr(handycsv.Csv.read(csvfile, cache=True).raw),
+                       repr(expected.raw))
+      with open(cachefile, 'rb') as fd:
+        self.assertEqual(fd.read(1), b'{')
+    with open(cachefile, 'rb') as fd:
+      valid = fd.read()
+    with open(cachefile, 'wb') as fd:
+      fd.write(valid[:-3])
+    self.assertEqual(repr(handycsv.Csv.read(csvfile, cache=True).raw),
+                     repr(expected.raw))
+    self.assertFalse(os.path.exists(marker))
+
+    # values that aren't int, float or str aren't cached
+    os.remove(cachefile)
+    handycsv.Csv.read(csvfile, dtypes=[str, complex], cache=True)
+    self.assertFalse(os.path.exists(cachefile))
+    os.remove(csvfile)
+
+  def test_read_cache_lambda(self):
+    _, csvfile = tempfile.mkstemp(prefix='TestCsv', suffix='.csv')
+    handycsv.Csv.load('a,1\nb,2\n').write(csvfile)
+    tens = handycsv.Csv.read(csvfile, dtypes=[str, lambda v: int(v) * 10],
+                             cache=True)
+    hundreds = handycsv.Csv.read(csvfile, dtypes=[str, lambda v: int(v) * 100],
+                                 cache=True)
+    self.assertEqual(tens.get_column(1), [10, 20])
+    self.assertEqual(hundreds.get_column(1), [100, 200])
+    self.assertFalse(os.path.exists(
+      handycsv.parse_cache.cache_file(csvfile, True)))
+    self.assertEqual(handycsv.parse_cache.describe_options([str, int]),
+                     ('builtins.str', 'builtins.int'))
+    with self.assertRaises(ValueError):
+      handycsv.parse_cache.describe_options([lambda v: v])
+    os.remove(csvfile)
+
   def test_autotype(self):
     v = handycsv.Csv.autotype('123')
     self.assertIsInstance(v, int)
@@ -536,3 +707,286 @@ class TestCsv(unittest.TestCase):
     self.assertEqual(csv.get(0, 1), 'd')
     self.assertEqual(csv.get(1, 1), '5')
     self.assertEqual(csv.get(2, 1), 'e')
+
+  def test_remove_many(self):
+    csv = handycsv.Csv.load('-,a,b,c\nd,0,1,2\ne,3\nf,6,7,8\ng,9,10,11\n')
+    csv.remove_rows([1, -1, 1])
+    self.assertEqual(csv.get_column(0), ['-', 'e', 'f'])
+    csv.remove_rows([])
+    self.assertEqual(csv.num_rows(), 3)
+    with self.assertRaises(IndexError):
+      csv.remove_rows([3])
+    with self.assertRaises(IndexError):
+      csv.remove_rows([0, 1, 2])
+    self.assertEqual(csv.num_rows(), 3)
+
+    # nothing is removed unless every row can lose the columns
+    with self.assertRaises(IndexError):
+      csv.remove_columns([0, -1])
+    with self.assertRaises(IndexError):
+      csv.remove_columns([2])
+    self.assertEqual(csv.row_lengths(), [4, 2, 4])
+
+    # negative indices are relative to each row's length
+    csv.remove_columns([-1])
+    self.assertEqual(csv.get_row(0), ['-', 'a', 'b'])
+    self.assertEqual(csv.get_row(1), ['e'])
+    self.assertEqual(csv.get_row(2), ['f', 6, 7])
+    with self.assertRaises(IndexError):
+      csv.remove_columns([0])
+
+  def test_copy_on_write(self):
+    text = '-,a,b\nd,0,1\ne,3,4\nf,6,7\n'
+    for cls in [handycsv.Csv, handycsv.ColumnarCsv]:
+      csv = cls.load(text)
+      copy = csv.copy()
+      copy2 = copy.copy()
+      copy.set(1, 1, 10)
+      csv.set(2, 2, 20)
+      copy2.add_row(['g', 9, 9], 1)
+      copy2.remove_row(-1)
+      self.assertEqual(str(csv), '-,a,b\nd,0,1\ne,3,20\nf,6,7\n')
+      self.assertEqual(str(copy), '-,a,b\nd,10,1\ne,3,4\nf,6,7\n')
+      self.assertEqual(str(copy2), '-,a,b\ng,9,9\nd,0,1\ne,3,4\n')
+
+      copy = csv.copy()
+      copy.add_column(['c', 1, 2, 3], 1)
+      copy.remove_column(-1)
+      copy.remove_columns([0])
+      csv.remove_rows([1])
+      self.assertEqual(str(csv), '-,a,b\ne,3,20\nf,6,7\n')
+      self.assertEqual(str(copy), 'c,a\n1,0\n2,3\n3,6\n')
+      copy.set(0, 0, 'x')
+      self.assertEqual(csv.get(0, 0), '-')
+
+    # only the modified rows are copied
+    csv = handycsv.Csv.load(text)
+    copy = csv.copy()
+    copy.set(1, 1, 10)
+    self.assertIsNot(copy.raw[1], csv.raw[1])
+    self.assertIs(copy.raw[2], csv.raw[2])
+
+  def test_transposed(self):
+    text = '-,a,b\nd,0,1\ne,3,4\nf,6,7\n'
+    expected = [list(row) for row in zip(*handycsv.Csv.load(text).raw)]
+    csv = handycsv.Csv.load(text)
+    csvt = csv.transpose()
+    self.assertIsInstance(csvt, handycsv.TransposedCsv)
+    self.assertEqual(csvt.num_rows(), 3)
+    self.assertEqual(csvt.row_lengths(), [4, 4, 4])
+    self.assertEqual(csvt.get_row(1), expected[1])
+    self.assertEqual(csvt.get_column(2), ['e', 3, 4])
+    self.assertEqual(csvt.get(2, 3), 7)
+    self.assertEqual(str(csvt), TestCsv.make_str(expected))
+    with self.assertRaises(IndexError):
+      csvt.get_row(3)
+    with self.assertRaises(IndexError):
+      csvt.num_columns(3)
+
+    # the transpose is independent of the original
+    csvt.set(1, 1, 9)
+    csv.set(1, 2, 8)
+    self.assertEqual(csvt.get(1, 1), 9)
+    self.assertEqual(csvt.get(2, 1), 1)
+    self.assertEqual(csv.get(1, 1), 0)
+    self.assertEqual(csvt.transpose().get(1, 1), 9)
+    self.assertEqual(csvt.copy(), csvt)
+
+    # structural changes build the transposed rows
+    csvt.add_row(['c', 1, 2, 3], 3)
+    self.assertEqual(csvt.raw[3], ['c', 1, 2, 3])
+    self.assertEqual(csvt.get(1, 1), 9)
+    self.assertEqual(csvt.transpose().get_row(1), ['d', 9, 1, 1])
+
+    with self.assertRaises(IndexError):
+      handycsv.Csv.load('a,b\nc\n').transpose()
+    with self.assertRaises(IndexError):
+      handycsv.Csv.load('a\nb,c\n').transpose()
+
+    # writing transposed streams the columns
+    _, csvfile = tempfile.mkstemp(prefix='TestCsv', suffix='.csv')
+    handycsv.Csv.load(text).write(csvfile, transpose=True)
+    with open(csvfile) as fd:
+      self.assertEqual(fd.read(), TestCsv.make_str(expected))
+    self.assertEqual(handycsv.Csv.read(csvfile, transpose=True),
+                     handycsv.Csv.load(text))
+    with self.assertRaises(IndexError):
+      handycsv.Csv.load('a,b\nc\n').write(csvfile, transpose=True)
+    os.remove(csvfile)
+
+  def test_iter_rows(self):
+    tests = [
+      (TestCsv.make_str(TestCsv.k4x4), TestCsv.k4x4),
+      (TestCsv.make_str(TestCsv.kIrregular), TestCsv.kIrregular),
+      ('\n\na,b\n\nc\n\n\n', [['a', 'b'], [''], ['c']]),
+      ('\n\n\n\n', []),
+    ]
+    for text, rows in tests:
+      _, plain_file = tempfile.mkstemp(prefix='TestCsv', suffix='.csv')
+      with open(plain_file, 'w') as fd:
+        fd.write(text)
+      os.system('gzip -k {}'.format(plain_file))
+      compressed_file = plain_file + '.gz'
+      for csvfile in [plain_file, compressed_file]:
+        self.assertEqual(list(handycsv.Csv.iter_rows(csvfile)), rows)
+        os.remove(csvfile)
+
+  def test_iter_chunks(self):
+    _, plain_file = tempfile.mkstemp(prefix='TestCsv', suffix='.csv')
+    with open(plain_file, 'w') as fd:
+      fd.write(TestCsv.make_str(TestCsv.k4x4))
+    os.system('gzip -k {}'.format(plain_file))
+    compressed_file = plain_file + '.gz'
+
+    for csvfile in [plain_file, compressed_file]:
+      with self.assertRaises(ValueError):
+        list(handycsv.Csv.iter_chunks(csvfile))
+
+      chunks = list(handycsv.Csv.iter_chunks(csvfile, max_rows=2))
+      self.assertEqual(len(chunks), 2)
+      self.check(chunks[0], TestCsv.k4x4[0:2])
+      self.check(chunks[1], TestCsv.k4x4[2:4])
+      self.assertEqual(chunks[1].source, csvfile)
+
+      chunks = list(handycsv.Csv.iter_chunks(csvfile, max_rows=2, header=True))
+      self.assertEqual(len(chunks), 2)
+      self.check(chunks[0], TestCsv.k4x4[0:3])
+      self.check(chunks[1], [TestCsv.k4x4[0], TestCsv.k4x4[3]])
+      stats = handycsv.GridStats.make_from_csv(chunks[1])
+      self.assertEqual(stats.get('f', 'b'), 7)
+
+      chunks = list(handycsv.Csv.iter_chunks(csvfile, max_bytes=1,
+                                             header=True))
+      self.assertEqual(len(chunks), 3)
+      for index, chunk in enumerate(chunks):
+        self.check(chunk, [TestCsv.k4x4[0], TestCsv.k4x4[index + 1]])
+
+      chunks = list(handycsv.Csv.iter_chunks(csvfile, max_bytes=1000))
+      self.assertEqual(len(chunks), 1)
+      self.check(chunks[0], TestCsv.k4x4)
+
+      os.remove(csvfile)
+
+  def test_iter_chunks_bytes(self):
+    # each row is charged its own line, even when rows are read ahead
+    _, csvfile = tempfile.mkstemp(prefix='TestCsv', suffix='.csv')
+    with open(csvfile, 'w') as fd:
+      fd.write('\n\n' + ''.join('r{},{}\n'.format(i, i % 10) for i in range(10))
+               + '\nr10,0\n\n')
+    for dtypes in [None, 'infer']:
+      chunks = list(handycsv.Csv.iter_chunks(csvfile, max_bytes=12,
+                                             dtypes=dtypes))
+      self.assertEqual([chunk.num_rows() for chunk in chunks],
+                       [2, 2, 2, 2, 3, 1])
+      self.assertEqual(chunks[-2].raw[-1], [''])
+      chunks = list(handycsv.Csv.iter_chunks(csvfile, max_bytes=12,
+                                             header=True, dtypes=dtypes))
+      self.assertEqual([chunk.num_rows() - 1 for chunk in chunks],
+                       [2, 2, 2, 2, 3])
+      self.assertEqual(chunks[-1].get_column(0), ['r0', 'r9', '', 'r10'])
+    os.remove(csvfile)
+
+  def test_dtypes(self):
+    text = 'name,x,y,z\na,1,2.5,foo\nb,,3,7\nc,4.5,1e3,\n'
+
+    csv = handycsv.Csv.load(text, dtypes=[str, int, float, str])
+    self.assertEqual(csv.get_row(0), ['name', 'x', 'y', 'z'])
+    self.assertEqual(csv.get_row(1), ['a', 1, 2.5, 'foo'])
+    self.assertEqual(csv.get_row(2), ['b', '', 3.0, '7'])
+    self.assertIsInstance(csv.get(2, 2), float)
+    self.assertEqual(csv.get_row(3), ['c', 4.5, 1000.0, ''])
+
+    csv = handycsv.Csv.load(text, dtypes=[str, int])
+    self.assertEqual(csv.get_row(2), ['b', '', 3, 7])
+
+    self.assertEqual(
+      handycsv.Csv.infer_dtypes([['a', '1', '2.5', 'foo', ''],
+                                 ['b', '', '3', '7', '']]),
+      [str, int, None, None, None])
+
+    csv = handycsv.Csv.load(text, dtypes='infer')
+    self.assertEqual(csv, handycsv.Csv.load(text))
+    csv = handycsv.Csv.load(TestCsv.make_str(TestCsv.k4x4), dtypes='infer')
+    self.check(csv, TestCsv.k4x4)
+
+    with self.assertRaises(ValueError):
+      handycsv.Csv.load(text, dtypes='foo')
+
+    stats = handycsv.GridStats.load(text, dtypes='infer')
+    self.assertEqual(stats.get('c', 'y'), 1000.0)
+
+    # the first row isn't converted to the types inferred from the others
+    text = '7,1,2\na,1.5,2.5\nb,3.5,4.5\n'
+    expected = handycsv.Csv.load(text)
+    self.assertEqual(handycsv.Csv.load(text, dtypes='infer'), expected)
+    stats = handycsv.GridStats.load(text, dtypes='infer')
+    self.assertEqual(stats.column_names(), [1, 2])
+    self.assertEqual(stats.to_string(), text)
+    _, csvfile = tempfile.mkstemp(prefix='TestCsv', suffix='.csv')
+    handycsv.Csv.load(text * 10).write(csvfile)
+    expected = handycsv.Csv.read(csvfile)
+    self.assertEqual(expected.get_row(0), [7, 1, 2])
+    self.assertEqual(handycsv.Csv.read(csvfile, dtypes='infer'), expected)
+    self.assertEqual(handycsv.Csv.read(csvfile, dtypes='infer', workers=2),
+                     expected)
+    self.assertEqual(
+      next(handycsv.Csv.iter_chunks(csvfile, max_rows=2, header=True,
+                                    dtypes='infer')).get_row(0), [7, 1, 2])
+    with handycsv.LazyCsv.open(csvfile, dtypes='infer') as csv:
+      self.assertEqual(csv.get_row(0), [7, 1, 2])
+      self.assertEqual(csv, expected)
+    csv = handycsv.IndexedCsv.open(csvfile, names=True, dtypes='infer')
+    self.assertEqual(csv.get_column(0)[:2], [7, 'a'])
+    self.assertEqual(csv, expected)
+    csv.close()
+    os.remove(csvfile)
+    os.remove(csvfile + '.idx')
+
+  @unittest.skipIf(numpy is None, 'requires NumPy')
+  def test_numpy(self):
+    csv = handycsv.Csv.load(TestCsv.make_str(TestCsv.k4x4))
+    values = csv.to_numpy(first_row=1, first_column=1)
+    self.assertEqual(values.shape, (3, 3))
+    self.assertEqual(values.dtype, numpy.int64)
+    self.assertEqual(values.tolist(), [row[1:] for row in TestCsv.k4x4[1:]])
+    values = csv.to_numpy()
+    self.assertEqual(values.dtype, object)
+    self.assertEqual(values.tolist(), TestCsv.k4x4)
+    self.assertEqual(csv.column_to_numpy(2, first_row=1).tolist(), [1, 4, 7])
+
+    csv.set(2, 2, '')
+    values = csv.to_numpy(dtype=float, empty=float('nan'), first_row=1,
+                          first_column=1)
+    self.assertTrue(numpy.isnan(values[1, 1]))
+
+    self.assertEqual(handycsv.Csv.from_numpy(numpy.arange(6).reshape(2, 3)),
+                     handycsv.Csv.load('0,1,2\n3,4,5\n'))
+    with self.assertRaises(ValueError):
+      handycsv.Csv.from_numpy(numpy.arange(6))
+
+  @unittest.skipIf(numpy is not None, 'requires NumPy to be missing')
+  def test_numpy_missing(self):
+    csv = handycsv.Csv.load(TestCsv.make_str(TestCsv.k4x4))
+    with self.assertRaises(ImportError):
+      csv.to_numpy()
+
+  def test_read_parallel(self):
+    texts = [
+      TestCsv.make_str(TestCsv.kIrregular) * 20,
+      '\n \n  a, b\n\n  \nc,1\n2.5\n \n\n',
+      '\n\n',
+    ]
+    for text in texts:
+      for ext in ['.csv', '.csv.gz']:
+        _, csvfile = tempfile.mkstemp(prefix='TestCsv', suffix=ext)
+        with handycsv.compression.open_file(csvfile, 'wb') as fd:
+          fd.write(text.encode('utf-8'))
+        csv = handycsv.Csv.read(csvfile)
+        for workers in [2, 3]:
+          for dtypes in [None, 'infer']:
+            csv2 = handycsv.Csv.read(csvfile, workers=workers, dtypes=dtypes)
+            self.assertEqual(csv2, csv)
+            self.assertEqual(csv2.source, csvfile)
+        os.remove(csvfile)
+    with self.assertRaises(ValueError):
+      handycsv.Csv.read(csvfile, workers=0)
@@ -0,0 +1,156 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# Python 3 compatibility
+from __future__ import (absolute_import, division,
+                        print_function, unicode_literals)
+
+import os
+import pickle
+import handycsv
+import unittest
+import tempfile
+
+
+class TestCsvIndex(unittest.TestCase):
+
+  def test_index(self):
+    texts = [
+      '-,a,b\nd,0,1.5\ne,,x\nf,3,4\n',
+      '\n \n  a, b\n\n  \nc,1\n2.5 \n \n\n',
+      'a',
+      '\n\n',
+      '',
+    ]
+    for text in texts:
+      _, csvfile = tempfile.mkstemp(prefix='TestCsvIndex', suffix='.csv')
+      with open(csvfile, 'w') as fd:
+        fd.write(text)
+      expected = handycsv.Csv.load(text)
+      for stride in [1, 2, 1000]:
+        csv = handycsv.IndexedCsv.open(csvfile, stride=stride)
+        for row in reversed(range(expected.num_rows())):
+          self.assertEqual(csv.get_row(row), expected.get_row(row))
+        self.assertEqual(csv, expected)
+        csv.close()
+      csv = handycsv.IndexedCsv.open(csvfile, names=True, dtypes='infer')
+      self.assertEqual(csv.get_column(0),
+                       handycsv.Csv.load(text, dtypes='infer').get_column(0))
+      self.assertEqual(csv, handycsv.Csv.load(text, dtypes='infer'))
+      csv.close()
+      os.remove(csvfile)
+      os.remove(csvfile + '.idx')
+
+  def test_compressed(self):
+    # seeking backwards in a compressed file decompresses it again
+    _, csvfile = tempfile.mkstemp(prefix='TestCsvIndex', suffix='.csv.gz')
+    handycsv.Csv.load('-,a\nr0,1\n').write(csvfile)
+    with self.assertRaises(ValueError):
+      handycsv.IndexedCsv.open(csvfile)
+    with self.assertRaises(ValueError):
+      handycsv.GridStats.open(csvfile)
+    self.assertFalse(os.path.exists(csvfile + '.idx'))
+    os.remove(csvfile)
+
+  def test_sidecar(self):
+    _, csvfile = tempfile.mkstemp(prefix='TestCsvIndex', suffix='.csv')
+    with open(csvfile, 'w') as fd:
+      fd.write('-,a,b\n' + ''.join('r{0},{0},{1}\n'.format(r, r * 0.5)
+                                   for r in range(100)))
+    index = handycsv.CsvIndex.open(csvfile, stride=10)
+    self.assertEqual(index.num_rows, 101)
+    self.assertEqual(len(index.offsets), 11)
+    self.assertTrue(os.path.exists(csvfile + '.idx'))
+    with open(csvfile, 'rb') as fd:
+      self.assertEqual(index.read_line(fd, 57), 'r56,56,28.0')
+      with self.assertRaises(IndexError):
+        index.read_line(fd, 101)
+    with self.assertRaises(ValueError):
+      index.find('r5')
+
+    # reused while the file is unchanged and the settings are compatible
+    saved = os.path.getmtime(csvfile + '.idx')
+    self.assertEqual(handycsv.CsvIndex.open(csvfile, stride=20).stride, 10)
+    self.assertEqual(os.path.getmtime(csvfile + '.idx'), saved)
+    index = handycsv.CsvIndex.open(csvfile, names=True)
+    self.assertEqual(index.stride, 1)
+    self.assertEqual(index.find('r5'), 6)
+    with self.assertRaises(IndexError):
+      index.find('r100')
+
+    # grid stats read single rows through the index
+    stats = handycsv.GridStats.open(csvfile)
+    self.assertEqual(stats.get('r42', 'b'), 21.0)
+    self.assertEqual(stats.csv.num_parsed(), 2)
+    self.assertEqual(stats.row_names()[:2], ['r0', 'r1'])
+    stats.csv.close()
+
+    # changing the file invalidates the index
+    with open(csvfile, 'a') as fd:
+      fd.write('r100,100,50.0\n')
+    self.assertFalse(handycsv.CsvIndex._load(csvfile).is_current())
+    stats = handycsv.GridStats.open(csvfile)
+    self.assertEqual(stats.get('r100', 'a'), 100)
+    self.assertEqual(stats.get('r99', 'a'), 99)
+    stats.csv.close()
+    self.assertTrue(handycsv.CsvIndex._load(csvfile).is_current())
+
+    # a corrupt sidecar is rebuilt
+    with open(csvfile + '.idx', 'wb') as fd:
+      fd.write(b'junk')
+    self.assertEqual(handycsv.CsvIndex.open(csvfile).num_rows, 102)
+
+    # so are sidecars of other formats, and loading them never runs code
+    index = handycsv.CsvIndex.open(csvfile, names=True)
+    marker = csvfile + '.ran'
+    class Payload(object):
+      def __reduce__(self):
+        return (open, (marker, 'w'))
+    for junk in [pickle.dumps({'version': 1}), pickle.dumps(Payload()),
+                 b'{"version": 2}\n', b'{"version": 2, "size": "1"}\n',
+                 b'\xff\n']:
+      with open(csvfile + '.idx', 'wb') as fd:
+        fd.write(junk)
+      stats = handycsv.GridStats.open(csvfile)
+      self.assertEqual(stats.get('r100', 'a'), 100)
+      self.assertEqual(stats.csv.index.names, index.names)
+      stats.csv.close()
+    self.assertFalse(os.path.exists(marker))
+
+    # truncated offsets or names aren't used
+    with open(csvfile + '.idx', 'rb') as fd:
+      data = fd.read()
+    for size in [len(data) - 1, data.index(b'\n') + 9]:
+      with open(csvfile + '.idx', 'wb') as fd:
+        fd.write(data[:size])
+      self.assertIsNone(handycsv.CsvIndex._load(csvfile))
+    os.remove(csvfile)
+    os.remove(csvfile + '.idx')
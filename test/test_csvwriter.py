@@ -0,0 +1,65 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# Python 3 compatibility
+from __future__ import (absolute_import, division,
+                        print_function, unicode_literals)
+
+import os
+import handycsv
+import unittest
+import tempfile
+
+
+class TestCsvWriter(unittest.TestCase):
+
+  def test_writer(self):
+    rows = [['-', 'a', 'b'], ['d', 0, 1.5], ['e', '', 'x']]
+    text = '-,a,b\nd,0,1.5\ne,,x\n'
+    for ext in ['.csv', '.csv.gz']:
+      _, csvfile = tempfile.mkstemp(prefix='TestCsvWriter', suffix=ext)
+
+      with handycsv.CsvWriter(csvfile) as writer:
+        self.assertEqual(writer.filename, csvfile)
+        writer.write_row(rows[0])
+        writer.write_rows(iter(rows[1:]))
+        self.assertEqual(writer.num_rows(), 3)
+      self.assertEqual(str(handycsv.Csv.read(csvfile)), text)
+
+      writer = handycsv.CsvWriter(csvfile, delimiter=';')
+      writer.write_rows(rows)
+      writer.close()
+      writer.close()
+      self.assertEqual(
+        handycsv.Csv.load(text).to_string(delimiter=';'),
+        handycsv.Csv.read(csvfile).to_string())
+
+      os.remove(csvfile)
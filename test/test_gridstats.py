@@ -34,10 +34,16 @@ from __future__ import (absolute_import, division,
                         print_function, unicode_literals)
 
 import os
+import re
 import handycsv
 import unittest
 import tempfile
 
+try:
+  import numpy
+except ImportError:
+  numpy = None
+
 
 class TestGridStats(unittest.TestCase):
 
@@ -137,6 +143,18 @@ class TestGridStats(unittest.TestCase):
     self.assertEqual(stats.filter_rows('b', 'foo', invert=True),
                      ['d', 'e', 'f'])
 
+    stats = handycsv.GridStats.load(text)
+    stats.remove_rows(['f', 'd'])
+    stats.remove_columns(['a', 'c'])
+    self.assertEqual(stats.row_names(), ['e'])
+    self.assertEqual(stats.column_names(), ['b'])
+    self.assertEqual(stats.get('e', 'b'), 4)
+    with self.assertRaises(IndexError):
+      stats.remove_rows(['e', 'z'])
+    with self.assertRaises(IndexError):
+      stats.remove_columns(['z'])
+    self.assertEqual(stats.row_names(), ['e'])
+
     stats = handycsv.GridStats.load(text)
     stats_t = stats.transpose()
     self.assertEqual(stats_t.row_names(), ['a', 'b', 'c'])
@@ -218,3 +236,224 @@ class TestGridStats(unittest.TestCase):
     text = TestGridStats.make_str(TestGridStats.k4x4, delimiter=';')
     stats = handycsv.GridStats.load(text, delimiter=';')
     self.assertEqual(text, stats.to_string(delimiter=';'))
+
+  @unittest.skipIf(numpy is None, 'requires NumPy')
+  def test_numpy(self):
+    stats = handycsv.GridStats.load(TestGridStats.make_str(TestGridStats.k4x4))
+    values, rows, columns = stats.to_ndarray()
+    self.assertEqual(values.tolist(), [[0, 1, 2], [3, 4, 5], [6, 7, 8]])
+    self.assertEqual(rows.tolist(), ['d', 'e', 'f'])
+    self.assertEqual(columns.tolist(), ['a', 'b', 'c'])
+
+    stats2 = handycsv.GridStats.from_ndarray('-', rows, columns, values)
+    self.assertEqual(stats, stats2)
+    self.assertEqual(stats2.get('f', 'b'), 7)
+    with self.assertRaises(ValueError):
+      handycsv.GridStats.from_ndarray('-', rows[:2], columns, values)
+
+    stats.set('e', 'b', '')
+    values, _, _ = stats.to_ndarray(dtype=float, empty=float('nan'))
+    self.assertTrue(numpy.isnan(values[1, 1]))
+
+  def test_reductions(self):
+    stats = handycsv.GridStats.load(TestGridStats.make_str(TestGridStats.k4x4))
+    stats.set('e', 'b', '')
+
+    with self.assertRaises(ValueError):
+      stats.sum(axis=2)
+    with self.assertRaises(ValueError):
+      stats.percentile(101)
+
+    count = stats.count()
+    self.assertEqual(count.row_names(), ['-', 'a', 'b', 'c'])
+    self.assertEqual(count.get('-'), 'count')
+    self.assertEqual([count.get(c) for c in 'abc'], [3, 2, 3])
+    count = stats.count(axis=1)
+    self.assertEqual(count.row_names(), ['-', 'd', 'e', 'f'])
+    self.assertEqual([count.get(r) for r in 'def'], [3, 2, 3])
+
+    self.assertEqual([stats.sum().get(c) for c in 'abc'], [9, 8, 15])
+    self.assertEqual([stats.sum(axis=1).get(r) for r in 'def'], [3, 8, 21])
+    self.assertEqual([stats.min().get(c) for c in 'abc'], [0, 1, 2])
+    self.assertEqual([stats.max(axis=1).get(r) for r in 'def'], [2, 5, 8])
+
+    expected = [3.0, 4.0, 5.0]
+    for c, value in zip('abc', expected):
+      self.assertAlmostEqual(stats.mean().get(c), value)
+    expected = [6.0 ** 0.5, 3.0, 6.0 ** 0.5]
+    for c, value in zip('abc', expected):
+      self.assertAlmostEqual(stats.std().get(c), value)
+    median = stats.percentile(50)
+    self.assertEqual(median.get('-'), 'p50')
+    for c, value in zip('abc', [3.0, 4.0, 5.0]):
+      self.assertAlmostEqual(median.get(c), value)
+    p25 = stats.percentile(25, axis=1)
+    for r, value in zip('def', [0.5, 3.5, 6.5]):
+      self.assertAlmostEqual(p25.get(r), value)
+
+    stats = handycsv.GridStats.create('-', ['d', 'e'], ['a', 'b'])
+    stats.set('d', 'a', 1)
+    self.assertEqual(stats.mean().get('b'), '')
+    self.assertEqual(stats.max().get('b'), '')
+    self.assertEqual(stats.sum().get('b'), 0)
+    self.assertAlmostEqual(stats.mean().get('a'), 1.0)
+
+  def test_append(self):
+    stats = handycsv.GridStats.load(TestGridStats.make_str(TestGridStats.k4x4))
+    for ext in ['.csv', '.csv.gz']:
+      _, csvfile = tempfile.mkstemp(prefix='TestGridStats', suffix=ext)
+      os.remove(csvfile)
+      with self.assertRaises(IndexError):
+        stats.append(csvfile, ['z'])
+      stats.append(csvfile, ['d'])
+      self.assertEqual(handycsv.GridStats.read(csvfile).row_names(), ['d'])
+      stats.append(csvfile, ['e', 'f'])
+      self.assertEqual(handycsv.GridStats.read(csvfile), stats)
+
+      other = handycsv.GridStats.create('-', ['g'], ['a', 'b', 'x'])
+      with self.assertRaises(ValueError):
+        other.append(csvfile)
+      self.assertEqual(handycsv.GridStats.read(csvfile), stats)
+      os.remove(csvfile)
+
+      stats.write(csvfile)
+      stats.append(csvfile, [])
+      self.assertEqual(handycsv.GridStats.read(csvfile), stats)
+      os.remove(csvfile)
+
+      # the header is compared as text, so str names that read back as
+      # numbers still match
+      numeric = handycsv.GridStats.create('h', ['x'], ['1', '2'])
+      numeric.append(csvfile)
+      numeric.append(csvfile)
+      self.assertEqual(handycsv.Csv.read(csvfile).get_column(0), ['h', 'x', 'x'])
+      with open(csvfile + '.other', 'w') as fd:
+        fd.write('\n h , 1,2\n')
+      numeric.append(csvfile + '.other')
+      os.remove(csvfile + '.other')
+      os.remove(csvfile)
+
+  def test_read_many(self):
+    stats = handycsv.GridStats.load(TestGridStats.make_str(TestGridStats.k4x4))
+    files = []
+    for index, ext in enumerate(['.csv', '.csv.gz', '.csv']):
+      _, csvfile = tempfile.mkstemp(prefix='TestGridStats', suffix=ext)
+      stats.set('d', 'a', index)
+      stats.write(csvfile)
+      files.append(csvfile)
+
+    for workers in [None, 1, 2]:
+      results = handycsv.GridStats.read_many(files, workers=workers)
+      self.assertEqual([r.get('d', 'a') for r in results], [0, 1, 2])
+      self.assertEqual([r.source for r in results], files)
+
+    missing = files[1] + '.missing'
+    with self.assertRaises(handycsv.ReadManyError) as context:
+      handycsv.GridStats.read_many([missing, files[0], missing], workers=2)
+    error = context.exception
+    self.assertEqual([f for f, _ in error.failures], [missing, missing])
+    self.assertTrue(error.failures[0][1].startswith('FileNotFoundError'))
+    self.assertIsNone(error.results[0])
+    self.assertEqual(error.results[1].get('d', 'a'), 0)
+
+    csvs = handycsv.Csv.read_many(files, transpose=True)
+    self.assertEqual(csvs[2].get_row(1), ['a', 2, 3, 6])
+
+    for csvfile in files:
+      os.remove(csvfile)
+
+  def test_incremental_index(self):
+    stats = handycsv.GridStats.create('-', [], ['a'])
+    for row in range(6):
+      stats.add_row('r{}'.format(row), {'a': row})
+    stats.add_row('x', {'a': 10}, 2)
+    stats.add_row('y', {'a': 11}, -1)
+    stats.add_row('z', {'a': 12}, 100)
+    stats.add_column('b', {name: 0 for name in stats.row_names()}, 0)
+    stats.add_column('c', {name: 1 for name in stats.row_names()})
+    stats.remove_row('r1')
+    stats.remove_column('a')
+    with self.assertRaises(ValueError):
+      stats.add_row('x', {'b': 0, 'c': 1})
+    with self.assertRaises(ValueError):
+      stats.add_column('c', {})
+
+    fresh = handycsv.GridStats.make_from_csv(stats.csv)
+    self.assertEqual(stats.row_names(),
+                     ['r0', 'x', 'r2', 'r3', 'r4', 'y', 'r5', 'z'])
+    self.assertEqual(stats.column_names(), ['b', 'c'])
+    self.assertEqual(stats.row_index, fresh.row_index)
+    self.assertEqual(stats.column_index, fresh.column_index)
+    self.assertEqual(stats.get('y', 'c'), 1)
+
+  def test_filter(self):
+    text = TestGridStats.make_str(TestGridStats.k4x4)
+    for stats in [handycsv.GridStats.load(text),
+                  handycsv.GridStats.make_from_csv(
+                    handycsv.ColumnarCsv.load(text))]:
+      kept = stats.filter('a', lambda value: value > 2)
+      self.assertEqual(kept.row_names(), ['e', 'f'])
+      self.assertEqual(kept.get('f', 'c'), 8)
+      self.assertIs(type(kept.csv), type(stats.csv))
+      self.assertEqual(stats.row_names(), ['d', 'e', 'f'])
+
+      kept = stats.filter(['a', 'c'], lambda a, c: a + c == 8, invert=True)
+      self.assertEqual(kept.row_names(), ['d', 'f'])
+      kept = stats.filter('b', re.compile('[47]'))
+      self.assertEqual(kept.row_names(), ['e', 'f'])
+      kept = stats.filter(('a', 'b'), re.compile('[0-4]$'))
+      self.assertEqual(kept.row_names(), ['d', 'e'])
+      kept = stats.filter('a', lambda value: False)
+      self.assertEqual(kept.row_names(), [])
+      self.assertEqual(kept.column_names(), ['a', 'b', 'c'])
+      with self.assertRaises(IndexError):
+        stats.filter('z', bool)
+
+      # the kept rows are shared until either side modifies them
+      kept = stats.filter('a', lambda value: value > 2)
+      kept.set('e', 'b', 40)
+      stats.set('f', 'b', 70)
+      self.assertEqual(stats.get('e', 'b'), 4)
+      self.assertEqual(kept.get('f', 'b'), 7)
+      stats.set('f', 'b', 7)
+
+    # lazily parsed rows are modified in place, so they aren't shared
+    _, csvfile = tempfile.mkstemp(prefix='TestGridStats', suffix='.csv')
+    handycsv.Csv.load(text).write(csvfile)
+    with handycsv.LazyCsv.open(csvfile) as csv:
+      stats = handycsv.GridStats.make_from_csv(csv)
+      kept = stats.filter('a', lambda value: value > 2)
+      stats.set('e', 'b', 40)
+      self.assertEqual(kept.get('e', 'b'), 4)
+    os.remove(csvfile)
+
+  def test_copy(self):
+    stats = handycsv.GridStats.load(TestGridStats.make_str(TestGridStats.k4x4))
+    copy = stats.copy()
+    copy.set('e', 'b', 40)
+    copy.add_row('g', {'a': 1, 'b': 2, 'c': 3})
+    copy.remove_column('a')
+    self.assertEqual(stats.get('e', 'b'), 4)
+    self.assertEqual(stats.row_names(), ['d', 'e', 'f'])
+    self.assertEqual(stats.column_names(), ['a', 'b', 'c'])
+    self.assertEqual(copy.get('e', 'b'), 40)
+    self.assertEqual(copy.row_names(), ['d', 'e', 'f', 'g'])
+    self.assertEqual(copy.column_names(), ['b', 'c'])
+
+  def test_sort(self):
+    stats = handycsv.GridStats.load('-,a,b\nd,1,x\ne,0,y\nf,1,w\n')
+    sorted_stats = stats.sort('a')
+    self.assertEqual(sorted_stats.row_names(), ['e', 'd', 'f'])
+    self.assertEqual(sorted_stats.get('f', 'b'), 'w')
+    self.assertEqual(stats.row_names(), ['d', 'e', 'f'])
+    self.assertEqual(stats.get('f', 'b'), 'w')
+    self.assertEqual(stats.sort(['a', 'b'], reverse=[True, False]).row_names(),
+                     ['f', 'd', 'e'])
+    self.assertEqual(stats.sort(reverse=True).row_names(), ['f', 'e', 'd'])
+    with self.assertRaises(IndexError):
+      stats.sort('z')
+
+    self.assertIs(stats.sort('b', in_place=True), stats)
+    self.assertEqual(stats.row_names(), ['f', 'd', 'e'])
+    self.assertEqual(stats.get('e', 'a'), 0)
+    self.assertEqual(stats.row_index['e'], 3)
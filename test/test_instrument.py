@@ -0,0 +1,156 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# Python 3 compatibility
+from __future__ import (absolute_import, division,
+                        print_function, unicode_literals)
+
+import os
+import handycsv
+import unittest
+import tempfile
+
+
+
+class TestInstrument(unittest.TestCase):
+
+  text = '-,a,b\nx,1,2.5\ny,3,z\nw,,4\n'
+
+  def test_read(self):
+    for ext in ['.csv', '.csv.gz']:
+      _, csvfile = tempfile.mkstemp(prefix='TestInstrument', suffix=ext)
+      handycsv.Csv.load(TestInstrument.text).write(csvfile)
+      expected = handycsv.GridStats.read(csvfile)
+
+      records = []
+      with handycsv.Recorder(callback=records.append) as recorder:
+        stats = handycsv.GridStats.read(csvfile)
+      self.assertEqual(stats, expected)
+      self.assertEqual(records, recorder.records)
+      self.assertEqual(len(records), 1)
+      record = records[0]
+      self.assertEqual(record.operation, 'GridStats.read')
+      self.assertEqual(record.source, csvfile)
+      self.assertEqual(set(record.phases),
+                       {'decompress', 'decode', 'split', 'parse', 'index'})
+      self.assertGreaterEqual(record.seconds, sum(record.phases.values()))
+      self.assertEqual(record.rows, 4)
+      self.assertEqual(record.bytes, len(TestInstrument.text))
+      # '-', 'a', 'b', 'x', 'y', 'z', 'w' and '' aren't numbers
+      self.assertEqual(record.counters['autotype_str'], 8)
+      self.assertEqual(record.counters['autotype_float'], 1)
+
+      # disabled again
+      handycsv.GridStats.read(csvfile)
+      self.assertEqual(len(recorder.records), 1)
+      os.remove(csvfile)
+
+  def test_stream(self):
+    # more lines than a batch, with inferred types
+    text = ''.join('r{0},{0},{1}\n'.format(row, row / 3) for row in range(3000))
+    for ext in ['.csv', '.csv.gz']:
+      _, csvfile = tempfile.mkstemp(prefix='TestInstrument', suffix=ext)
+      handycsv.Csv.load(text).write(csvfile)
+      expected = handycsv.Csv.read(csvfile, dtypes='infer')
+      with handycsv.Recorder() as recorder:
+        csv = handycsv.Csv.read(csvfile, dtypes='infer')
+      self.assertEqual(csv, expected)
+      record, = recorder.records
+      self.assertEqual(record.rows, 3000)
+      self.assertEqual(record.bytes, len(text))
+      # nested phases are exclusive, so they add up to at most the total
+      self.assertLessEqual(sum(record.phases.values()), record.seconds)
+      # only the first row is autotyped
+      self.assertEqual(record.counters['autotype_str'], 1)
+      os.remove(csvfile)
+
+  def test_load_write(self):
+    with handycsv.Recorder() as recorder:
+      csv = handycsv.Csv.load(TestInstrument.text, dtypes=[str, int, float])
+      _, csvfile = tempfile.mkstemp(prefix='TestInstrument', suffix='.csv')
+      csv.write(csvfile)
+    self.assertEqual(csv, handycsv.Csv.load(TestInstrument.text,
+                                            dtypes=[str, int, float]))
+    with open(csvfile) as fd:
+      text = fd.read()
+    self.assertEqual(text, csv.to_string())
+    os.remove(csvfile)
+
+    load, write = recorder.records
+    self.assertEqual(load.operation, 'Csv.load')
+    self.assertEqual(list(load.phases), ['split', 'parse'])
+    # 'a', 'b' and 'z' violate their types, 'b' is also not a float
+    self.assertEqual(load.counters['dtype_fallback'], 3)
+    self.assertEqual(load.counters['autotype_str'], 3)
+    self.assertEqual(write.operation, 'Csv.write')
+    self.assertEqual(list(write.phases), ['format', 'write', 'flush'])
+    self.assertEqual(write.rows, 4)
+    self.assertEqual(write.bytes, len(text))
+
+    total = recorder.totals()
+    self.assertEqual(total.rows, 8)
+    self.assertEqual(total.counters['dtype_fallback'], 3)
+    recorder.clear()
+    self.assertEqual(recorder.records, [])
+
+  def test_cache(self):
+    with tempfile.TemporaryDirectory() as directory:
+      csvfile = os.path.join(directory, 'data.csv')
+      with open(csvfile, 'w') as fd:
+        fd.write(TestInstrument.text)
+      with handycsv.Recorder() as recorder:
+        first = handycsv.Csv.read(csvfile, cache=directory)
+        second = handycsv.Csv.read(csvfile, cache=directory)
+      self.assertEqual(first, second)
+      miss, hit = recorder.records
+      self.assertEqual(miss.counters['cache_miss'], 1)
+      self.assertIn('cache_save', miss.phases)
+      self.assertEqual(hit.counters['cache_hit'], 1)
+      self.assertEqual(list(hit.phases), ['cache'])
+      self.assertEqual(hit.rows, 4)
+
+  def test_nesting(self):
+    outer = handycsv.Recorder()
+    inner = handycsv.Recorder()
+    with outer:
+      with inner:
+        handycsv.ColumnStats.load('a,1\nb,2\n')
+      handycsv.Csv.load('1')
+      with self.assertRaises(ValueError):
+        handycsv.GridStats.load('-,a\nx,1\nx,2\n')
+    self.assertEqual([r.operation for r in inner.records], ['ColumnStats.load'])
+    self.assertEqual(list(inner.records[0].phases), ['split', 'parse', 'index'])
+    self.assertEqual([r.operation for r in outer.records], ['Csv.load'])
+    self.assertIsNone(handycsv.instrument.active())
+    # a failed operation doesn't leave its record open
+    with outer:
+      handycsv.Csv.load('1')
+    self.assertEqual(len(outer.records), 2)
@@ -0,0 +1,100 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# Python 3 compatibility
+from __future__ import (absolute_import, division,
+                        print_function, unicode_literals)
+
+import os
+import handycsv
+import unittest
+import tempfile
+
+
+class TestLazyCsv(unittest.TestCase):
+
+  def test_lazy(self):
+    texts = [
+      '-,a,b\nd,0,1.5\ne,,x\nf,3,4\n',
+      '\n \n  a, b\n\n  \nc,1\n2.5 \n \n\n',
+      'a',
+      '\n\n',
+      '',
+    ]
+    for text in texts:
+      _, csvfile = tempfile.mkstemp(prefix='TestLazyCsv', suffix='.csv')
+      with open(csvfile, 'w') as fd:
+        fd.write(text)
+      expected = handycsv.Csv.load(text)
+
+      csv = handycsv.LazyCsv.open(csvfile)
+      self.assertEqual(csv.source, csvfile)
+      self.assertEqual(csv.num_rows(), expected.num_rows())
+      for row in reversed(range(expected.num_rows())):
+        self.assertEqual(csv.get_row(row), expected.get_row(row))
+      self.assertEqual(str(csv), str(expected))
+      self.assertEqual(csv, expected)
+      csv.close()
+
+      with handycsv.LazyCsv.open(csvfile, dtypes='infer') as csv:
+        self.assertEqual(csv, handycsv.Csv.load(text, dtypes='infer'))
+      os.remove(csvfile)
+
+    _, csvfile = tempfile.mkstemp(prefix='TestLazyCsv', suffix='.csv')
+    with open(csvfile, 'w') as fd:
+      fd.write(texts[0])
+    with handycsv.LazyCsv.open(csvfile) as csv:
+      self.assertEqual(csv.num_parsed(), 0)
+      self.assertEqual(csv.get(2, 2), 'x')
+      self.assertEqual(csv.get(2, 1, default=7), 7)
+      self.assertEqual(csv.num_columns(-1), 3)
+      self.assertEqual(csv.num_parsed(), 2)
+      csv.set(1, 1, 9)
+      self.assertEqual(csv.get_row(1), ['d', 9, 1.5])
+      with self.assertRaises(IndexError):
+        csv.get(4, 0)
+    with self.assertRaises(ValueError):
+      csv.get(0, 0)
+    self.assertEqual(csv.get(1, 1), 9)
+
+    # structural changes parse everything and keep earlier edits
+    with handycsv.LazyCsv.open(csvfile) as csv:
+      csv.set(1, 1, 9)
+      csv.remove_row(2)
+      self.assertEqual(csv.num_parsed(), 3)
+      self.assertEqual(str(csv), '-,a,b\nd,9,1.5\nf,3,4\n')
+    with handycsv.LazyCsv.open(csvfile) as csv:
+      stats = handycsv.GridStats.make_from_csv(csv)
+      self.assertEqual(stats.get('e', 'b'), 'x')
+
+    with self.assertRaises(ValueError):
+      handycsv.LazyCsv.open(csvfile + '.gz')
+    os.remove(csvfile)
@@ -0,0 +1,144 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# Python 3 compatibility
+from __future__ import (absolute_import, division,
+                        print_function, unicode_literals)
+
+import os
+import handycsv
+import unittest
+import tempfile
+
+
+
+class TestReadCache(unittest.TestCase):
+
+  def write_file(self, text):
+    fd, csvfile = tempfile.mkstemp(prefix='TestReadCache', suffix='.csv')
+    with os.fdopen(fd, 'w') as f:
+      f.write(text)
+    self.addCleanup(os.remove, csvfile)
+    return csvfile
+
+  def test_hits(self):
+    csvfile = self.write_file('-,a,b\nx,1,2\ny,3,4\n')
+    cache = handycsv.ReadCache()
+    stats = cache.read(csvfile, handycsv.GridStats)
+    self.assertEqual(stats.get('y', 'b'), 4)
+    self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    # copies are independent of the cached object
+    stats.set('y', 'b', 40)
+    stats.remove_row('x')
+    again = cache.read(csvfile, handycsv.GridStats)
+    self.assertEqual(again.get('y', 'b'), 4)
+    self.assertEqual(again.row_names(), ['x', 'y'])
+    self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    # other options are other entries
+    csv = cache.read(csvfile)
+    self.assertEqual(csv.raw, [['-', 'a', 'b'], ['x', 1, 2], ['y', 3, 4]])
+    csv = cache.read(csvfile, transpose=True)
+    self.assertEqual(csv.get(1, 2), 3)
+    csv = cache.read(csvfile, dtypes=[str, str, str])
+    self.assertEqual(csv.get(2, 2), '4')
+    self.assertEqual(len(cache), 4)
+    self.assertEqual(cache.stats()['misses'], 4)
+    self.assertGreater(cache.size_bytes(), 0)
+
+    cache.clear()
+    self.assertEqual(len(cache), 0)
+    self.assertEqual(cache.size_bytes(), 0)
+    cache.read(csvfile)
+    self.assertEqual(cache.misses, 5)
+
+  def test_private(self):
+    csvfile = self.write_file('-,a\nx,1\n')
+    cache = handycsv.ReadCache()
+    for transpose in [False, True]:
+      for kind in [handycsv.Csv, handycsv.GridStats, handycsv.ColumnStats]:
+        first = cache.read(csvfile, kind, transpose)
+        csv = first if kind is handycsv.Csv else first.csv
+        csv.raw[1][1] = 'BAD'
+        again = cache.read(csvfile, kind, transpose)
+        csv = again if kind is handycsv.Csv else again.csv
+        self.assertNotIn('BAD', csv.get_column(1))
+        csv.raw[1][1] = 'BAD'
+        csv = cache.read(csvfile, kind, transpose)
+        self.assertNotIn('BAD', str(csv))
+
+  def test_lambda(self):
+    csvfile = self.write_file('a,1\nb,2\n')
+    cache = handycsv.ReadCache()
+    tens = cache.read(csvfile, dtypes=[str, lambda v: int(v) * 10])
+    hundreds = cache.read(csvfile, dtypes=[str, lambda v: int(v) * 100])
+    self.assertEqual(tens.get_column(1), [10, 20])
+    self.assertEqual(hundreds.get_column(1), [100, 200])
+    self.assertEqual((len(cache), cache.misses), (0, 2))
+
+  def test_invalidate(self):
+    csvfile = self.write_file('1,2\n')
+    cache = handycsv.ReadCache()
+    cache.read(csvfile)
+    cache.read(csvfile, dtypes='infer')
+    with open(csvfile, 'w') as f:
+      f.write('3,4,5\n')
+    stat = os.stat(csvfile)
+    os.utime(csvfile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    self.assertEqual(cache.read(csvfile).raw, [[3, 4, 5]])
+    self.assertEqual(len(cache), 1)
+    self.assertEqual(cache.evictions, 2)
+
+  def test_evict(self):
+    files = [self.write_file('{0},{0}\n'.format(i)) for i in range(3)]
+    size = handycsv.read_cache.estimate_bytes(handycsv.Csv.read(files[0]))
+    cache = handycsv.ReadCache(2 * size)
+    cache.read(files[0])
+    cache.read(files[1])
+    cache.read(files[0])
+    cache.read(files[2])
+    self.assertEqual(len(cache), 2)
+    self.assertEqual(cache.evictions, 1)
+    cache.read(files[0])
+    self.assertEqual(cache.hits, 2)
+    cache.read(files[1])
+    self.assertEqual(cache.misses, 4)
+
+    # objects larger than the bound aren't kept
+    cache = handycsv.ReadCache(1)
+    self.assertEqual(cache.read(files[0]).raw, [[0, 0]])
+    self.assertEqual(len(cache), 0)
+    with self.assertRaises(ValueError):
+      handycsv.ReadCache(0)
+
+  def test_shared(self):
+    self.assertIs(handycsv.ReadCache.shared(), handycsv.ReadCache.shared())
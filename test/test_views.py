@@ -0,0 +1,142 @@
+"""
+ * Redistribution and use in source and binary forms, with or without
+ * modification, are permitted provided that the following conditions are met:
+ *
+ * - Redistributions of source code must retain the above copyright notice, this
+ * list of conditions and the following disclaimer.
+ *
+ * - Redistributions in binary form must reproduce the above copyright notice,
+ * this list of conditions and the following disclaimer in the documentation
+ * and/or other materials provided with the distribution.
+ *
+ * - Neither the name of prim nor the names of its contributors may be used to
+ * endorse or promote products derived from this software without specific prior
+ * written permission.
+ *
+ * See the NOTICE file distributed with this work for additional information
+ * regarding copyright ownership.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+ * AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+ * IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ * ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+ * CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+ * SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+ * INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ * ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+ * POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# Python 3 compatibility
+from __future__ import (absolute_import, division,
+                        print_function, unicode_literals)
+
+import os
+import handycsv
+import unittest
+import tempfile
+
+
+class TestViews(unittest.TestCase):
+
+  text = '-,a,b,c\nd,0,1,2\ne,3,4,5\nf,6,7,8\n'
+
+  def test_csv_views(self):
+    for csv in [handycsv.Csv.load(TestViews.text),
+                handycsv.ColumnarCsv.load(TestViews.text)]:
+      row = csv.row_view(1)
+      self.assertEqual(len(row), 4)
+      self.assertEqual(row[0], 'd')
+      self.assertEqual(row[-1], 2)
+      self.assertEqual(row[1:3], [0, 1])
+      self.assertEqual(row.at(-1), 2)
+      self.assertEqual(list(row), ['d', 0, 1, 2])
+      self.assertEqual(row.tolist(), csv.get_row(1))
+      self.assertEqual(row, ['d', 0, 1, 2])
+      self.assertIn(1, row)
+      with self.assertRaises(IndexError):
+        row[4]
+      with self.assertRaises(IndexError):
+        row['a']
+      with self.assertRaises(IndexError):
+        csv.row_view(4)
+
+      column = csv.column_view(2)
+      self.assertEqual(len(column), 4)
+      self.assertEqual(column.tolist(), ['b', 1, 4, 7])
+      self.assertEqual(column[-2], 4)
+
+      # views see later changes
+      csv.set(1, 2, 9)
+      self.assertEqual(row[2], 9)
+      self.assertEqual(column[1], 9)
+
+    # get_row copies the list but not the values
+    csv = handycsv.Csv.load(TestViews.text)
+    values = csv.get_row(0)
+    values[0] = 'x'
+    self.assertEqual(csv.get(0, 0), '-')
+
+  def test_grid_views(self):
+    stats = handycsv.GridStats.load(TestViews.text)
+    row = stats.row_view('e')
+    self.assertEqual(len(row), 3)
+    self.assertEqual(row['b'], 4)
+    self.assertEqual(row.at(0), 3)
+    self.assertEqual(row[0:2], [3, 4])
+    self.assertEqual(row.tolist(), stats.get_row('e'))
+    column = stats.column_view('c')
+    self.assertEqual(column['f'], 8)
+    self.assertEqual(column.at(0), 2)
+    with self.assertRaises(IndexError):
+      column[0]
+    with self.assertRaises(IndexError):
+      column.at(3)
+    self.assertEqual(list(column), [2, 5, 8])
+    with self.assertRaises(IndexError):
+      stats.row_view('z')
+    with self.assertRaises(IndexError):
+      stats.column_view('z')
+    with self.assertRaises(IndexError):
+      row['z']
+
+    # numeric names aren't confused with positions
+    stats = handycsv.GridStats.load('-,1,2,3\nd,10,20,30\n')
+    row = stats.row_view('d')
+    self.assertEqual([row[1], row[2], row[3]], [10, 20, 30])
+    self.assertEqual([row.at(0), row.at(1), row.at(-1)], [10, 20, 30])
+    with self.assertRaises(IndexError):
+      row[0]
+    with self.assertRaises(IndexError):
+      row['a']
+
+    # views follow their row or column through structural changes
+    stats = handycsv.GridStats.load(TestViews.text)
+    row = stats.row_view('e')
+    column = stats.column_view('b')
+    stats.remove_row('d')
+    self.assertEqual(row.tolist(), [3, 4, 5])
+    self.assertEqual(row['a'], 3)
+    self.assertEqual(column.tolist(), [4, 7])
+    stats.add_column('z', {'e': 10, 'f': 11}, 0)
+    self.assertEqual(row.tolist(), [10, 3, 4, 5])
+    self.assertEqual(column.tolist(), [4, 7])
+    self.assertEqual(column.at(0), 4)
+    stats.remove_rows(['f'])
+    stats.remove_columns(['a'])
+    self.assertEqual(row.tolist(), [10, 4, 5])
+    self.assertEqual(column['e'], 4)
+    with self.assertRaises(IndexError):
+      column['f']
+    stats.add_row('g', {'z': 0, 'b': 1, 'c': 2}, 0)
+    stats.sort('c', reverse=True, in_place=True)
+    self.assertEqual(stats.row_names(), ['e', 'g'])
+    self.assertEqual(row.tolist(), [10, 4, 5])
+    self.assertEqual(column.tolist(), [4, 1])
+    stats.remove_row('e')
+    with self.assertRaises(IndexError):
+      row.tolist()
+    with self.assertRaises(IndexError):
+      len(row)